@@ -23,7 +23,7 @@ source .venv/bin/activate
 pip install --upgrade pip wheel setuptools
 
 # Paquets de base nécessaires au projet Chambre sonore
-pip install pygame python-ola numpy pyqt6
+pip install pygame python-ola numpy pyqt6 pyserial
 
 # Ajout du dossier src au PYTHONPATH
 if ! grep -q "PYTHONPATH" .venv/bin/activate; then
@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+"""
+audio_mixer.py
+Chambre Sonore – Mixeur audio numpy par blocs, avec enveloppe par voix pour l'éclairage.
+
+Au lieu de confier le mélange à pygame.mixer, on mixe nous-mêmes les
+voix (une par cellule) bloc par bloc (`block` échantillons) :
+    - lecture en boucle ou one-shot, gain, fondus d'attaque
+      et de relâchement (rampe linéaire par bloc) ;
+    - sortie via sounddevice (optionnel) ; sans carte son, un thread
+      « simulation » consomme les blocs en temps réel (les enveloppes
+      restent disponibles pour l'éclairage).
+
+Enveloppe par voix, SANS passe d'analyse supplémentaire sur l'audio :
+au chargement, chaque son est résumé en tables par tranche de `hop`
+échantillons (moyenne des carrés, crête). À chaque bloc, le niveau
+RMS / crête d'une voix est lu dans ces tables sur la fenêtre jouée et
+multiplié par le gain appliqué. Un suiveur d'enveloppe (attaque /
+relâchement à un pôle) lisse ensuite toutes les voix en une opération
+numpy.
+
+levels() retourne le niveau lissé 0–1 de chaque « slot » (une cellule
+par slot, dans l'ordre des load_cell_sound(), ligne par ligne) : à
+multiplier dans DMXCompositor.intensity pour que chaque projecteur suive
+son son.
+
+Variations (matrice.Cellule) : load_cell_variations() précharge tous
+les sons d'une cellule ; le volume passé à note_on() / set_volume()
+choisit la variation (VariationTable.lookup, avec hystérésis). Le
+changement se fait au début du bloc suivant : la nouvelle variation
+reprend à la même position d'échantillon (sons alignés) et un fondu
+enchaîné à puissance constante de `xfade_ms` remplace la relance du son.
+
+Interface compatible AudioEngine du pont (load_cell_sound, note_on,
+note_off, shutdown).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import wave
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.matrice import VariationTable
+
+try:
+    import sounddevice as sd  # type: ignore
+    HAS_SOUNDDEVICE = True
+except Exception:
+    sd = None
+    HAS_SOUNDDEVICE = False
+
+
+ENVELOPE_MODES = ("rms", "peak")
+
+
+# ----------------------------------------------------------------------
+# Chargement + tables d'enveloppe
+# ----------------------------------------------------------------------
+
+def load_wav(path: str, samplerate: int) -> np.ndarray:
+    """WAV PCM 8/16/32 bits → float32 (n, 2), rééchantillonné (linéaire) si besoin."""
+    with wave.open(path, "rb") as w:
+        n_ch, width, sr = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        raw = w.readframes(w.getnframes())
+    if width == 1:
+        x = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        x = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 4:
+        x = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Largeur d'échantillon non gérée : {width} octets")
+    x = x.reshape(-1, n_ch)
+    x = np.repeat(x, 2, axis=1) if n_ch == 1 else x[:, :2]
+    if sr != samplerate and x.shape[0] > 1:
+        n_out = int(round(x.shape[0] * samplerate / sr))
+        t = np.linspace(0.0, x.shape[0] - 1, n_out)
+        x = np.stack([np.interp(t, np.arange(x.shape[0]), x[:, k]) for k in range(2)], axis=1)
+    return np.ascontiguousarray(x, dtype=np.float32)
+
+
+@dataclass
+class Clip:
+    """Son chargé + résumé par tranches de `hop` échantillons (calculé une fois)."""
+    samples: np.ndarray       # (n, 2) float32
+    hop: int
+    mean_sq: np.ndarray       # (n_hops,) moyenne des carrés (mono)
+    peak: np.ndarray          # (n_hops,) crête absolue
+
+    @classmethod
+    def from_samples(cls, samples: np.ndarray, hop: int = 128) -> "Clip":
+        n = samples.shape[0]
+        n_hops = max(1, -(-n // hop))
+        mono = np.zeros(n_hops * hop, dtype=np.float32)
+        mono[:n] = samples.mean(axis=1)
+        frames = mono.reshape(n_hops, hop)
+        return cls(samples, hop, np.mean(frames * frames, axis=1), np.abs(frames).max(axis=1))
+
+    def window(self, start: int, count: int, loop: bool):
+        """(RMS, crête) de la fenêtre [start, start+count) à partir des tables."""
+        n_hops = self.mean_sq.size
+        i0 = start // self.hop
+        i1 = -(-(start + count) // self.hop)
+        if loop:
+            idx = np.arange(i0, max(i1, i0 + 1)) % n_hops
+        else:
+            idx = np.arange(min(i0, n_hops - 1), min(max(i1, i0 + 1), n_hops))
+        return float(np.sqrt(self.mean_sq[idx].mean())), float(self.peak[idx].max())
+
+
+@dataclass
+class _Voice:
+    clip: Clip
+    slot: int
+    pos: int = 0
+    gain: float = 0.0          # gain courant (fondus)
+    target: float = 1.0        # gain visé
+    loop: bool = True
+    variation: int = -1        # variation jouée (-1 = son unique)
+    pending: Optional[int] = None   # variation demandée, appliquée au bloc suivant
+    old: Optional[Clip] = None      # variation sortante pendant le fondu enchaîné
+    old_pos: int = 0
+    mix: float = 1.0           # avancement du fondu enchaîné (1 = terminé)
+
+
+# ----------------------------------------------------------------------
+# Mixeur
+# ----------------------------------------------------------------------
+
+class AudioMixer:
+    """Mixe les voix par blocs et suit leur enveloppe (RMS / crête) par slot."""
+
+    def __init__(
+        self,
+        n_slots: int,
+        samplerate: int = 48000,
+        block: int = 512,
+        gain: float = 1.0,
+        attack_ms: float = 5.0,
+        release_ms: float = 120.0,
+        env_mode: str = "rms",
+        env_attack_ms: float = 20.0,
+        env_release_ms: float = 250.0,
+        loop: bool = True,
+        xfade_ms: float = 30.0,
+        hysteresis: float = 0.03,
+        output: bool = True,
+    ) -> None:
+        if env_mode not in ENVELOPE_MODES:
+            raise ValueError(f"Mode d'enveloppe inconnu : {env_mode!r} (attendu : {ENVELOPE_MODES})")
+        self.samplerate = int(samplerate)
+        self.block = int(block)
+        self.gain = float(gain)
+        self.loop = loop
+        self.env_mode = env_mode
+        # Pas de gain par bloc pour les fondus d'attaque / relâchement
+        self._attack_step = self.block / max(1.0, attack_ms * 1e-3 * self.samplerate)
+        self._release_step = self.block / max(1.0, release_ms * 1e-3 * self.samplerate)
+        # xfade_ms = 0 : changement de variation sans fondu (coupure nette)
+        self._xfade_step = self.block / max(1.0, xfade_ms * 1e-3 * self.samplerate) if xfade_ms > 0 else 0.0
+        self.hysteresis = float(hysteresis)
+        # Suiveur d'enveloppe à un pôle (coefficients par bloc)
+        block_s = self.block / self.samplerate
+        self._env_att = float(np.exp(-block_s / max(1e-4, env_attack_ms * 1e-3)))
+        self._env_rel = float(np.exp(-block_s / max(1e-4, env_release_ms * 1e-3)))
+
+        self.n_slots = int(n_slots)
+        self.envelope = np.zeros(self.n_slots, dtype=np.float32)   # lissée
+        self._raw_env = np.zeros(self.n_slots, dtype=np.float32)   # bloc courant
+        self._clips: Dict[str, Clip] = {}
+        self._variations: Dict[str, Tuple[VariationTable, List[Optional[Clip]]]] = {}
+        self._cache: Dict[str, Clip] = {}          # par chemin (sons partagés)
+        self._slots: Dict[str, int] = {}
+        self._voices: Dict[str, _Voice] = {}
+        self._lock = threading.Lock()
+        self._out = np.zeros((self.block, 2), dtype=np.float32)
+        self.blocks = 0
+        self.underruns = 0
+        self.switches = 0
+
+        self._stream = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if output:
+            self._start_output()
+
+    # ------------------------------------------------------------------
+    # Sons / voix (interface AudioEngine)
+    # ------------------------------------------------------------------
+
+    def _load_clip(self, path: Optional[str]) -> Optional[Clip]:
+        if not path or not os.path.isfile(path):
+            return None
+        clip = self._cache.get(path)
+        if clip is None:
+            try:
+                clip = self._cache[path] = Clip.from_samples(load_wav(path, self.samplerate))
+            except Exception as e:
+                print(f"[AUDIO] Erreur chargement {path} : {e}")
+        return clip
+
+    def _set_slot(self, key: str, slot: Optional[int]) -> None:
+        if slot is None:
+            slot = self._slots.get(key, len(self._slots))
+        self._slots[key] = int(slot)
+
+    def load_cell_sound(self, key: str, path: Optional[str], slot: Optional[int] = None) -> None:
+        """Charge le son d'une cellule ; slot par défaut = ordre de chargement."""
+        self._set_slot(key, slot)
+        self._variations.pop(key, None)
+        clip = self._load_clip(path)
+        if clip is None:
+            self._clips.pop(key, None)
+        else:
+            self._clips[key] = clip
+
+    def load_cell_variations(self, key: str, table: VariationTable,
+                             slot: Optional[int] = None) -> None:
+        """Précharge toutes les variations d'une cellule (Cellule.variation_table())."""
+        self._set_slot(key, slot)
+        self._clips.pop(key, None)
+        self._variations[key] = (table, [self._load_clip(f) for f in table.files])
+
+    def _choose(self, key: str, voice: Optional[_Voice], volume: float) -> int:
+        """Variation pour `volume` (hystérésis autour de celle qui joue), -1 si aucune."""
+        table, clips = self._variations[key]
+        current = voice.variation if voice is not None else -1
+        if voice is not None and voice.pending is not None:
+            current = voice.pending
+        i = table.lookup(volume, current, self.hysteresis)
+        return i if i >= 0 and clips[i] is not None else -1
+
+    def note_on(self, key: str, volume: float = 1.0) -> None:
+        with self._lock:
+            voice = self._voices.get(key)
+            if key in self._variations:
+                i = self._choose(key, voice, volume)
+                if voice is None:
+                    if i < 0:
+                        return
+                    voice = self._voices[key] = _Voice(self._variations[key][1][i], self._slots[key],
+                                                       loop=self.loop, variation=i)
+                elif i >= 0 and i != voice.variation:
+                    voice.pending = i
+            elif voice is None:
+                clip = self._clips.get(key)
+                if clip is None:
+                    return
+                voice = self._voices[key] = _Voice(clip, self._slots[key], loop=self.loop)
+            voice.target = max(0.0, float(volume))
+
+    def set_volume(self, key: str, volume: float) -> None:
+        """Nouveau gain visé d'une voix qui joue (atteint par la rampe du bloc suivant)."""
+        with self._lock:
+            voice = self._voices.get(key)
+            if voice is None or voice.target <= 0.0:
+                return
+            if key in self._variations:
+                i = self._choose(key, voice, volume)
+                if i >= 0:
+                    voice.pending = i if i != voice.variation else None
+            voice.target = max(0.0, float(volume))
+
+    def note_off(self, key: str) -> None:
+        with self._lock:
+            voice = self._voices.get(key)
+            if voice is not None:
+                voice.target = 0.0
+
+    # ------------------------------------------------------------------
+    # Rendu d'un bloc
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _segment(samples: np.ndarray, pos: int, n: int, loop: bool) -> np.ndarray:
+        total = samples.shape[0]
+        if loop and pos + n > total:
+            return samples[(pos + np.arange(n)) % total]   # bouclage
+        return samples[pos:pos + n]
+
+    def _switch(self, key: str, v: _Voice) -> None:
+        """Applique la variation demandée : même position d'échantillon, fondu enchaîné."""
+        with self._lock:
+            i, v.pending = v.pending, None
+            var = self._variations.get(key)
+        if i is None or var is None or i == v.variation or var[1][i] is None:
+            return
+        if self._xfade_step > 0.0:
+            v.old, v.old_pos, v.mix = v.clip, v.pos, 0.0
+        v.clip = var[1][i]
+        v.pos = v.pos % v.clip.samples.shape[0] if v.loop else min(v.pos, v.clip.samples.shape[0])
+        v.variation = i
+        self.switches += 1
+
+    def render(self) -> np.ndarray:
+        """Mixe un bloc (block, 2) et met à jour les enveloppes par slot."""
+        n = self.block
+        out = self._out
+        out.fill(0.0)
+        raw = self._raw_env
+        raw.fill(0.0)
+        ramp = np.linspace(0.0, 1.0, n, endpoint=False, dtype=np.float32)[:, None]
+        with self._lock:
+            voices = list(self._voices.items())
+
+        finished = []
+        for key, v in voices:
+            if v.pending is not None:
+                self._switch(key, v)
+            g0 = v.gain
+            step = self._attack_step if v.target > g0 else self._release_step
+            g1 = min(v.target, g0 + step) if v.target > g0 else max(v.target, g0 - step)
+            v.gain = g1
+            gains = self.gain * (g0 + (g1 - g0) * ramp)
+
+            total = v.clip.samples.shape[0]
+            seg = self._segment(v.clip.samples, v.pos, n, v.loop)
+            m = seg.shape[0]
+            # Enveloppe : tables précalculées × gain moyen appliqué sur le bloc
+            rms, peak = v.clip.window(v.pos, m, v.loop)
+            level = rms if self.env_mode == "rms" else peak
+
+            if v.old is None:
+                out[:m] += seg * gains[:m]
+            else:
+                # Fondu enchaîné à puissance constante (sin / cos) vers la nouvelle variation
+                x0, x1 = v.mix, min(1.0, v.mix + self._xfade_step)
+                a = (x0 + (x1 - x0) * ramp) * (0.5 * np.pi)
+                out[:m] += seg * (gains * np.sin(a))[:m]
+                old = self._segment(v.old.samples, v.old_pos, n, v.loop)
+                k = old.shape[0]
+                out[:k] += old * (gains * np.cos(a))[:k]
+                o_rms, o_peak = v.old.window(v.old_pos, k, v.loop)
+                am = 0.25 * np.pi * (x0 + x1)
+                level = level * np.sin(am) + (o_rms if self.env_mode == "rms" else o_peak) * np.cos(am)
+                v.old_pos = (v.old_pos + n) % v.old.samples.shape[0] if v.loop else v.old_pos + k
+                v.mix = x1
+                if x1 >= 1.0:
+                    v.old = None
+
+            level *= self.gain * 0.5 * (g0 + g1)
+            if 0 <= v.slot < raw.size:
+                raw[v.slot] = max(raw[v.slot], level)
+
+            v.pos = (v.pos + n) % total if v.loop else v.pos + m
+            if (g1 <= 0.0 and v.target <= 0.0) or (not v.loop and v.pos >= total):
+                finished.append(key)
+
+        if finished:
+            with self._lock:
+                for key in finished:
+                    v = self._voices.get(key)
+                    if v is not None and (v.target <= 0.0 or not v.loop):
+                        del self._voices[key]
+
+        # Suiveur d'enveloppe : attaque si le niveau monte, relâchement sinon
+        coef = np.where(raw > self.envelope, self._env_att, self._env_rel).astype(np.float32)
+        self.envelope *= coef
+        self.envelope += (1.0 - coef) * raw
+        np.clip(out, -1.0, 1.0, out=out)
+        self.blocks += 1
+        return out
+
+    def levels(self, ref: float = 0.25) -> np.ndarray:
+        """Enveloppes lissées normalisées 0–1 (ref = niveau donnant 1.0)."""
+        return np.clip(self.envelope / max(1e-6, ref), 0.0, 1.0)
+
+    # ------------------------------------------------------------------
+    # Sortie (sounddevice, ou simulation temps réel)
+    # ------------------------------------------------------------------
+
+    def _start_output(self) -> None:
+        if HAS_SOUNDDEVICE:
+            try:
+                self._stream = sd.OutputStream(samplerate=self.samplerate, blocksize=self.block,
+                                               channels=2, dtype="float32",
+                                               callback=self._callback)
+                self._stream.start()
+                print(f"[AUDIO] Mixeur numpy : {self.samplerate} Hz, blocs de {self.block}")
+                return
+            except Exception as e:
+                print(f"[AUDIO] sounddevice indisponible ({e}) : simulation")
+                self._stream = None
+        else:
+            print("[AUDIO] Mixeur numpy en simulation (sounddevice absent)")
+        self._thread = threading.Thread(target=self._run_simulated, name="audio-mixer", daemon=True)
+        self._thread.start()
+
+    def _callback(self, outdata, frames, time_info, status) -> None:
+        if status:
+            self.underruns += 1
+        outdata[:] = self.render()
+
+    def _run_simulated(self) -> None:
+        period = self.block / self.samplerate
+        next_t = time.monotonic()
+        while not self._stop.is_set():
+            self.render()
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_t = time.monotonic()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        with self._lock:
+            self._voices.clear()
+        self.envelope.fill(0.0)
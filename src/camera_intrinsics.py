@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+camera_intrinsics.py
+Chambre Sonore – Paramètres intrinsèques de la caméra de profondeur.
+
+- CameraIntrinsics : fx, fy, cx, cy + distorsion (ordre OpenCV) pour une
+  résolution donnée ; scaled() adapte les paramètres à une autre résolution.
+- read_intrinsics() : interroge le SDK Orbbec (profil du flux actif, sinon
+  paramètres caméra du pipeline).
+- IntrinsicsCache : cache JSON par (numéro de série, profil), pour
+  retrouver les mêmes paramètres si le SDK ne répond pas.
+- undistorted_rays() : tables (H, W) des rayons normalisés (x/z, y/z),
+  distorsion corrigée avec cv2.undistortPoints ; c'est la seule table
+  dont dépendent les autres (sol attendu, seuils) dans ZoneMapper3D.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, replace
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CameraIntrinsics:
+    width: int
+    height: int
+    fx: float
+    fy: float
+    cx: float
+    cy: float
+    # k1, k2, p1, p2, k3, k4, k5, k6 (ordre OpenCV)
+    dist: Tuple[float, ...] = (0.0,) * 8
+
+    def has_distortion(self) -> bool:
+        return any(abs(k) > 1e-12 for k in self.dist)
+
+    def scaled(self, width: int, height: int) -> "CameraIntrinsics":
+        """Mêmes paramètres pour une autre résolution (même champ de vision)."""
+        if (width, height) == (self.width, self.height):
+            return self
+        sx = width / float(self.width)
+        sy = height / float(self.height)
+        return replace(
+            self,
+            width=int(width),
+            height=int(height),
+            fx=self.fx * sx,
+            fy=self.fy * sy,
+            cx=(self.cx + 0.5) * sx - 0.5,
+            cy=(self.cy + 0.5) * sy - 0.5,
+        )
+
+    def camera_matrix(self) -> np.ndarray:
+        return np.array([
+            [self.fx, 0.0, self.cx],
+            [0.0, self.fy, self.cy],
+            [0.0, 0.0, 1.0],
+        ], dtype=np.float64)
+
+    def dist_coeffs(self) -> np.ndarray:
+        return np.asarray(self.dist, dtype=np.float64)
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["dist"] = list(self.dist)
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "CameraIntrinsics":
+        return cls(
+            width=int(d["width"]),
+            height=int(d["height"]),
+            fx=float(d["fx"]),
+            fy=float(d["fy"]),
+            cx=float(d["cx"]),
+            cy=float(d["cy"]),
+            dist=tuple(float(k) for k in d.get("dist", (0.0,) * 8)),
+        )
+
+
+# ----------------------------------------------------------------------
+# Lecture SDK
+# ----------------------------------------------------------------------
+
+def _from_sdk(intr, dist, width: int, height: int) -> Optional[CameraIntrinsics]:
+    """Convertit OBCameraIntrinsic / OBCameraDistortion (pyorbbecsdk) en CameraIntrinsics."""
+    fx = float(getattr(intr, "fx", 0.0))
+    fy = float(getattr(intr, "fy", 0.0))
+    if fx <= 0.0 or fy <= 0.0:
+        return None
+
+    coeffs = (0.0,) * 8
+    if dist is not None:
+        coeffs = tuple(float(getattr(dist, name, 0.0))
+                       for name in ("k1", "k2", "p1", "p2", "k3", "k4", "k5", "k6"))
+
+    return CameraIntrinsics(
+        width=int(getattr(intr, "width", 0) or width),
+        height=int(getattr(intr, "height", 0) or height),
+        fx=fx,
+        fy=fy,
+        cx=float(getattr(intr, "cx", width / 2.0)),
+        cy=float(getattr(intr, "cy", height / 2.0)),
+        dist=coeffs,
+    )
+
+
+def read_intrinsics(depth_frame=None, pipeline=None,
+                    width: int = 0, height: int = 0) -> Optional[CameraIntrinsics]:
+    """
+    Intrinsèques du flux profondeur actif.
+
+    1) profil vidéo de la frame (get_intrinsic / get_distortion)
+    2) sinon pipeline.get_camera_param().depth_intrinsic / depth_distortion
+    Retourne None si le SDK ne fournit rien d'exploitable.
+    """
+    if depth_frame is not None:
+        try:
+            profile = depth_frame.get_stream_profile().as_video_stream_profile()
+            intr = _from_sdk(profile.get_intrinsic(), profile.get_distortion(), width, height)
+            if intr is not None:
+                return intr.scaled(width, height) if width and height else intr
+        except Exception:
+            pass
+
+    if pipeline is not None:
+        try:
+            param = pipeline.get_camera_param()
+            intr = _from_sdk(param.depth_intrinsic,
+                             getattr(param, "depth_distortion", None), width, height)
+            if intr is not None:
+                return intr.scaled(width, height) if width and height else intr
+        except Exception:
+            pass
+
+    return None
+
+
+# ----------------------------------------------------------------------
+# Cache par (numéro de série, profil)
+# ----------------------------------------------------------------------
+
+class IntrinsicsCache:
+    """Cache JSON { "serial|profil": CameraIntrinsics } (config/camera_intrinsics.json)."""
+
+    def __init__(self, path: str = "config/camera_intrinsics.json") -> None:
+        self.path = path
+        self._data = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except Exception as e:
+                print(f"[Intrinsics] Cache illisible ({e}), ignoré.")
+                self._data = {}
+
+    @staticmethod
+    def key(serial: str, profile: str) -> str:
+        return f"{serial}|{profile}"
+
+    def get(self, serial: str, profile: str) -> Optional[CameraIntrinsics]:
+        d = self._data.get(self.key(serial, profile))
+        if d is None:
+            return None
+        try:
+            return CameraIntrinsics.from_dict(d)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def put(self, serial: str, profile: str, intr: CameraIntrinsics) -> None:
+        k = self.key(serial, profile)
+        d = intr.to_dict()
+        if self._data.get(k) == d:
+            return
+        self._data[k] = d
+        self.save()
+
+    def save(self) -> None:
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, indent=4)
+
+
+# ----------------------------------------------------------------------
+# Rayons non distordus
+# ----------------------------------------------------------------------
+
+def undistorted_rays(intr: CameraIntrinsics) -> Tuple[np.ndarray, np.ndarray]:
+    """Tables (H, W) float32 des rayons normalisés : P = Z · (ray_x, ray_y, 1)."""
+    h, w = intr.height, intr.width
+    u = np.arange(w, dtype=np.float32)
+    v = np.arange(h, dtype=np.float32)
+
+    if not intr.has_distortion():
+        ray_x = np.broadcast_to((u - intr.cx) / intr.fx, (h, w)).copy()
+        ray_y = np.broadcast_to(((v - intr.cy) / intr.fy)[:, None], (h, w)).copy()
+        return ray_x, ray_y
+
+    uu, vv = np.meshgrid(u, v)
+    pix = np.stack([uu.ravel(), vv.ravel()], axis=1).reshape(-1, 1, 2)
+    norm = cv2.undistortPoints(pix, intr.camera_matrix(), intr.dist_coeffs())
+    norm = norm.reshape(h, w, 2).astype(np.float32)
+    return np.ascontiguousarray(norm[:, :, 0]), np.ascontiguousarray(norm[:, :, 1])
@@ -10,7 +10,7 @@ Configuration des cellules au sol pour la Chambre Sonore.
     - identifiant "r,c"
     - position au sol en mètres (x_min, x_max, y_min, y_max)
     - paramètres sonores (wav, volume)
-    - paramètres DMX (universe, address, channels, color)
+    - paramètres DMX (universe, address, channels, color, profil de projecteur)
 - Sauvegarde / chargement en JSON
 """
 
@@ -24,6 +24,7 @@ class DMXConfig:
     address: int = 1
     channels: int = 3
     color: tuple[int, int, int] = (255, 255, 255)
+    profile: str = ""       # profil de projecteur (src/fixture_profiles.py), "" = générique
 
 
 @dataclass
@@ -59,7 +60,8 @@ class CellConfigEntry:
                 universe=self.dmx.universe,
                 address=self.dmx.address,
                 channels=self.dmx.channels,
-                color=self.dmx.color
+                color=self.dmx.color,
+                profile=self.dmx.profile,
             )
         )
 
@@ -71,7 +73,8 @@ class CellConfigEntry:
             universe=other.dmx.universe,
             address=other.dmx.address,
             channels=other.dmx.channels,
-            color=other.dmx.color
+            color=other.dmx.color,
+            profile=other.dmx.profile,
         )
 
 
@@ -83,6 +86,7 @@ class CellConfigEntry:
             address=dmx_data.get("address", 1),
             channels=dmx_data.get("channels", 3),
             color=tuple(dmx_data.get("color", (255, 255, 255))),
+            profile=dmx_data.get("profile", ""),
         )
         return CellConfigEntry(
             cell_id=data["cell_id"],
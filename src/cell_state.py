@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+cell_state.py
+Chambre Sonore – Anti-rebond des cellules de la matrice (hystérésis).
+
+Une cellule ne devient active qu'après `activate_n` frames consécutives
+où elle est vue, et ne se relâche qu'après `deactivate_n` frames
+consécutives où elle ne l'est plus : plus de clignotement quand la
+personne est sur une frontière.
+
+Tout l'état de la grille est dans des tableaux numpy (rows × cols) :
+    active            -> état filtré
+    on_count          -> frames consécutives vues
+    off_count         -> frames consécutives non vues
+    enter_t / exit_t  -> instants du dernier passage ON / OFF
+et update() traite toute la grille en quelques opérations vectorisées ;
+seuls les changements d'état produisent des CellEvent ("enter" / "exit"),
+avec la durée de présence pour "exit". Si dwell_tick_s est fixé, chaque
+cellule active émet aussi un "dwell" périodique (durée de présence).
+
+Les CellEvent sont diffusés aux sorties (audio, DMX, journal) par
+src/event_bus.py.
+
+Utilisé par GridUI (position 3D → cellule) et par le pont DMX/Audio
+(src/orbbec/dmx_audio_bridge.py).
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+# Plafond des compteurs (évite tout débordement sur une longue présence)
+_COUNT_MAX = np.iinfo(np.uint16).max
+
+
+CELL_EVENT_KINDS = ("enter", "exit", "dwell", "occupancy")
+
+
+@dataclass(frozen=True)
+class CellEvent:
+    kind: str          # voir CELL_EVENT_KINDS
+    row: int
+    col: int
+    t: float           # instant de l'événement (time.monotonic)
+    dwell_s: float = 0.0   # durée de présence ("exit", "dwell")
+    level: float = 0.0     # hauteur max occupée en m ("occupancy")
+
+    @property
+    def cell_id(self) -> str:
+        return f"{self.row},{self.col}"
+
+
+class CellStateEngine:
+    """Hystérésis ON/OFF par cellule, vectorisée sur toute la grille."""
+
+    def __init__(
+        self,
+        rows: int,
+        cols: int,
+        activate_n: int = 3,
+        deactivate_n: int = 6,
+        dwell_tick_s: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        activate_n   : frames vues d'affilée pour passer ON.
+        deactivate_n : frames non vues d'affilée pour repasser OFF.
+        dwell_tick_s : période des événements "dwell" des cellules actives
+                       (None = pas d'événement "dwell").
+        """
+        self.activate_n = max(1, int(activate_n))
+        self.deactivate_n = max(1, int(deactivate_n))
+        self.dwell_tick_s = dwell_tick_s
+        self._clock = clock
+        self._allocate(rows, cols)
+
+    def _allocate(self, rows: int, cols: int) -> None:
+        self.rows = int(rows)
+        self.cols = int(cols)
+        shape = (self.rows, self.cols)
+        self.active = np.zeros(shape, dtype=bool)
+        self.on_count = np.zeros(shape, dtype=np.uint16)
+        self.off_count = np.zeros(shape, dtype=np.uint16)
+        self.enter_t = np.zeros(shape, dtype=np.float64)
+        self.exit_t = np.zeros(shape, dtype=np.float64)
+        self.tick_t = np.zeros(shape, dtype=np.float64)
+        self._observed = np.zeros(shape, dtype=bool)
+
+    # ------------------------------------------------------------------
+
+    def resize(self, rows: int, cols: int) -> None:
+        """Nouvelle taille de grille : l'état est remis à zéro."""
+        if (int(rows), int(cols)) != (self.rows, self.cols):
+            self._allocate(rows, cols)
+
+    def reset(self) -> List[CellEvent]:
+        """Relâche toutes les cellules actives ; retourne les événements "exit"."""
+        now = self._clock()
+        events = self._events(np.zeros_like(self.active), self.active.copy(), now)
+        self.active.fill(False)
+        self.on_count.fill(0)
+        self.off_count.fill(0)
+        return events
+
+    def update(
+        self,
+        observed: Union[np.ndarray, Iterable[Tuple[int, int]], None],
+        now: Optional[float] = None,
+    ) -> List[CellEvent]:
+        """
+        Ajoute une frame d'observation.
+
+        observed : masque booléen (rows, cols), ou liste de (r, c) vus,
+                   ou None (rien vu). Les (r, c) hors grille sont ignorés.
+        Retourne les événements "enter" / "exit" (et "dwell") de cette frame.
+        """
+        now = self._clock() if now is None else float(now)
+        obs = self._as_mask(observed)
+
+        # Compteurs : +1 (plafonné) du côté observé, remise à zéro de l'autre
+        np.minimum(self.on_count, _COUNT_MAX - 1, out=self.on_count)
+        np.minimum(self.off_count, _COUNT_MAX - 1, out=self.off_count)
+        self.on_count += 1
+        self.off_count += 1
+        self.on_count *= obs
+        self.off_count *= ~obs
+
+        entering = obs & ~self.active & (self.on_count >= self.activate_n)
+        leaving = ~obs & self.active & (self.off_count >= self.deactivate_n)
+
+        events = []
+        if entering.any() or leaving.any():
+            events = self._events(entering, leaving, now)
+            self.active |= entering
+            self.active &= ~leaving
+            self.enter_t[entering] = now
+            self.tick_t[entering] = now
+            self.exit_t[leaving] = now
+
+        # Présence périodique des cellules restées actives
+        if self.dwell_tick_s is not None:
+            due = self.active & (now - self.tick_t >= self.dwell_tick_s)
+            if due.any():
+                self.tick_t[due] = now
+                events += [CellEvent("dwell", int(r), int(c), now, float(now - self.enter_t[r, c]))
+                           for r, c in np.argwhere(due)]
+        return events
+
+    def dwell_s(self, now: Optional[float] = None) -> np.ndarray:
+        """(rows, cols) durée de présence des cellules actives (0 sinon)."""
+        now = self._clock() if now is None else float(now)
+        return np.where(self.active, now - self.enter_t, 0.0)
+
+    def active_cells(self) -> List[Tuple[int, int]]:
+        return [(int(r), int(c)) for r, c in np.argwhere(self.active)]
+
+    # ------------------------------------------------------------------
+
+    def _as_mask(self, observed) -> np.ndarray:
+        if isinstance(observed, np.ndarray) and observed.dtype == bool:
+            if observed.shape != self._observed.shape:
+                raise ValueError(
+                    f"Masque {observed.shape} ≠ grille {self._observed.shape}")
+            return observed
+
+        self._observed.fill(False)
+        for r, c in observed or ():
+            if 0 <= r < self.rows and 0 <= c < self.cols:
+                self._observed[r, c] = True
+        return self._observed
+
+    def _events(self, entering: np.ndarray, leaving: np.ndarray, now: float) -> List[CellEvent]:
+        events = [CellEvent("exit", int(r), int(c), now, float(now - self.enter_t[r, c]))
+                  for r, c in np.argwhere(leaving)]
+        events += [CellEvent("enter", int(r), int(c), now)
+                   for r, c in np.argwhere(entering)]
+        return events
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+control_engine.py
+Chambre Sonore – Paramètres continus à cadence de contrôle (gain par cellule).
+
+Le gain de chaque cellule active est dérivé, à `rate_hz` (100 Hz par
+défaut) et indépendamment de la cadence caméra, de :
+    - la distance de la personne au centre de la cellule
+      (1 au centre, 0 à `radius_m`, par défaut la demi-diagonale) ;
+    - la durée de présence (montée 1 - exp(-dwell / dwell_tau_s)) ;
+    - l'occupation (hauteur max occupée / occupancy_ref_m).
+    cible = actif × (min_gain + (1 - min_gain) × moyenne pondérée)
+
+La caméra (~15–30 fps) ne fait que déposer ses dernières mesures
+(set_targets, set_state) ; le thread de contrôle calcule la cible de
+toute la grille en numpy, la lisse par un filtre à un pôle
+(smoothing_ms) et pousse au moteur audio, cellule par cellule, les gains
+qui ont bougé de plus de `epsilon` : une suite de petits pas à 100 Hz
+au lieu de sauts à chaque frame (pas d'effet « zipper »).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class ControlConfig:
+    enabled: bool = True
+    rate_hz: float = 100.0
+    min_gain: float = 0.3
+    w_distance: float = 0.5
+    w_dwell: float = 0.3
+    w_occupancy: float = 0.2
+    radius_m: float = 0.0          # 0 = demi-diagonale de la cellule
+    dwell_tau_s: float = 4.0
+    occupancy_ref_m: float = 1.7
+    smoothing_ms: float = 120.0
+    epsilon: float = 0.002         # variation min. poussée au moteur audio
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ControlConfig":
+        base = cls()
+        return cls(**{k: type(getattr(base, k))(d[k]) for k in base.to_dict() if k in d})
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class ControlEngine:
+    """Gain lissé par cellule, calculé et poussé à cadence fixe sur un thread dédié."""
+
+    def __init__(
+        self,
+        rows: int,
+        cols: int,
+        config: Optional[ControlConfig] = None,
+        on_gain: Optional[Callable[[int, int, float], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.config = config or ControlConfig()
+        self.on_gain = on_gain
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._targets = np.zeros((0, 2), dtype=np.float64)
+        self.room_width_m = 1.0
+        self.room_depth_m = 1.0
+        self.steps = 0
+        self.pushes = 0
+        self._allocate(rows, cols)
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _allocate(self, rows: int, cols: int) -> None:
+        self.rows = int(rows)
+        self.cols = int(cols)
+        shape = (self.rows, self.cols)
+        self.active = np.zeros(shape, dtype=bool)
+        self.dwell_s = np.zeros(shape, dtype=np.float64)
+        self.occupancy_m = np.zeros(shape, dtype=np.float64)
+        self.target = np.zeros(shape, dtype=np.float64)
+        self.gain = np.zeros(shape, dtype=np.float64)
+        self._pushed = np.zeros(shape, dtype=np.float64)
+        self._set_centers()
+
+    def _set_centers(self) -> None:
+        cw = self.room_width_m / max(1, self.cols)
+        ch = self.room_depth_m / max(1, self.rows)
+        cy, cx = np.meshgrid((np.arange(self.rows) + 0.5) * ch,
+                             (np.arange(self.cols) + 0.5) * cw, indexing="ij")
+        self._centers = np.stack([cx, cy], axis=-1)            # (rows, cols, 2)
+        self._radius = self.config.radius_m or 0.5 * float(np.hypot(cw, ch))
+
+    # ------------------------------------------------------------------
+    # Entrées (thread caméra / UI) : dernières valeurs seulement
+    # ------------------------------------------------------------------
+
+    def set_geometry(self, room_width_m: float, room_depth_m: float,
+                     rows: int, cols: int) -> None:
+        with self._lock:
+            self.room_width_m = float(room_width_m)
+            self.room_depth_m = float(room_depth_m)
+            if (int(rows), int(cols)) != (self.rows, self.cols):
+                self._allocate(rows, cols)
+            else:
+                self._set_centers()
+
+    def set_targets(self, points: Sequence[Tuple[float, float]]) -> None:
+        """Positions (x, y) au sol des personnes suivies (repère pièce, m)."""
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        with self._lock:
+            self._targets = pts
+
+    def set_state(self, active: np.ndarray, dwell_s: np.ndarray,
+                  occupancy_m: Optional[np.ndarray] = None) -> None:
+        """État filtré des cellules, durée de présence (s), hauteur occupée (m)."""
+        with self._lock:
+            if active.shape != self.active.shape:
+                return
+            np.copyto(self.active, active)
+            np.copyto(self.dwell_s, dwell_s)
+            if occupancy_m is not None and occupancy_m.shape == self.occupancy_m.shape:
+                np.copyto(self.occupancy_m, occupancy_m)
+
+    # ------------------------------------------------------------------
+    # Pas de contrôle
+    # ------------------------------------------------------------------
+
+    def step(self, dt: Optional[float] = None) -> np.ndarray:
+        """Un pas : cible de toute la grille, lissage, envoi des gains modifiés."""
+        cfg = self.config
+        dt = 1.0 / cfg.rate_hz if dt is None else float(dt)
+        with self._lock:
+            if self._targets.shape[0]:
+                diff = self._centers[:, :, None, :] - self._targets[None, None, :, :]
+                dist = np.sqrt((diff * diff).sum(axis=-1)).min(axis=-1)
+                g_dist = np.clip(1.0 - dist / self._radius, 0.0, 1.0)
+            else:
+                g_dist = np.ones_like(self.gain)
+            g_dwell = 1.0 - np.exp(-self.dwell_s / max(1e-3, cfg.dwell_tau_s))
+            g_occ = np.clip(self.occupancy_m / max(1e-3, cfg.occupancy_ref_m), 0.0, 1.0)
+
+            w = cfg.w_distance + cfg.w_dwell + cfg.w_occupancy
+            mix = (cfg.w_distance * g_dist + cfg.w_dwell * g_dwell
+                   + cfg.w_occupancy * g_occ) / max(1e-9, w)
+            np.multiply(self.active, cfg.min_gain + (1.0 - cfg.min_gain) * mix, out=self.target)
+
+            # Filtre à un pôle : y += (1 - a) (cible - y)
+            a = np.exp(-dt / max(1e-4, cfg.smoothing_ms * 1e-3))
+            self.gain += (1.0 - a) * (self.target - self.gain)
+
+            moved = self.active & (np.abs(self.gain - self._pushed) > cfg.epsilon)
+            cells = np.argwhere(moved)
+            self._pushed[moved] = self.gain[moved]
+            gains = self.gain[moved].tolist()
+        self.steps += 1
+
+        if self.on_gain is not None:
+            for (r, c), g in zip(cells.tolist(), gains):
+                self.on_gain(r, c, g)
+            self.pushes += len(gains)
+        return self.gain
+
+    def gain_of(self, r: int, c: int) -> float:
+        """Gain lissé courant (pour démarrer une voix au bon niveau)."""
+        with self._lock:
+            if 0 <= r < self.rows and 0 <= c < self.cols:
+                return float(self.gain[r, c])
+        return 0.0
+
+    # ------------------------------------------------------------------
+    # Cadence fixe
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None or not self.config.enabled:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="control", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        period = 1.0 / max(1.0, self.config.rate_hz)
+        next_t = self._clock()
+        while not self._stop.is_set():
+            try:
+                self.step(period)
+            except Exception as e:
+                print(f"[Contrôle] Erreur : {e!r}")
+            next_t += period
+            delay = next_t - self._clock()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_t = self._clock()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
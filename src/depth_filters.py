@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+"""
+depth_filters.py
+Chambre Sonore – Filtrage de la profondeur (uint16, millimètres).
+
+Étage inséré entre l'acquisition (PipelineOrbbec.poll) et le mapping 3D
+(ZoneMapper3D). Remplace le filtre bilatéral OpenCV désactivé dans
+Y16DepthConverter (segfault).
+
+SpatialDepthFilter (sur une frame) :
+    - suppression des « speckles » (petites taches isolées, cv2.filterSpeckles)
+    - bouchage des petits trous par morphologie min (surface la plus proche,
+      récupère les membres) ou max (fond), en quelques passes 3×3
+    - lissage optionnel préservant les bords (médiane 3×3 / 5×5, supportée
+      en uint16 par OpenCV), sans passer par le filtre bilatéral
+
+TemporalDepthFilter :
+    - anneau préalloué (N, H, W) uint16 des N dernières frames
+    - mode "median" : médiane par pixel sur l'anneau, pixels invalides (0)
+      ignorés ; tri par réseau de comparaisons min/max en place
+    - mode "ema"    : moyenne exponentielle par pixel, avec réinitialisation
+      sur saut important (mouvement) et oubli après `hold` frames invalides
+    - aucun tableau de taille (H, W) n'est alloué après la première frame
+
+DepthDecimator (réduction de résolution avant tout calcul flottant) :
+    - "stride" : un pixel sur f (centre du bloc), le moins coûteux
+    - "min"    : minimum valide du bloc f×f (surface la plus proche : une
+      personne n'est jamais « diluée » dans le fond)
+    - "median" : médiane des valeurs valides du bloc (robuste au bruit)
+
+Le tableau retourné par process() est un tampon interne réutilisé à la
+frame suivante : le copier si on veut le conserver.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+TEMPORAL_MODES = ("off", "median", "ema")
+HOLE_FILL_MODES = ("off", "min", "max")
+SMOOTH_MODES = ("off", "median3", "median5")
+DECIMATION_MODES = ("off", "stride", "min", "median")
+
+
+def _sort_axis0(work: np.ndarray, tmp: np.ndarray) -> None:
+    """Tri en place le long de l'axe 0 par transposition pair/impair.
+
+    m passes de min/max sur des tableaux (H, W) : bien plus rapide que
+    np.sort(axis=0) pour les petites profondeurs (m ≤ 16).
+    """
+    m = work.shape[0]
+    for rnd in range(m):
+        for i in range(rnd % 2, m - 1, 2):
+            np.minimum(work[i], work[i + 1], out=tmp)
+            np.maximum(work[i], work[i + 1], out=work[i + 1])
+            np.copyto(work[i], tmp)
+
+
+def _take_valid_median(work: np.ndarray, count: np.ndarray, mid: np.ndarray,
+                       cols: np.ndarray, lin: np.ndarray, out: np.ndarray) -> None:
+    """Médiane (basse) des valeurs valides de `work` trié (m, H, W), 0 en tête.
+
+    indice = (m - count) + (count - 1) // 2 ; count == 0 → indice m - 1,
+    qui vaut 0 (que des invalides).
+    """
+    m = work.shape[0]
+    np.subtract(count, 1, out=mid)
+    np.floor_divide(mid, 2, out=mid)
+    np.subtract(mid, count, out=mid)
+    np.add(mid, m, out=mid)
+
+    hw = cols.size
+    np.multiply(mid.reshape(-1), hw, out=lin)
+    np.add(lin, cols, out=lin)
+    np.take(work.reshape(-1), lin, out=out.reshape(-1), mode="clip")
+
+
+# ----------------------------------------------------------------------
+# Filtre spatial
+# ----------------------------------------------------------------------
+
+@dataclass
+class SpatialFilterConfig:
+    # Speckles : taches de moins de speckle_size pixels dont la profondeur
+    # diffère de plus de speckle_diff_mm de leur voisinage → 0
+    speckle_size: int = 60
+    speckle_diff_mm: int = 40
+
+    # Trous : "min" (surface la plus proche), "max" (fond) ou "off" ;
+    # chaque passe 3×3 bouche 1 pixel de bord → trous ≤ 2·passes pixels
+    hole_fill: str = "min"
+    hole_passes: int = 2
+
+    # Lissage préservant les bords : "median3", "median5" ou "off"
+    smooth: str = "off"
+
+
+class SpatialDepthFilter:
+    """Nettoyage spatial d'une frame de profondeur uint16 (mm)."""
+
+    def __init__(self, config: Optional[SpatialFilterConfig] = None) -> None:
+        self.cfg = config or SpatialFilterConfig()
+        if self.cfg.hole_fill not in HOLE_FILL_MODES:
+            raise ValueError(f"Mode de bouchage inconnu : {self.cfg.hole_fill}")
+        if self.cfg.smooth not in SMOOTH_MODES:
+            raise ValueError(f"Mode de lissage inconnu : {self.cfg.smooth}")
+
+        self._kernel = np.ones((3, 3), dtype=np.uint8)
+        self._shape: Optional[Tuple[int, int]] = None
+
+    def _allocate(self, shape: Tuple[int, int]) -> None:
+        h, w = shape
+        self._shape = (h, w)
+        self._out = np.zeros((h, w), dtype=np.uint16)
+        self._tmp = np.zeros((h, w), dtype=np.uint16)
+        self._morph = np.zeros((h, w), dtype=np.uint16)
+        self._mask = np.zeros((h, w), dtype=bool)
+        self._sat = np.zeros((h, w), dtype=bool)
+
+    # ------------------------------------------------------------------
+
+    def process(self, depth_mm: np.ndarray) -> np.ndarray:
+        """Retourne la profondeur nettoyée (tampon interne réutilisé)."""
+        if depth_mm.shape != self._shape:
+            self._allocate(depth_mm.shape)
+
+        cfg = self.cfg
+        out = self._out
+        np.copyto(out, depth_mm, casting="unsafe")
+
+        # 1) Speckles (OpenCV travaille en int16 : profondeurs < 32.7 m)
+        if cfg.speckle_size > 0:
+            cv2.filterSpeckles(out.view(np.int16), 0, int(cfg.speckle_size),
+                               int(cfg.speckle_diff_mm))
+
+        # 2) Bouchage des petits trous
+        if cfg.hole_fill != "off":
+            for _ in range(max(0, int(cfg.hole_passes))):
+                self._fill_pass(out)
+
+        # 3) Lissage médian (préserve les bords) ; les 0 restants restent 0
+        if cfg.smooth != "off":
+            ksize = 3 if cfg.smooth == "median3" else 5
+            cv2.medianBlur(out, ksize, dst=self._tmp)
+            np.equal(out, 0, out=self._mask)
+            np.copyto(out, self._tmp)
+            np.copyto(out, 0, where=self._mask)
+
+        return out
+
+    def _fill_pass(self, out: np.ndarray) -> None:
+        """Une passe 3×3 : chaque pixel nul prend le min (ou max) de ses voisins valides."""
+        zero = self._mask
+        np.equal(out, 0, out=zero)
+        if not zero.any():
+            return
+
+        if self.cfg.hole_fill == "min":
+            # 0 → 65535 pour que l'érosion ignore les invalides
+            np.copyto(self._tmp, out)
+            np.copyto(self._tmp, 65535, where=zero)
+            cv2.erode(self._tmp, self._kernel, dst=self._morph)
+            np.equal(self._morph, 65535, out=self._sat)
+            np.copyto(self._morph, 0, where=self._sat)
+        else:
+            cv2.dilate(out, self._kernel, dst=self._morph)
+
+        np.copyto(out, self._morph, where=zero)
+
+
+# ----------------------------------------------------------------------
+# Filtre temporel
+# ----------------------------------------------------------------------
+
+
+class TemporalDepthFilter:
+    """Filtre temporel par pixel sur les N dernières frames de profondeur."""
+
+    def __init__(
+        self,
+        window: int = 5,
+        mode: str = "median",
+        alpha: float = 0.4,
+        jump_mm: int = 150,
+        hold: int = 3,
+    ) -> None:
+        """
+        window  : N, nombre de frames conservées (mode median).
+        mode    : "median" ou "ema".
+        alpha   : coefficient de la moyenne exponentielle (mode ema).
+        jump_mm : écart au-delà duquel l'EMA repart de la mesure brute
+                  (évite la traînée quand quelqu'un bouge).
+        hold    : nombre de frames invalides tolérées avant de rendre 0 (ema).
+        """
+        if mode not in ("median", "ema"):
+            raise ValueError(f"Mode de filtre temporel inconnu : {mode}")
+
+        self.window = max(1, int(window))
+        self.mode = mode
+        self.alpha = float(alpha)
+        self.jump_mm = float(jump_mm)
+        self.hold = int(hold)
+
+        self._shape: Optional[Tuple[int, int]] = None
+
+    # ------------------------------------------------------------------
+
+    def reset(self) -> None:
+        """Oublie l'historique (les tampons seront réalloués à la prochaine frame)."""
+        self._shape = None
+
+    def _allocate(self, shape: Tuple[int, int]) -> None:
+        h, w = shape
+        n = self.window
+        self._shape = (h, w)
+        self._out = np.zeros((h, w), dtype=np.uint16)
+
+        if self.mode == "median":
+            self._ring = np.zeros((n, h, w), dtype=np.uint16)
+            self._work = np.zeros((n, h, w), dtype=np.uint16)
+            self._tmp = np.zeros((h, w), dtype=np.uint16)
+            self._valid = np.zeros((h, w), dtype=bool)
+            self._count = np.zeros((h, w), dtype=np.int32)   # frames valides dans l'anneau
+            self._mid = np.zeros((h, w), dtype=np.int32)
+            self._cols = np.arange(h * w, dtype=np.int64)
+            self._lin = np.zeros(h * w, dtype=np.int64)
+            self._pos = 0
+            self._filled = 0
+        else:
+            self._state = np.zeros((h, w), dtype=np.float32)
+            self._delta = np.zeros((h, w), dtype=np.float32)
+            self._abs = np.zeros((h, w), dtype=np.float32)
+            self._miss = np.zeros((h, w), dtype=np.uint8)
+            self._valid = np.zeros((h, w), dtype=bool)
+            self._mask = np.zeros((h, w), dtype=bool)
+            self._tmp_mask = np.zeros((h, w), dtype=bool)
+
+    # ------------------------------------------------------------------
+
+    def process(self, depth_mm: np.ndarray) -> np.ndarray:
+        """Ajoute une frame uint16 (mm) et retourne la profondeur filtrée (uint16)."""
+        if depth_mm.shape != self._shape:
+            self._allocate(depth_mm.shape)
+
+        if self.mode == "median":
+            return self._process_median(depth_mm)
+        return self._process_ema(depth_mm)
+
+    # ------------------------------------------------------------------
+
+    def _process_median(self, depth_mm: np.ndarray) -> np.ndarray:
+        n = self.window
+        slot = self._ring[self._pos]
+
+        # Compteur de frames valides : retirer la frame éjectée, ajouter la nouvelle
+        if self._filled == n:
+            np.greater(slot, 0, out=self._valid)
+            np.subtract(self._count, self._valid, out=self._count)
+        np.copyto(slot, depth_mm, casting="unsafe")
+        np.greater(slot, 0, out=self._valid)
+        np.add(self._count, self._valid, out=self._count)
+
+        self._pos = (self._pos + 1) % n
+        self._filled = min(self._filled + 1, n)
+        m = self._filled
+
+        # Tri par transposition pair/impair ; les 0 (invalides) en tête.
+        work = self._work[:m]
+        np.copyto(work, self._ring[:m])
+        _sort_axis0(work, self._tmp)
+
+        # Médiane (basse) des seules valeurs valides
+        _take_valid_median(work, self._count, self._mid, self._cols, self._lin, self._out)
+        return self._out
+
+    # ------------------------------------------------------------------
+
+    def _process_ema(self, depth_mm: np.ndarray) -> np.ndarray:
+        state, delta, absd = self._state, self._delta, self._abs
+        valid, mask, tmp = self._valid, self._mask, self._tmp_mask
+
+        np.greater(depth_mm, 0, out=valid)
+        np.copyto(delta, depth_mm, casting="unsafe")
+        np.subtract(delta, state, out=delta)
+
+        # Repartir de la mesure brute : état vide ou saut important (mouvement)
+        np.abs(delta, out=absd)
+        np.greater(absd, self.jump_mm, out=mask)
+        np.equal(state, 0, out=tmp)
+        np.logical_or(mask, tmp, out=mask)
+        np.logical_and(mask, valid, out=mask)
+        np.copyto(state, depth_mm, where=mask, casting="unsafe")
+        np.copyto(delta, 0, where=mask)
+
+        # Mise à jour EMA des pixels valides
+        np.multiply(delta, self.alpha, out=delta)
+        np.add(state, delta, out=state, where=valid)
+
+        # Pixels invalides : on garde l'état `hold` frames puis on rend 0
+        np.logical_not(valid, out=tmp)
+        np.minimum(self._miss, 254, out=self._miss)
+        np.add(self._miss, 1, out=self._miss, where=tmp)
+        np.copyto(self._miss, 0, where=valid)
+        np.greater(self._miss, self.hold, out=mask)
+        np.copyto(state, 0, where=mask)
+
+        np.copyto(self._out, state, casting="unsafe")
+        return self._out
+
+
+# ----------------------------------------------------------------------
+# Décimation
+# ----------------------------------------------------------------------
+
+
+class DepthDecimator:
+    """Réduit une frame uint16 (mm) d'un facteur entier, en restant en uint16."""
+
+    def __init__(self, mode: str = "min", factor: int = 2) -> None:
+        if mode not in DECIMATION_MODES:
+            raise ValueError(f"Mode de décimation inconnu : {mode}")
+        self.mode = mode
+        self.factor = max(1, int(factor))
+        self._shape: Optional[Tuple[int, int]] = None
+
+    @property
+    def active(self) -> bool:
+        return self.mode != "off" and self.factor > 1
+
+    def output_shape(self, shape: Tuple[int, int]) -> Tuple[int, int]:
+        if not self.active:
+            return tuple(shape)
+        return (shape[0] // self.factor, shape[1] // self.factor)
+
+    def _allocate(self, shape: Tuple[int, int]) -> None:
+        f = self.factor
+        h, w = shape[0] // f, shape[1] // f
+        self._shape = tuple(shape)
+        self._out = np.zeros((h, w), dtype=np.uint16)
+        if self.mode == "min":
+            self._tmp = np.zeros((h, w), dtype=np.uint16)
+        elif self.mode == "median":
+            # Les f×f pixels de chaque bloc empilés : (f², h, w)
+            self._work = np.zeros((f * f, h, w), dtype=np.uint16)
+            self._tmp = np.zeros((h, w), dtype=np.uint16)
+            self._valid = np.zeros((h, w), dtype=bool)
+            self._count = np.zeros((h, w), dtype=np.int32)
+            self._mid = np.zeros((h, w), dtype=np.int32)
+            self._cols = np.arange(h * w, dtype=np.int64)
+            self._lin = np.zeros(h * w, dtype=np.int64)
+
+    # ------------------------------------------------------------------
+
+    def process(self, depth_mm: np.ndarray) -> np.ndarray:
+        """Retourne la frame décimée (tampon interne), ou l'entrée si inactif."""
+        if not self.active:
+            return depth_mm
+        if depth_mm.shape != self._shape:
+            self._allocate(depth_mm.shape)
+
+        f = self.factor
+        h, w = self._out.shape
+        out = self._out
+
+        if self.mode == "stride":
+            o = f // 2
+            np.copyto(out, depth_mm[o:h * f:f, o:w * f:f])
+
+        elif self.mode == "min":
+            # 0 - 1 → 65535 (uint16) : les invalides perdent le min ;
+            # un bloc entièrement invalide revient à 0 après le + 1
+            tmp = self._tmp
+            np.subtract(depth_mm[0:h * f:f, 0:w * f:f], 1, out=out)
+            for i in range(f):
+                for j in range(f):
+                    if i == 0 and j == 0:
+                        continue
+                    np.subtract(depth_mm[i:h * f:f, j:w * f:f], 1, out=tmp)
+                    np.minimum(out, tmp, out=out)
+            np.add(out, 1, out=out)
+
+        else:
+            work = self._work
+            np.copyto(self._count, 0)
+            for k in range(f * f):
+                i, j = divmod(k, f)
+                np.copyto(work[k], depth_mm[i:h * f:f, j:w * f:f])
+                np.greater(work[k], 0, out=self._valid)
+                np.add(self._count, self._valid, out=self._count)
+            _sort_axis0(work, self._tmp)
+            _take_valid_median(work, self._count, self._mid, self._cols, self._lin, out)
+
+        return out
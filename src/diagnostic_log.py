@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+diagnostic_log.py
+Canal de diagnostic borné pour la Chambre Sonore (indépendant de Qt).
+
+- Journal en anneau de taille fixe (collections.deque(maxlen)) : la mémoire
+  ne grandit plus au fil d'une journée de spectacle.
+- Niveaux de sévérité (mêmes valeurs numériques que le module logging).
+- Limitation de débit par clé : un message répété à chaque frame n'est
+  enregistré qu'une fois par intervalle.
+- Statistiques "live" (fps, nombres de points, temps par étape) stockées
+  comme valeurs écrasées en place, jamais ajoutées au journal.
+
+Le widget DiagnosticPanel (diagnostic_panel.py) lit ce canal au rythme
+de rafraîchissement de l'interface.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {
+    DEBUG: "DEBUG",
+    INFO: "INFO",
+    WARNING: "WARN",
+    ERROR: "ERREUR",
+}
+
+
+@dataclass
+class DiagnosticEntry:
+    seq: int
+    timestamp: float   # time.time()
+    level: int
+    message: str
+
+    def format(self) -> str:
+        hms = time.strftime("%H:%M:%S", time.localtime(self.timestamp))
+        return f"{hms} [{LEVEL_NAMES.get(self.level, self.level)}] {self.message}"
+
+
+class DiagnosticLog:
+    """Journal en anneau + statistiques live, utilisable depuis plusieurs threads."""
+
+    def __init__(self, capacity: int = 500, min_level: int = INFO) -> None:
+        self.capacity = max(1, int(capacity))
+        self.min_level = int(min_level)
+
+        self._entries: Deque[DiagnosticEntry] = deque(maxlen=self.capacity)
+        self._lock = threading.Lock()
+        self._seq = 0
+
+        # Limitation de débit : clé → dernier instant d'écriture
+        self._last_by_key: Dict[str, float] = {}
+
+        # Statistiques live
+        self._stats: Dict[str, object] = {}
+        self._timings_ms: Dict[str, float] = {}
+        self._frame_times: Deque[float] = deque(maxlen=30)
+
+    # ------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------
+
+    def log(self, level: int, message: str, key: Optional[str] = None,
+            interval_s: float = 1.0) -> bool:
+        """
+        Ajoute un message au journal.
+
+        key : si fourni, le message n'est écrit qu'une fois par interval_s
+              pour cette clé (les autres appels sont ignorés).
+        Retourne True si le message a été enregistré.
+        """
+        if level < self.min_level:
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            if key is not None:
+                last = self._last_by_key.get(key)
+                if last is not None and now - last < interval_s:
+                    return False
+                self._last_by_key[key] = now
+
+            self._seq += 1
+            self._entries.append(DiagnosticEntry(
+                seq=self._seq,
+                timestamp=time.time(),
+                level=int(level),
+                message=str(message),
+            ))
+        return True
+
+    def debug(self, message: str, **kw) -> bool:
+        return self.log(DEBUG, message, **kw)
+
+    def info(self, message: str, **kw) -> bool:
+        return self.log(INFO, message, **kw)
+
+    def warning(self, message: str, **kw) -> bool:
+        return self.log(WARNING, message, **kw)
+
+    def error(self, message: str, **kw) -> bool:
+        return self.log(ERROR, message, **kw)
+
+    def entries_since(self, seq: int) -> List[DiagnosticEntry]:
+        """Entrées plus récentes que seq (celles déjà éjectées de l'anneau sont perdues)."""
+        with self._lock:
+            if not self._entries or self._entries[-1].seq <= seq:
+                return []
+            return [e for e in self._entries if e.seq > seq]
+
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._seq
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._last_by_key.clear()
+
+    # ------------------------------------------------------------------
+    # Statistiques live
+    # ------------------------------------------------------------------
+
+    def set_stat(self, name: str, value) -> None:
+        """Écrase la valeur courante d'une statistique (pas d'historique)."""
+        with self._lock:
+            self._stats[name] = value
+
+    def record_timing(self, stage: str, ms: float, alpha: float = 0.2) -> None:
+        """Temps d'une étape (ms), lissé par moyenne exponentielle."""
+        with self._lock:
+            prev = self._timings_ms.get(stage)
+            self._timings_ms[stage] = ms if prev is None else prev + alpha * (ms - prev)
+
+    def tick_frame(self) -> None:
+        """À appeler une fois par frame traitée ; alimente la statistique fps."""
+        now = time.monotonic()
+        with self._lock:
+            self._frame_times.append(now)
+            if len(self._frame_times) >= 2:
+                span = self._frame_times[-1] - self._frame_times[0]
+                if span > 0:
+                    self._stats["fps"] = (len(self._frame_times) - 1) / span
+
+    def snapshot(self) -> Dict[str, object]:
+        """Copie des statistiques + temps par étape (clés 't_<étape>' en ms)."""
+        with self._lock:
+            snap = dict(self._stats)
+            for stage, ms in self._timings_ms.items():
+                snap[f"t_{stage}"] = ms
+            return snap
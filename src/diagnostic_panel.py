@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+diagnostic_panel.py
+Panneau Qt de diagnostic : statistiques live + journal borné.
+
+- Les statistiques (fps, points, temps par étape, position, cellule) sont
+  affichées dans des QLabel mis à jour EN PLACE (setText seulement si la
+  valeur a changé).
+- Le journal est un QPlainTextEdit limité à `capacity` blocs : les plus
+  anciennes lignes disparaissent, le document ne grandit pas.
+- Le rafraîchissement est cadencé par un QTimer (refresh_ms) et non par
+  le flux des frames.
+"""
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QFont
+from PyQt6.QtWidgets import QGridLayout, QLabel, QPlainTextEdit, QVBoxLayout, QWidget
+
+from src.diagnostic_log import DiagnosticLog
+
+
+class DiagnosticPanel(QWidget):
+    """Vue Qt d'un DiagnosticLog, rafraîchie à cadence fixe."""
+
+    # Statistiques affichées : (clé, libellé, format)
+    STATS = [
+        ("fps", "FPS", "{:.1f}"),
+        ("cloud_points", "Points nuage", "{:d}"),
+        ("ground_points", "Points sol", "{:d}"),
+        ("xy_range", "Plage XY", "{}"),
+        ("position", "Position", "{}"),
+        ("cell", "Cellule", "{}"),
+        ("posture", "Posture", "{}"),
+        ("t_acquisition", "Acquisition (ms)", "{:.1f}"),
+        ("t_cloud", "Nuage 3D (ms)", "{:.1f}"),
+        ("t_ground", "Projection sol (ms)", "{:.1f}"),
+        ("t_position", "Position (ms)", "{:.1f}"),
+        ("t_total", "Total frame (ms)", "{:.1f}"),
+        ("quality", "Qualité", "{}"),
+    ]
+
+    def __init__(self, diag: DiagnosticLog, refresh_ms: int = 250, parent=None):
+        super().__init__(parent)
+        self.diag = diag
+        self._last_seq = 0
+        self._shown = {}
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        # Statistiques (deux colonnes libellé / valeur)
+        stats_layout = QGridLayout()
+        stats_layout.setHorizontalSpacing(12)
+        stats_layout.setVerticalSpacing(2)
+        self._value_labels = {}
+        half = (len(self.STATS) + 1) // 2
+        for i, (key, title, _fmt) in enumerate(self.STATS):
+            row, col = i % half, (i // half) * 2
+            stats_layout.addWidget(QLabel(title + " :", self), row, col)
+            value = QLabel("–", self)
+            value.setStyleSheet("font-weight:bold;")
+            stats_layout.addWidget(value, row, col + 1)
+            self._value_labels[key] = value
+        layout.addLayout(stats_layout)
+
+        # Journal borné
+        self.log_view = QPlainTextEdit(self)
+        self.log_view.setReadOnly(True)
+        self.log_view.setMaximumBlockCount(diag.capacity)
+        self.log_view.setMinimumHeight(120)
+        font = QFont()
+        font.setPixelSize(15)
+        self.log_view.setFont(font)
+        self.log_view.setStyleSheet(
+            "background:#f5f5f5; color:#000; "
+            "padding:8px; border:1px solid #aaa;"
+        )
+        layout.addWidget(self.log_view)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(int(refresh_ms))
+
+    # ------------------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Met à jour les valeurs en place et ajoute les nouvelles lignes du journal."""
+        snap = self.diag.snapshot()
+        for key, _title, fmt in self.STATS:
+            if key not in snap:
+                continue
+            try:
+                text = fmt.format(snap[key])
+            except (ValueError, TypeError):
+                text = str(snap[key])
+            if self._shown.get(key) != text:
+                self._shown[key] = text
+                self._value_labels[key].setText(text)
+
+        new_entries = self.diag.entries_since(self._last_seq)
+        if new_entries:
+            # Au plus `capacity` lignes à insérer, même après une longue pause
+            for entry in new_entries[-self.diag.capacity:]:
+                self.log_view.appendPlainText(entry.format())
+            self._last_seq = new_entries[-1].seq
+
+    def clear_log(self) -> None:
+        self.diag.clear()
+        self._last_seq = self.diag.last_seq()
+        self.log_view.clear()
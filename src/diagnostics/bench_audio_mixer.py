@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+src/diagnostics/bench_audio_mixer.py
+
+Mixeur numpy (src/audio_mixer.py) hors temps réel, sur les WAV de src/wav.
+
+- coût de render() par bloc avec --voices voix actives, comparé à la
+  durée d'un bloc (budget temps réel)
+- enveloppe lue dans les tables comparée au RMS exact du bloc de chaque
+  voix (calculé ici seulement pour la vérification)
+- enveloppe lissée d'une voix : montée à note_on, descente après note_off
+
+Usage :
+    python -m src.diagnostics.bench_audio_mixer [--voices 12] [--block 512]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+from src.audio_mixer import AudioMixer
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark mixeur audio + enveloppes")
+    p.add_argument("--voices", type=int, default=12)
+    p.add_argument("--block", type=int, default=512)
+    p.add_argument("--samplerate", type=int, default=48000)
+    p.add_argument("--blocks", type=int, default=400)
+    a = p.parse_args(argv)
+
+    wavs = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "wav", "*.wav")))
+    if not wavs:
+        print("Aucun WAV dans src/wav")
+        return 1
+
+    mixer = AudioMixer(a.voices, samplerate=a.samplerate, block=a.block, output=False)
+    keys = [f"v{i}" for i in range(a.voices)]
+    for i, key in enumerate(keys):
+        mixer.load_cell_sound(key, wavs[i % len(wavs)])
+        mixer.note_on(key)
+
+    # 1) Coût par bloc
+    t0 = time.perf_counter()
+    for _ in range(a.blocks):
+        mixer.render()
+    dt = (time.perf_counter() - t0) / a.blocks
+    budget = a.block / a.samplerate
+    print(f"render() {a.voices} voix, blocs de {a.block} : {dt * 1e6:.0f} µs "
+          f"({100.0 * dt / budget:.1f} % d'un bloc de {budget * 1e3:.1f} ms)")
+
+    # 2) Enveloppe par tables vs RMS exact du bloc
+    errs = []
+    for key in keys:
+        v = mixer._voices[key]
+        clip = v.clip
+        idx = (v.pos + np.arange(a.block)) % clip.samples.shape[0]
+        exact = float(np.sqrt(np.mean(clip.samples[idx].mean(axis=1) ** 2)))
+        est, _peak = clip.window(v.pos, a.block, True)
+        if exact > 1e-4:
+            errs.append(abs(est - exact) / exact)
+    print(f"Enveloppe (tables, hop {mixer._clips[keys[0]].hop}) vs RMS exact : "
+          f"écart médian {100.0 * np.median(errs):.1f} %, max {100.0 * np.max(errs):.1f} %")
+
+    # 3) Suivi d'une voix : note_off à mi-parcours
+    mixer.shutdown()
+    mixer = AudioMixer(1, samplerate=a.samplerate, block=a.block, output=False)
+    mixer.load_cell_sound("v0", wavs[0])
+    mixer.note_on("v0")
+    trace = []
+    n = int(0.6 * a.samplerate / a.block)
+    for i in range(2 * n):
+        if i == n:
+            mixer.note_off("v0")
+        mixer.render()
+        trace.append(float(mixer.levels()[0]))
+    marks = [0, n // 4, n // 2, n - 1, n + n // 8, n + n // 2, 2 * n - 1]
+    print("Niveau lissé (0–1) : " + "  ".join(
+        f"{i * a.block / a.samplerate:.2f}s={trace[i]:.2f}" for i in marks))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
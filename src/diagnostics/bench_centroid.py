@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+src/diagnostics/bench_centroid.py
+
+Benchmark du barycentre robuste de la position (src/robust_centroid.py).
+
+Pour chaque estimateur (médiane, moyenne tronquée) et chaque méthode
+(exacte, histogramme) :
+- temps moyen par frame (ms) de detect_person_position
+- écart moyen / maximal (mm) de la version histogramme avec la version
+  exacte du même estimateur
+
+Deux jeux de nuages au sol :
+- « dense » : --points points (défaut 300 000) par frame, une personne
+  (gaussienne) qui se déplace + une fraction de points parasites répartis
+  dans toute la pièce — le pire cas d'un nuage non décimé ;
+- « pièce » : nuages réels du pipeline de mapping sur la pièce synthétique
+  (depth_recording.synthetic_room_sequence) ou sur --record.
+
+Usage :
+    python -m src.diagnostics.bench_centroid [--record session.npy]
+        [--points 300000] [--bin 0.01]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from src.diagnostics.depth_recording import load_recording, synthetic_room_sequence
+from src.robust_centroid import CENTROID_ESTIMATORS, RobustCentroid
+from src.zone_mapper_3d import ZoneMapper3D
+
+
+def dense_clouds(n_frames: int, n_points: int, width: float, depth: float,
+                 clutter: float = 0.2, seed: int = 0):
+    """Nuages (N, 2) float32 : personne gaussienne (σ 15 cm) + points parasites uniformes."""
+    rng = np.random.default_rng(seed)
+    clouds = []
+    n_noise = int(clutter * n_points)
+    for i in range(n_frames):
+        t = i / max(1, n_frames - 1)
+        cx = 0.3 * width + 0.4 * width * t
+        cy = 0.3 * depth + 0.4 * depth * np.sin(np.pi * t)
+        person = rng.normal((cx, cy), 0.15, size=(n_points - n_noise, 2))
+        noise = rng.uniform((0.0, 0.0), (width, depth), size=(n_noise, 2))
+        xy = np.concatenate([person, noise]).astype(np.float32)
+        np.clip(xy[:, 0], 0.0, np.nextafter(np.float32(width), 0), out=xy[:, 0])
+        np.clip(xy[:, 1], 0.0, np.nextafter(np.float32(depth), 0), out=xy[:, 1])
+        clouds.append(xy)
+    return clouds
+
+
+def room_clouds(frames: np.ndarray, mapper: ZoneMapper3D):
+    return [mapper.project_to_ground(mapper.compute_point_cloud(d)) for d in frames]
+
+
+def run(clouds, mapper: ZoneMapper3D, estimator: str, method: str, bin_m: float):
+    """Retourne (ms/frame, positions)."""
+    mapper.centroid = RobustCentroid(estimator, method, bin_m)
+    positions, times = [], []
+    for xy in clouds:
+        t0 = time.perf_counter()
+        pos = mapper.detect_person_position(xy)
+        times.append(time.perf_counter() - t0)
+        positions.append(pos)
+    return 1000.0 * float(np.mean(times)), positions
+
+
+def report(title: str, clouds, mapper: ZoneMapper3D, bin_m: float) -> None:
+    sizes = [xy.shape[0] for xy in clouds]
+    print(f"{title} — {len(clouds)} frames, {int(np.mean(sizes))} points/frame en moyenne")
+    print(f"{'estimateur':<12}{'méthode':<12}{'ms/frame':>10}{'accélér.':>10}"
+          f"{'écart moy mm':>14}{'écart max mm':>14}")
+    for estimator in CENTROID_ESTIMATORS:
+        ref_ms, ref_pos = run(clouds, mapper, estimator, "exact", bin_m)
+        ms, pos = run(clouds, mapper, estimator, "histogram", bin_m)
+        errs = [np.hypot(q[0] - r[0], q[1] - r[1])
+                for q, r in zip(pos, ref_pos) if q is not None and r is not None]
+        mean_mm = 1000.0 * float(np.mean(errs)) if errs else float("nan")
+        max_mm = 1000.0 * float(np.max(errs)) if errs else float("nan")
+        print(f"{estimator:<12}{'exact':<12}{ref_ms:>10.2f}{1.0:>9.1f}×{'-':>14}{'-':>14}")
+        print(f"{estimator:<12}{'histogram':<12}{ms:>10.2f}{ref_ms / ms:>9.1f}×"
+              f"{mean_mm:>14.2f}{max_mm:>14.2f}")
+    print()
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark barycentre robuste (position)")
+    p.add_argument("--record", default=None, help="session .npy (N, H, W) uint16")
+    p.add_argument("--frames", type=int, default=60)
+    p.add_argument("--points", type=int, default=300_000)
+    p.add_argument("--bin", type=float, default=0.01, help="taille des cases (m)")
+    p.add_argument("--room-w", type=float, default=4.33)
+    p.add_argument("--room-d", type=float, default=3.23)
+    a = p.parse_args(argv)
+
+    mapper = ZoneMapper3D(cam_wall_dist_m=a.room_w / 2.0,
+                          room_width_m=a.room_w, room_depth_m=a.room_d)
+    print(f"Cases de {100 * a.bin:.1f} cm, pièce {a.room_w:.2f}×{a.room_d:.2f} m\n")
+
+    report("Nuage dense", dense_clouds(a.frames, a.points, a.room_w, a.room_d), mapper, a.bin)
+
+    if a.record:
+        frames = load_recording(a.record)
+        title = f"Session {a.record}"
+    else:
+        frames, _path = synthetic_room_sequence(mapper, a.frames)
+        title = "Pièce synthétique"
+    report(title, room_clouds(frames, mapper), mapper, a.bin)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
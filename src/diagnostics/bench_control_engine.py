@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+src/diagnostics/bench_control_engine.py
+
+Moteur de contrôle (src/control_engine.py) hors temps réel, horloge simulée.
+
+- coût de step() pour une grille --rows × --cols et --people personnes
+- trajectoire : une personne entre dans une cellule à la cadence caméra
+  (--camera-fps), la traverse puis s'y arrête ; on compare le plus grand
+  saut de gain par pas (100 Hz, lissé) au saut qu'aurait une mise à jour
+  brute à chaque frame caméra
+- nombre d'envois au moteur audio (filtre epsilon)
+
+Usage :
+    python -m src.diagnostics.bench_control_engine [--rows 6] [--cols 6] [--camera-fps 20]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from src.control_engine import ControlConfig, ControlEngine
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark moteur de gain à cadence de contrôle")
+    p.add_argument("--rows", type=int, default=6)
+    p.add_argument("--cols", type=int, default=6)
+    p.add_argument("--people", type=int, default=3)
+    p.add_argument("--rate", type=float, default=100.0)
+    p.add_argument("--camera-fps", type=float, default=20.0)
+    p.add_argument("--steps", type=int, default=5000)
+    a = p.parse_args(argv)
+
+    room_w, room_d = 6.0, 6.0
+    cfg = ControlConfig(rate_hz=a.rate)
+
+    # 1) Coût par pas
+    eng = ControlEngine(a.rows, a.cols, cfg)
+    eng.set_geometry(room_w, room_d, a.rows, a.cols)
+    rng = np.random.default_rng(0)
+    eng.set_targets(rng.uniform(0.0, room_w, size=(a.people, 2)))
+    active = rng.random((a.rows, a.cols)) < 0.3
+    eng.set_state(active, np.where(active, 3.0, 0.0), np.where(active, 1.2, 0.0))
+    t0 = time.perf_counter()
+    for _ in range(a.steps):
+        eng.step()
+    dt = (time.perf_counter() - t0) / a.steps
+    print(f"step() {a.rows}×{a.cols}, {a.people} personnes : {dt * 1e6:.1f} µs "
+          f"({100.0 * dt * a.rate:.2f} % d'un pas de {1e3 / a.rate:.0f} ms)")
+
+    # 2) Trajectoire : traversée de la cellule (0, 0) puis arrêt au centre
+    pushed = []
+    eng = ControlEngine(1, 1, cfg, on_gain=lambda r, c, g: pushed.append(g))
+    eng.set_geometry(room_w / a.cols, room_d / a.rows, 1, 1)
+    cw = room_w / a.cols
+    duration, per_frame = 4.0, int(round(a.rate / a.camera_fps))
+    n = int(duration * a.rate)
+    raw, smooth = [], []
+    for i in range(n):
+        t = i / a.rate
+        if i % per_frame == 0:                       # nouvelle frame caméra
+            x = min(0.5 * cw, t * 0.8 * cw)          # avance puis s'arrête au centre
+            eng.set_targets([(x, 0.5 * room_d / a.rows)])
+            eng.set_state(np.ones((1, 1), bool), np.full((1, 1), t), np.full((1, 1), 1.7))
+        eng.step()
+        raw.append(float(eng.target[0, 0]))
+        smooth.append(float(eng.gain[0, 0]))
+    raw_frames = np.asarray([0.0] + raw[::per_frame])     # entrée depuis le silence
+    smooth = np.asarray([0.0] + smooth)
+    print(f"Saut max : brut par frame caméra {np.abs(np.diff(raw_frames)).max():.3f}, "
+          f"lissé par pas de contrôle {np.abs(np.diff(smooth)).max():.4f}")
+    print(f"Gain final {smooth[-1]:.3f} (cible {raw[-1]:.3f}) ; "
+          f"{len(pushed)} envois audio sur {n} pas (epsilon {cfg.epsilon})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
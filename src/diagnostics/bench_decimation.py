@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+src/diagnostics/bench_decimation.py
+
+Benchmark des niveaux de décimation du mapping (ZoneMapper3D.set_decimation).
+
+Pour chaque niveau (DECIMATION_LEVELS) :
+- temps moyen par frame (ms) de nuage 3D + projection sol + position
+- accord des décisions de cellule avec la pleine résolution (% de frames
+  où la cellule — ou l'absence de cellule — est identique)
+- écart moyen de position (cm) avec la pleine résolution
+
+Sans enregistrement : pièce synthétique géométriquement cohérente avec
+une personne qui la parcourt (depth_recording.synthetic_room_sequence).
+Avec --record : pose caméra et pièce lues dans config/system_state.json
+(ou passées en arguments).
+
+Usage :
+    python -m src.diagnostics.bench_decimation [--record session.npy]
+        [--rows 3 --cols 4]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from src.diagnostics.depth_recording import load_recording, synthetic_room_sequence
+from src.zone_mapper_3d import DECIMATION_LEVELS, ZoneMapper3D
+
+
+def make_mapper(a) -> ZoneMapper3D:
+    return ZoneMapper3D(
+        cam_height_m=a.height,
+        cam_angle_deg=a.pitch,
+        cam_wall_dist_m=a.wall,
+        room_width_m=a.room_w,
+        room_depth_m=a.room_d,
+    )
+
+
+def run_level(frames: np.ndarray, mapper: ZoneMapper3D, rows: int, cols: int):
+    """Retourne (ms/frame, liste de positions, liste de cellules)."""
+    positions, cells, times = [], [], []
+    mapper.compute_point_cloud(frames[0])  # construction des tables hors mesure
+    for depth in frames:
+        t0 = time.perf_counter()
+        cloud = mapper.compute_point_cloud(depth)
+        ground_xy = mapper.project_to_ground(cloud)
+        pos = mapper.detect_person_position(ground_xy)
+        times.append(time.perf_counter() - t0)
+        positions.append(pos)
+        cells.append(mapper.map_to_cell(pos, mapper.room_width_m, mapper.room_depth_m, rows, cols))
+    return 1000.0 * float(np.mean(times)), positions, cells
+
+
+def main(argv=None) -> int:
+    state = {}
+    if os.path.isfile("config/system_state.json"):
+        with open("config/system_state.json", "r") as f:
+            state = json.load(f)
+    cam = state.get("camera", {})
+    room = state.get("room", {})
+    grid = state.get("grid", {})
+
+    p = argparse.ArgumentParser(description="Benchmark décimation du mapping")
+    p.add_argument("--record", default=None, help="session .npy (N, H, W) uint16")
+    p.add_argument("--frames", type=int, default=120)
+    p.add_argument("--height", type=float, default=cam.get("height_m", 1.75))
+    p.add_argument("--pitch", type=float, default=cam.get("angle_deg", 20.0))
+    p.add_argument("--wall", type=float, default=cam.get("wall_dist_m", 2.0))
+    p.add_argument("--room-w", type=float, default=room.get("width_m", 4.33))
+    p.add_argument("--room-d", type=float, default=room.get("depth_m", 3.23))
+    p.add_argument("--rows", type=int, default=grid.get("rows", 3))
+    p.add_argument("--cols", type=int, default=grid.get("cols", 4))
+    a = p.parse_args(argv)
+
+    if a.record:
+        frames = load_recording(a.record)
+        print(f"Session : {a.record} — {frames.shape[0]} frames {frames.shape[2]}×{frames.shape[1]}")
+    else:
+        # Pièce synthétique : caméra centrée sur la largeur
+        a.wall = a.room_w / 2.0
+        frames, _path = synthetic_room_sequence(make_mapper(a), a.frames)
+        print(f"Session synthétique — {frames.shape[0]} frames {frames.shape[2]}×{frames.shape[1]}")
+    print(f"Grille {a.rows}×{a.cols}, pièce {a.room_w:.2f}×{a.room_d:.2f} m\n")
+
+    ref_ms, ref_pos, ref_cells = None, None, None
+    print(f"{'niveau':<20}{'ms/frame':>10}{'accélér.':>10}{'accord %':>10}{'écart cm':>10}")
+    for label, mode, factor in DECIMATION_LEVELS:
+        mapper = make_mapper(a)
+        mapper.set_decimation(mode, factor)
+        ms, pos, cells = run_level(frames, mapper, a.rows, a.cols)
+
+        if ref_cells is None:
+            ref_ms, ref_pos, ref_cells = ms, pos, cells
+
+        agree = np.mean([c == r for c, r in zip(cells, ref_cells)])
+        errs = [np.hypot(q[0] - r[0], q[1] - r[1])
+                for q, r in zip(pos, ref_pos) if q is not None and r is not None]
+        err_cm = 100.0 * float(np.mean(errs)) if errs else float("nan")
+        print(f"{label:<20}{ms:>10.2f}{ref_ms / ms:>9.1f}×{100 * agree:>10.1f}{err_cm:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+src/diagnostics/bench_depth_filters.py
+
+Benchmark des filtres de profondeur (src/depth_filters.py).
+
+Filtre temporel :
+- temps moyen par frame (ms) pour chaque taille de fenêtre N
+- réduction du bruit : écart-type temporel moyen par pixel (mm) sur les
+  pixels du décor (jamais traversés), valeurs valides seulement,
+  avant / après filtrage
+- scintillement : part des pixels qui basculent valide ↔ invalide d'une
+  frame à l'autre
+
+Filtre spatial (OpenCV limité à 1 thread, cible 30 fps = 33 ms/frame) :
+- temps moyen par frame (ms) pour quelques configurations
+- part de pixels invalides avant / après
+
+Usage :
+    python -m src.diagnostics.bench_depth_filters [--record session.npy]
+"""
+
+import argparse
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from src.depth_filters import SpatialDepthFilter, SpatialFilterConfig, TemporalDepthFilter
+from src.diagnostics.depth_recording import load_or_synthesize
+
+
+def static_mask(frames: np.ndarray, max_range_mm: float = 300.0) -> np.ndarray:
+    """Pixels du décor (jamais traversés) : étendue des valeurs valides < max_range_mm."""
+    f = frames.astype(np.float32)
+    f[frames == 0] = np.nan
+    with np.errstate(all="ignore"):
+        span = np.nanmax(f, axis=0) - np.nanmin(f, axis=0)
+    return np.isfinite(span) & (span < max_range_mm)
+
+
+def temporal_noise_mm(frames: np.ndarray, mask: np.ndarray) -> float:
+    """Écart-type temporel moyen (mm) des valeurs valides, sur les pixels du décor."""
+    f = frames[:, mask].astype(np.float32)
+    f[f == 0] = np.nan
+    with np.errstate(all="ignore"):
+        return float(np.nanmean(np.nanstd(f, axis=0)))
+
+
+def flicker_ratio(frames: np.ndarray) -> float:
+    valid = frames > 0
+    return float(np.mean(valid[1:] != valid[:-1]))
+
+
+SPATIAL_CONFIGS = [
+    ("speckle", SpatialFilterConfig(hole_fill="off")),
+    ("speckle+min", SpatialFilterConfig()),
+    ("speckle+min+med3", SpatialFilterConfig(smooth="median3")),
+    ("speckle+min+med5", SpatialFilterConfig(smooth="median5")),
+    ("min×4+med5", SpatialFilterConfig(speckle_size=0, hole_passes=4, smooth="median5")),
+]
+
+
+def run_filter(frames: np.ndarray, flt, warmup: int):
+    out = np.empty_like(frames)
+    times = []
+    for i, frame in enumerate(frames):
+        t0 = time.perf_counter()
+        res = flt.process(frame)
+        dt = time.perf_counter() - t0
+        out[i] = res
+        if i >= warmup:
+            times.append(dt)
+    return out[warmup:], 1000.0 * float(np.mean(times))
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark filtre temporel profondeur")
+    p.add_argument("--record", default=None, help="session .npy (N, H, W) uint16")
+    p.add_argument("--windows", default="3,5,7,9")
+    a = p.parse_args(argv)
+
+    frames = load_or_synthesize(a.record)
+    windows = [int(x) for x in a.windows.split(",")]
+    warmup = max(windows)
+
+    raw = frames[warmup:]
+    mask = static_mask(raw)
+    raw_noise = temporal_noise_mm(raw, mask)
+    raw_flicker = flicker_ratio(raw)
+    print(f"\nBrut : bruit {raw_noise:.2f} mm, scintillement {100 * raw_flicker:.2f} %\n")
+    print(f"{'mode':<8}{'N':>4}{'ms/frame':>11}{'bruit mm':>11}{'réduction':>11}{'scint. %':>10}")
+
+    for mode in ("median", "ema"):
+        for n in windows if mode == "median" else [0]:
+            flt = TemporalDepthFilter(window=max(1, n), mode=mode)
+            filtered, ms = run_filter(frames, flt, warmup)
+            noise = temporal_noise_mm(filtered, mask)
+            flick = flicker_ratio(filtered)
+            label = str(n) if mode == "median" else "-"
+            print(f"{mode:<8}{label:>4}{ms:>11.2f}{noise:>11.2f}"
+                  f"{raw_noise / noise if noise else float('inf'):>10.2f}×{100 * flick:>10.2f}")
+
+    # ------------------------------------------------------------------
+    cv2.setNumThreads(1)
+    h, w = frames.shape[1:]
+    print(f"\nFiltre spatial ({w}×{h}, 1 thread, budget 33.3 ms)")
+    print(f"Brut : invalides {100 * np.mean(raw == 0):.2f} %\n")
+    print(f"{'config':<20}{'ms/frame':>10}{'invalides %':>13}{'30 fps':>8}")
+    for name, cfg in SPATIAL_CONFIGS:
+        filtered, ms = run_filter(frames, SpatialDepthFilter(cfg), warmup)
+        ok = "oui" if ms < 1000.0 / 30.0 else "NON"
+        print(f"{name:<20}{ms:>10.2f}{100 * np.mean(filtered == 0):>13.2f}{ok:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+src/diagnostics/bench_floor_calibration.py
+
+Vérification de l'auto-calibration du sol (src/floor_calibration.py).
+
+- Sans enregistrement : pièce vide synthétique (sol + mur du fond) rendue
+  pour une pose connue, bruit ∝ d², trous ; on compare la pose estimée à
+  la pose réelle.
+- Avec --record : première frame de la session (pièce vide), pose estimée
+  seulement.
+Dans les deux cas : temps total (objectif < 1 s).
+
+Usage :
+    python -m src.diagnostics.bench_floor_calibration [--record vide.npy]
+        [--height 1.75] [--pitch 18] [--roll 2]
+"""
+
+import argparse
+import sys
+
+from src.diagnostics.depth_recording import load_recording, synthetic_empty_room
+from src.floor_calibration import calibrate_floor
+from src.zone_mapper_3d import ZoneMapper3D
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Vérification auto-calibration du sol")
+    p.add_argument("--record", default=None, help="session .npy (N, H, W) uint16, pièce vide")
+    p.add_argument("--height", type=float, default=1.75)
+    p.add_argument("--pitch", type=float, default=18.0)
+    p.add_argument("--roll", type=float, default=2.0)
+    p.add_argument("--stride", type=int, default=4)
+    p.add_argument("--runs", type=int, default=5)
+    a = p.parse_args(argv)
+
+    truth = None
+    if a.record:
+        frame = load_recording(a.record)[0]
+    else:
+        truth = ZoneMapper3D(cam_height_m=a.height, cam_angle_deg=a.pitch, cam_roll_deg=a.roll)
+        frame = synthetic_empty_room(truth)
+
+    mapper = ZoneMapper3D()
+    results = [calibrate_floor(frame, mapper, stride=a.stride, seed=i) for i in range(a.runs)]
+    if any(r is None for r in results):
+        print("Aucun plan de sol trouvé.")
+        return 1
+
+    for r in results:
+        print(r.describe())
+
+    worst_ms = max(r.elapsed_ms for r in results)
+    print(f"\nPire temps : {worst_ms:.0f} ms ({'OK' if worst_ms < 1000.0 else 'TROP LENT'} < 1 s)")
+
+    if truth is not None:
+        r = results[0]
+        print(f"Erreurs : hauteur {1000 * abs(r.height_m - a.height):.1f} mm, "
+              f"pitch {abs(r.pitch_deg - a.pitch):.2f}°, roulis {abs(r.roll_deg - a.roll):.2f}°")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
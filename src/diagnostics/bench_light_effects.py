@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+src/diagnostics/bench_light_effects.py
+
+Effets lumineux (src/light_effects.py) avec une horloge déterministe.
+
+- vérifie les enveloppes de chaque mode à des instants donnés
+  (continu, strobe, fondu, fondu_up, fondu_down, durée fixe)
+- coût de render() pour toute la grille, toutes les cellules actives,
+  comparé au budget d'un tick à --tick-hz
+- cadence réelle du thread (ticks/s, ticks en retard) pendant --seconds
+
+Usage :
+    python -m src.diagnostics.bench_light_effects [--rows 32 --cols 32] [--tick-hz 44]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from src.light_effects import LIGHT_MODES, LightEffects
+
+
+# (mode, fixe, trigger, release, [(instant, intensité attendue)])
+_CASES = [
+    ("continu", False, 0.0, 2.0, [(0.0, 1.0), (1.9, 1.0), (2.0, 0.0)]),
+    ("strobe", False, 0.0, 9.0, [(0.01, 1.0), (0.07, 0.0), (0.13, 1.0), (9.5, 0.0)]),
+    ("strobe", True, 0.0, 9.0, [(0.01, 1.0), (0.51, 1.0), (1.01, 0.0)]),
+    ("fondu", False, 0.0, 3.0, [(0.0, 0.0), (0.5, 0.5), (2.0, 1.0), (3.5, 0.5), (4.0, 0.0)]),
+    ("fondu", False, 0.0, 0.5, [(0.25, 0.25), (0.75, 0.25), (1.5, 0.0)]),
+    ("fondu_up", False, 0.0, 3.0, [(0.5, 0.5), (2.5, 1.0), (3.0, 0.0)]),
+    ("fondu_down", False, 0.0, 3.0, [(0.0, 1.0), (0.5, 0.5), (1.5, 0.0)]),
+]
+
+
+def check_envelopes() -> bool:
+    ok = True
+    for mode, fixe, t_on, t_off, expected in _CASES:
+        fx = LightEffects(1, 1, clock=lambda: 0.0)
+        fx.set_effect(0, 0, mode, 1.0, duree_s=1.0, fixe=fixe, strobe_hz=8.0)
+        fx.trigger(0, 0, now=t_on)
+        got = []
+        for t, want in expected:
+            if t >= t_off:
+                fx.release(0, 0, now=t_off)
+            v = float(fx.render(now=t)[0, 0])
+            got.append(v)
+            ok &= abs(v - want) < 1e-6
+        label = f"{mode}{' (fixe)' if fixe else ''}"
+        print(f"  {label:<18} " + " ".join(f"{v:.2f}" for v in got))
+    return ok
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark effets lumineux")
+    p.add_argument("--rows", type=int, default=32)
+    p.add_argument("--cols", type=int, default=32)
+    p.add_argument("--tick-hz", type=float, default=44.0)
+    p.add_argument("--seconds", type=float, default=2.0)
+    a = p.parse_args(argv)
+
+    print("Enveloppes (horloge déterministe, durée 1 s) :")
+    ok = check_envelopes()
+    print(f"  -> {'OK' if ok else 'ÉCART'}")
+
+    fx = LightEffects(a.rows, a.cols, tick_hz=a.tick_hz)
+    rng = np.random.default_rng(0)
+    for r in range(a.rows):
+        for c in range(a.cols):
+            fx.set_effect(r, c, LIGHT_MODES[rng.integers(len(LIGHT_MODES))])
+            fx.trigger(r, c, now=0.0)
+    n = 500
+    t0 = time.perf_counter()
+    for i in range(n):
+        fx.render(now=i / a.tick_hz)
+    dt = (time.perf_counter() - t0) / n
+    print(f"render() {a.rows}x{a.cols} : {dt * 1e6:.0f} µs "
+          f"({100.0 * dt * a.tick_hz:.2f} % du budget à {a.tick_hz:.0f} Hz)")
+
+    frames = []
+    fx.start(lambda intensity: frames.append(float(intensity.max())))
+    time.sleep(a.seconds)
+    fx.stop()
+    print(f"Thread : {fx.ticks / a.seconds:.1f} ticks/s (cible {a.tick_hz:.0f}), "
+          f"{fx.late_ticks} en retard")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
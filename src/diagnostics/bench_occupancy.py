@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+src/diagnostics/bench_occupancy.py
+
+Occupation 3D (src/occupancy_grid.py) sur la pièce synthétique.
+
+- coût par frame de OccupancyGrid.update comparé au chemin 2D actuel
+  (project_to_ground + detect_person_position), à partir du même nuage
+- posture détectée dans la cellule de la personne, pour une personne
+  debout, accroupie et un objet bas (hauteur de la boîte synthétique)
+
+Usage :
+    python -m src.diagnostics.bench_occupancy [--frames 60] [--rows 3 --cols 4]
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from src.diagnostics.depth_recording import synthetic_room_sequence
+from src.occupancy_grid import OccupancyGrid
+from src.zone_mapper_3d import ZoneMapper3D
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark occupation 3D")
+    p.add_argument("--frames", type=int, default=60)
+    p.add_argument("--rows", type=int, default=3)
+    p.add_argument("--cols", type=int, default=4)
+    p.add_argument("--height", type=float, default=1.75)
+    p.add_argument("--pitch", type=float, default=20.0)
+    a = p.parse_args(argv)
+
+    mapper = ZoneMapper3D(cam_height_m=a.height, cam_angle_deg=a.pitch,
+                          cam_wall_dist_m=4.33 / 2.0)
+    grid = OccupancyGrid(a.rows, a.cols)
+
+    print(f"{'sujet':<12}{'2D ms':>8}{'3D ms':>8}   postures (cellule de la personne)")
+    for label, h_m in (("debout", 1.70), ("accroupi", 1.00), ("objet bas", 0.45)):
+        frames, path = synthetic_room_sequence(mapper, a.frames, person_h_m=h_m)
+        t2d, t3d, seen = [], [], Counter()
+        for depth, (px, py) in zip(frames, path):
+            cloud = mapper.compute_point_cloud(depth)
+
+            t0 = time.perf_counter()
+            mapper.detect_person_position(mapper.project_to_ground(cloud))
+            t1 = time.perf_counter()
+            grid.update(cloud, mapper)
+            t2 = time.perf_counter()
+            t2d.append(t1 - t0)
+            t3d.append(t2 - t1)
+
+            cell = mapper.map_to_cell((px, py), mapper.room_width_m, mapper.room_depth_m,
+                                      a.rows, a.cols)
+            if cell is not None:
+                seen[grid.posture(*cell)] += 1
+
+        summary = ", ".join(f"{k} {100 * v / sum(seen.values()):.0f} %" for k, v in seen.most_common())
+        print(f"{label:<12}{1000 * np.mean(t2d):>8.2f}{1000 * np.mean(t3d):>8.2f}   {summary}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
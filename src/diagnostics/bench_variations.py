@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+src/diagnostics/bench_variations.py
+
+Variations par volume (src/matrice.py + src/audio_mixer.py).
+
+- recherche de variation : table compilée (bisect) vs parcours linéaire,
+  même résultat sur --lookups volumes et coût par appel
+- changement de variation pendant la lecture (deux sinus synthétiques de
+  fréquences différentes) : plus grand saut entre deux échantillons
+  consécutifs au moment du changement, fondu enchaîné vs coupure nette
+  (xfade_ms = 0)
+- hystérésis : nombre de changements quand le volume oscille autour
+  d'une borne de plage
+
+Usage :
+    python -m src.diagnostics.bench_variations [--variations 3] [--xfade-ms 30]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from src.audio_mixer import AudioMixer
+from src.matrice import Cellule, Variation, _scan_variation, clamp01
+
+
+def _write_sine(path: str, freq: float, samplerate: int = 48000, seconds: float = 1.0) -> None:
+    t = np.arange(int(samplerate * seconds)) / samplerate
+    pcm = (0.5 * 32767 * np.sin(2 * np.pi * freq * t)).astype("<i2")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(samplerate)
+        w.writeframes(pcm.tobytes())
+
+
+def _max_jump(mixer: AudioMixer, key: str, switch_at: int, blocks: int, volume: float) -> float:
+    """Plus grand écart entre échantillons consécutifs autour du changement."""
+    out = []
+    for i in range(blocks):
+        if i == switch_at:
+            mixer.set_volume(key, volume)
+        out.append(mixer.render().copy())
+    y = np.concatenate(out)
+    b = mixer.block
+    around = y[(switch_at - 1) * b:(switch_at + 3) * b]
+    return float(np.abs(np.diff(around, axis=0)).max())
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark variations par volume")
+    p.add_argument("--variations", type=int, default=3)
+    p.add_argument("--lookups", type=int, default=200000)
+    p.add_argument("--xfade-ms", type=float, default=30.0)
+    p.add_argument("--hysteresis", type=float, default=0.03)
+    a = p.parse_args(argv)
+
+    # 1) Table compilée vs parcours linéaire
+    n = a.variations
+    edges = np.linspace(0.0, 1.0, n + 1)
+    cell = Cellule(variations=[Variation(float(edges[i]), float(edges[i + 1]), f"v{i}.wav")
+                               for i in range(n)])
+    cell.normalize()
+    vols = np.random.default_rng(0).random(a.lookups).tolist()
+    table = cell.variation_table()
+    mismatch = sum(table.index(v) != _scan_variation(cell.variations, clamp01(v)) for v in vols)
+    t0 = time.perf_counter()
+    for v in vols:
+        table.index(v)
+    t_bisect = (time.perf_counter() - t0) / len(vols)
+    t0 = time.perf_counter()
+    for v in vols:
+        _scan_variation(cell.variations, clamp01(v))
+    t_scan = (time.perf_counter() - t0) / len(vols)
+    print(f"{n} variations, {len(vols)} volumes : bisect {t_bisect * 1e9:.0f} ns, "
+          f"parcours {t_scan * 1e9:.0f} ns, {mismatch} écart(s)")
+
+    # 2) Changement pendant la lecture
+    tmp = tempfile.mkdtemp(prefix="variations_")
+    wavs = [os.path.join(tmp, f"sine_{f}.wav") for f in (220, 330)]
+    for path, f in zip(wavs, (220.0, 330.0)):
+        _write_sine(path, f)
+    cell = Cellule(variations=[Variation(0.0, 0.5, wavs[0]), Variation(0.51, 1.0, wavs[1])])
+    cell.normalize()
+    for label, xfade in (("fondu enchaîné", a.xfade_ms), ("coupure nette", 0.0)):
+        mixer = AudioMixer(1, xfade_ms=xfade, hysteresis=a.hysteresis, output=False)
+        mixer.load_cell_variations("c", cell.variation_table())
+        mixer.note_on("c", 0.45)
+        jump = _max_jump(mixer, "c", 40, 50, 0.55)
+        print(f"Changement de variation ({label}) : saut max {jump:.3f}, "
+              f"{mixer.switches} changement(s)")
+
+    # 3) Hystérésis : volume qui oscille autour de la borne 0.5
+    for h in (0.0, a.hysteresis):
+        mixer = AudioMixer(1, hysteresis=h, output=False)
+        mixer.load_cell_variations("c", cell.variation_table())
+        mixer.note_on("c", 0.45)
+        for i in range(200):
+            mixer.set_volume("c", 0.505 + 0.02 * np.sin(i * 0.7))
+            mixer.render()
+        print(f"Oscillation ±0.02 autour de 0.5, hystérésis {h:.2f} : {mixer.switches} changement(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
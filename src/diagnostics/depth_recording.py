@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+src/diagnostics/depth_recording.py
+
+Enregistrement et relecture de sessions de profondeur pour les benchmarks.
+
+Format : un fichier .npy contenant un tableau (N, H, W) uint16 en mm,
+tel que produit par PipelineOrbbec.get_depth_data() (sans filtre).
+
+Enregistrer 300 frames (≈10 s) :
+    python -m src.diagnostics.depth_recording --out session.npy --frames 300
+
+Les benchmarks acceptent --record session.npy ; sans enregistrement, ils
+utilisent synthetic_sequence() (scène statique + personne qui marche,
+bruit proportionnel à d² et trous aléatoires, comme un capteur stéréo).
+synthetic_empty_room() / synthetic_room_sequence() rendent la même chose
+avec une géométrie cohérente (sol, mur, personne debout) pour une pose
+de caméra donnée par un ZoneMapper3D.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+
+def load_recording(path: str) -> np.ndarray:
+    """Charge une session (N, H, W) uint16."""
+    frames = np.load(path)
+    if frames.ndim != 3:
+        raise ValueError(f"{path} : tableau (N, H, W) attendu, reçu {frames.shape}")
+    return frames.astype(np.uint16, copy=False)
+
+
+def synthetic_sequence(n_frames: int = 120, height: int = 480, width: int = 640,
+                       seed: int = 0) -> np.ndarray:
+    """
+    Séquence synthétique (N, H, W) uint16 :
+      - fond : sol/mur en dégradé 1.2 m (bas de l'image) → 4.0 m (haut)
+      - une « personne » (ellipse à ~2 m) qui traverse l'image
+      - bruit gaussien σ = 1.5 mm · (d / 1 m)², 3 % de pixels invalides,
+        quelques trous groupés (bords, vêtements sombres)
+    """
+    rng = np.random.default_rng(seed)
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    background = 4000.0 - (ys / height) * 2800.0
+
+    frames = np.zeros((n_frames, height, width), dtype=np.uint16)
+    for i in range(n_frames):
+        depth = background.copy()
+
+        cx = width * (0.2 + 0.6 * i / max(1, n_frames - 1))
+        cy = height * 0.55
+        person = ((xs - cx) / (width * 0.06)) ** 2 + ((ys - cy) / (height * 0.3)) ** 2 < 1.0
+        depth[person] = 2000.0
+
+        sigma = 1.5 * (depth / 1000.0) ** 2
+        depth += rng.normal(0.0, 1.0, depth.shape).astype(np.float32) * sigma
+
+        depth[rng.random(depth.shape) < 0.03] = 0.0
+        for _ in range(6):
+            hy, hx = rng.integers(0, height - 8), rng.integers(0, width - 8)
+            depth[hy:hy + rng.integers(2, 8), hx:hx + rng.integers(2, 8)] = 0.0
+
+        frames[i] = np.clip(depth, 0, 65535).astype(np.uint16)
+    return frames
+
+
+def synthetic_empty_room(mapper, shape=(480, 640),
+                         wall_m: float = 4.0, seed: int = 0) -> np.ndarray:
+    """Profondeur (mm) d'une pièce vide pour la pose du mapper : sol + mur à wall_m."""
+    rng = np.random.default_rng(seed)
+    floor = mapper.expected_floor_depth_map(shape)
+
+    # Mur vertical face à la caméra : Z_h = wall_m ; Z_h = Z · (3e ligne de R)·r
+    fwd = mapper.R[2]
+    along = mapper.ray_x * fwd[0] + mapper.ray_y * fwd[1] + fwd[2]
+    wall = np.full(shape, np.inf, dtype=np.float32)
+    np.divide(wall_m * 1000.0, along, out=wall, where=along > 1e-6)
+
+    depth = np.minimum(floor, wall)
+    depth[~np.isfinite(depth) | (depth > 8000)] = 0
+    depth = depth + rng.normal(0.0, 1.0, shape) * (1.5 * (depth / 1000.0) ** 2)
+    depth[rng.random(shape) < 0.03] = 0
+    return np.clip(depth, 0, 65535).astype(np.uint16)
+
+
+def synthetic_room_sequence(mapper, n_frames: int = 120, shape=(480, 640),
+                            seed: int = 0, person_h_m: float = 1.7,
+                            person_w_m: float = 0.45):
+    """
+    Séquence (N, H, W) uint16 : pièce vide (mur du fond juste derrière la
+    limite de la pièce) + une personne (boîte verticale) qui parcourt en
+    boucle la partie de la pièce visible par la caméra. Retourne aussi la trajectoire (N, 2)
+    des positions au sol (x, y) en mètres.
+    """
+    rng = np.random.default_rng(seed)
+    room = synthetic_empty_room(mapper, shape, wall_m=mapper.room_depth_m + 0.3, seed=seed)
+    room = room.astype(np.float32)
+    room[room == 0] = np.inf
+
+    fwd, down = mapper.R[2], mapper.R[1]
+    along = mapper.ray_x * fwd[0] + mapper.ray_y * fwd[1] + fwd[2]
+    vert = mapper.ray_x * down[0] + mapper.ray_y * down[1] + down[2]
+    side = mapper.ray_x * mapper.R[0][0] + mapper.ray_y * mapper.R[0][1] + mapper.R[0][2]
+
+    # Trajectoire dans le champ de vision (demi-angle horizontal ≈ W/2 / fx)
+    w, d = mapper.room_width_m, mapper.room_depth_m
+    t = np.linspace(0.0, 2.0 * np.pi, n_frames, endpoint=False)
+    py = d * (0.6 + 0.3 * np.sin(2.0 * t))
+    half_fov = 0.8 * (shape[1] / 2.0) / mapper.fx
+    px = mapper.cam_wall_dist_m + np.sin(t) * py * half_fov
+    path = np.stack([np.clip(px, 0.3, w - 0.3), py], axis=1)
+
+    frames = np.zeros((n_frames,) + tuple(shape), dtype=np.uint16)
+    for i, (px, py) in enumerate(path):
+        # Face avant de la personne : plan Z_h = py (repère horizontal)
+        z = np.full(shape, np.inf, dtype=np.float32)
+        np.divide(py * 1000.0, along, out=z, where=along > 1e-6)
+        x_abs = mapper.cam_wall_dist_m + side * z / 1000.0
+        height = mapper.cam_height_m - vert * z / 1000.0
+        person = (np.abs(x_abs - px) < person_w_m / 2) & (height > 0.0) & (height < person_h_m)
+
+        depth = np.where(person & (z < room), z, room)
+        depth[~np.isfinite(depth) | (depth > 8000)] = 0
+        depth = depth + rng.normal(0.0, 1.0, shape) * (1.5 * (depth / 1000.0) ** 2)
+        depth[rng.random(shape) < 0.03] = 0
+        frames[i] = np.clip(depth, 0, 65535).astype(np.uint16)
+    return frames, path
+
+
+def load_or_synthesize(path, n_frames: int = 120) -> np.ndarray:
+    if path:
+        frames = load_recording(path)
+        print(f"Session : {path} — {frames.shape[0]} frames {frames.shape[2]}×{frames.shape[1]}")
+        return frames
+    frames = synthetic_sequence(n_frames)
+    print(f"Session synthétique — {frames.shape[0]} frames {frames.shape[2]}×{frames.shape[1]}")
+    return frames
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Enregistre une session de profondeur Orbbec (.npy)")
+    p.add_argument("--out", required=True)
+    p.add_argument("--frames", type=int, default=300)
+    a = p.parse_args(argv)
+
+    from src.orbbec_depth_pipeline import PipelineOrbbec
+
+    pipeline = PipelineOrbbec()
+    frames = []
+    t0 = time.monotonic()
+    try:
+        while len(frames) < a.frames:
+            if not pipeline.poll(100):
+                continue
+            depth = pipeline.get_depth_data()
+            if depth is not None:
+                frames.append(np.array(depth, dtype=np.uint16, copy=True))
+    finally:
+        pipeline.stop()
+
+    data = np.stack(frames)
+    np.save(a.out, data)
+    print(f"{len(frames)} frames enregistrées en {time.monotonic() - t0:.1f} s → {a.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+src/diagnostics/enttec_pty_check.py
+
+Vérifie la sortie Enttec DMX USB Pro (src/enttec_usb_pro.py) sans matériel.
+
+Un pseudo-terminal (pty) joue le rôle du boîtier : le pilote écrit sur
+un lien symbolique vers le côté esclave, le côté maître décode les
+trames (0x7E label longueur… 0xE7) et vérifie :
+    - l'encadrement (label 6, start code 0, longueur, fin de message)
+    - que le dernier univers reçu est bien le dernier envoyé
+    - le nombre de trames / s (changements + maintiens)
+    - la reconnexion : le pty est « débranché » (maître fermé) puis
+      recréé derrière le même lien ; le pilote doit rouvrir le port et
+      renvoyer l'univers complet.
+
+Usage :
+    python -m src.diagnostics.enttec_pty_check [--seconds 2] [--refresh 40]
+"""
+
+import argparse
+import os
+import pty
+import select
+import sys
+import tempfile
+import threading
+import time
+import tty
+
+import numpy as np
+
+from src.enttec_usb_pro import EOM, LABEL_SEND_DMX, SOM, EnttecUsbPro
+
+
+def parse_frames(buf: bytearray):
+    """Extrait les trames complètes de `buf` (consommées) : [(label, données)]."""
+    frames = []
+    while True:
+        start = buf.find(bytes((SOM,)))
+        if start < 0:
+            buf.clear()
+            return frames
+        del buf[:start]
+        if len(buf) < 4:
+            return frames
+        n = buf[2] | (buf[3] << 8)
+        if len(buf) < 5 + n:
+            return frames
+        if buf[4 + n] != EOM:
+            raise ValueError(f"Fin de message absente (octet {buf[4 + n]:#04x})")
+        frames.append((buf[1], bytes(buf[4:4 + n])))
+        del buf[:5 + n]
+
+
+class FakeWidget:
+    """Côté maître du pty : lit et décode les trames dans un thread."""
+
+    def __init__(self, link: str) -> None:
+        self.master, slave = pty.openpty()
+        tty.setraw(slave)
+        self._slave = slave
+        if os.path.lexists(link):
+            os.unlink(link)
+        os.symlink(os.ttyname(slave), link)
+        self.frames = []
+        self.errors = []
+        self._alive = True
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self) -> None:
+        buf = bytearray()
+        while self._alive:
+            # select avec délai : unplug() peut arrêter le thread avant de fermer
+            if not select.select([self.master], [], [], 0.05)[0]:
+                continue
+            try:
+                data = os.read(self.master, 4096)
+            except OSError:
+                return
+            if not data:
+                return
+            buf += data
+            try:
+                self.frames += parse_frames(buf)
+            except ValueError as e:
+                self.errors.append(str(e))
+
+    def unplug(self) -> None:
+        self._alive = False
+        self._thread.join()
+        os.close(self.master)
+        os.close(self._slave)
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Vérification Enttec USB Pro sur pty")
+    p.add_argument("--seconds", type=float, default=2.0)
+    p.add_argument("--refresh", type=float, default=40.0)
+    p.add_argument("--slots", type=int, default=512)
+    a = p.parse_args(argv)
+
+    link = os.path.join(tempfile.mkdtemp(), "enttec")
+    widget = FakeWidget(link)
+    out = EnttecUsbPro(link, refresh_hz=a.refresh, slots=a.slots, reconnect_s=0.2)
+    ok = True
+
+    # 1) Flux : un univers différent toutes les 50 ms
+    rng = np.random.default_rng(0)
+    t_end = time.monotonic() + a.seconds
+    last = None
+    while time.monotonic() < t_end:
+        last = rng.integers(0, 256, size=a.slots, dtype=np.uint8)
+        out.set_universe(last)
+        time.sleep(0.05)
+    time.sleep(3.0 / a.refresh)
+
+    labels = {f[0] for f in widget.frames}
+    payload = widget.frames[-1][1] if widget.frames else b""
+    framing_ok = (labels == {LABEL_SEND_DMX} and not widget.errors
+                  and payload[:1] == b"\x00" and len(payload) == a.slots + 1)
+    same = payload[1:] == last.tobytes()
+    ok &= framing_ok and same
+    print(f"Trames reçues : {len(widget.frames)} ({len(widget.frames) / a.seconds:.1f}/s), "
+          f"encadrement {'OK' if framing_ok else 'ERREUR'}, "
+          f"dernier univers {'identique' if same else 'DIFFÉRENT'}")
+    print(f"Politique : {out.policy.summary()}")
+
+    # 2) Débranchement puis rebranchement derrière le même lien
+    widget.unplug()
+    time.sleep(0.3)
+    out.set_universe(np.full(a.slots, 7, dtype=np.uint8))
+    time.sleep(0.3)
+    widget = FakeWidget(link)
+    time.sleep(0.6)
+    reconnected = bool(widget.frames) and widget.frames[-1][1][1:] == bytes([7]) * a.slots
+    ok &= reconnected
+    print(f"Reconnexion : {'OK' if reconnected else 'ÉCHEC'} "
+          f"({out.reconnects} ouvertures, {out.write_errors} erreurs d'écriture)")
+
+    out.close()
+    time.sleep(0.1)
+    blackout = bool(widget.frames) and not any(widget.frames[-1][1][1:])
+    ok &= blackout
+    print(f"Blackout à la fermeture : {'OK' if blackout else 'ABSENT'}")
+    widget.unplug()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+src/diagnostics/osc_monitor.py
+
+Récepteur OSC/UDP local pour vérifier la sortie OSC (src/osc_output.py).
+
+- Par défaut : écoute --port et affiche les messages reçus (bundles
+  dépliés), comme le ferait Max/MSP ou SuperCollider.
+- --selftest : lance une OscOutput vers ce récepteur et lui envoie un
+  flux synthétique (--fps frames/s × --targets cibles, entrées / sorties
+  de cellule, carte d'occupation) pendant --seconds ; affiche le débit
+  réellement émis (datagrammes/s, ko/s) et vérifie que tous les
+  événements de cellule sont arrivés.
+
+Usage :
+    python -m src.diagnostics.osc_monitor [--port 57120]
+    python -m src.diagnostics.osc_monitor --selftest [--fps 30 --targets 20]
+"""
+
+import argparse
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from src.cell_state import CellEvent
+from src.osc_output import OscConfig, OscOutput
+
+
+def _read_string(data: bytes, pos: int):
+    end = data.index(b"\0", pos)
+    s = data[pos:end].decode("ascii")
+    return s, pos + ((end - pos) // 4 + 1) * 4
+
+
+def decode_packet(data: bytes):
+    """Liste de (adresse, [arguments]) d'un message ou d'un bundle OSC."""
+    if data.startswith(b"#bundle\0"):
+        out, pos = [], 16
+        while pos < len(data):
+            (size,) = struct.unpack_from(">i", data, pos)
+            out += decode_packet(data[pos + 4:pos + 4 + size])
+            pos += 4 + size
+        return out
+
+    address, pos = _read_string(data, 0)
+    tags, pos = _read_string(data, pos)
+    args = []
+    for t in tags[1:]:
+        if t in "if":
+            (v,) = struct.unpack_from(">" + t, data, pos)
+            pos += 4
+        elif t == "s":
+            v, pos = _read_string(data, pos)
+        else:
+            raise ValueError(f"Type OSC non géré : {t}")
+        args.append(v)
+    return [(address, args)]
+
+
+def listen(port: int) -> int:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", port))
+    print(f"Écoute OSC sur 127.0.0.1:{port} (Ctrl+C pour arrêter)")
+    try:
+        while True:
+            data, _src = sock.recvfrom(65536)
+            for address, args in decode_packet(data):
+                print(address, " ".join(f"{a:.3f}" if isinstance(a, float) else str(a) for a in args))
+    except KeyboardInterrupt:
+        return 0
+
+
+def selftest(a) -> int:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(0.2)
+    port = sock.getsockname()[1]
+
+    received, datagrams, nbytes = Counter(), 0, 0
+    stop = threading.Event()
+
+    def receiver():
+        nonlocal datagrams, nbytes
+        while not stop.is_set():
+            try:
+                data, _src = sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            datagrams += 1
+            nbytes += len(data)
+            for address, _args in decode_packet(data):
+                received[address.split("/", 2)[-1]] += 1
+
+    th = threading.Thread(target=receiver, daemon=True)
+    th.start()
+
+    out = OscOutput(OscConfig(enabled=True, port=port, rate_hz=a.rate))
+    rng = np.random.default_rng(0)
+    n_frames = int(a.seconds * a.fps)
+    sent_events = 0
+    xy = rng.uniform(0.0, 3.0, size=(a.targets, 2))
+    for i in range(n_frames):
+        xy += rng.normal(0.0, 0.01, size=xy.shape)
+        out.set_positions([{"id": k, "x": x, "y": y, "z": 0.0} for k, (x, y) in enumerate(xy)])
+        out.set_occupancy(rng.random((a.rows, a.cols)) * (i % 15 == 0))
+        if i % 10 == 0:
+            out.on_event(CellEvent("enter", i % a.rows, i % a.cols, time.monotonic()))
+            out.on_event(CellEvent("exit", i % a.rows, i % a.cols, time.monotonic(), 1.0))
+            sent_events += 2
+        time.sleep(1.0 / a.fps)
+    out.close()
+    time.sleep(0.3)
+    stop.set()
+    th.join()
+
+    cell_events = received["cell/enter"] + received["cell/exit"]
+    print(f"{n_frames} frames à {a.fps} fps × {a.targets} cibles, sortie à {a.rate:.0f} Hz max")
+    print(f"Datagrammes : {datagrams / a.seconds:.1f}/s, débit {nbytes / a.seconds / 1024:.1f} ko/s")
+    print(f"Messages reçus : {dict(received)}")
+    print(f"Événements de cellule : {cell_events}/{sent_events} "
+          f"({'OK' if cell_events == sent_events else 'PERTES'})")
+    return 0 if cell_events == sent_events else 1
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Récepteur / auto-test OSC")
+    p.add_argument("--port", type=int, default=57120)
+    p.add_argument("--selftest", action="store_true")
+    p.add_argument("--fps", type=float, default=30.0)
+    p.add_argument("--targets", type=int, default=20)
+    p.add_argument("--rate", type=float, default=30.0, help="bundles/s max de la sortie")
+    p.add_argument("--seconds", type=float, default=3.0)
+    p.add_argument("--rows", type=int, default=3)
+    p.add_argument("--cols", type=int, default=4)
+    a = p.parse_args(argv)
+    return selftest(a) if a.selftest else listen(a.port)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,9 +4,10 @@ dmx.py — abstraction DMX.
 - Essaie OLA; sinon bascule en simulateur (log console).
 - Conversion couleur hex -> RGB 8 bits.
 - Fonctions pour appliquer intensité/couleur et modes de base.
+- send_fixture : couleur/intensité via un profil de projecteur (src/fixture_profiles.py).
 """
 from __future__ import annotations
-import time, threading
+import threading
 from typing import Tuple
 
 try:
@@ -54,13 +55,43 @@ class DMXInterface:
         else:
             self.client.SendDmx(self.universe, data, lambda state: None)
 
+    def send_fixture(self, profile, address: int, color_hex: str, intensity: float):
+        """Un projecteur décrit par un FixtureProfile (ou son nom) à partir de `address`."""
+        from src.dmx_compositor import DMXCompositor
+        from src.fixture_profiles import get_profile
+        if isinstance(profile, str):
+            profile = get_profile(profile)
+        comp = DMXCompositor(1, 1)
+        comp.set_channel_map([[address]], profile)
+        comp.rgb[0, 0] = hex_to_rgb(color_hex)
+        comp.intensity[0, 0] = max(0.0, min(1.0, float(intensity)))
+        data = bytearray(comp.compose().tobytes())
+        if self.simulate:
+            n = len(profile.channels)
+            print(f"[DMX SIM] universe={self.universe} {profile.name}@{address} = {list(data[address-1:address-1+n])}")
+        else:
+            self.client.SendDmx(self.universe, data, lambda state: None)
+
     def strobe(self, addr_strobe: int, speed_hz: float, duration_s: float):
-        # simple implémentation: active/désactive dimmer au rythme voulu si pas de canal strobe dédié
-        # si addr_strobe > 0: écrire directement une valeur pour vitesse; sinon fallback.
+        """
+        Strobe NON bloquant : écrit la vitesse sur le canal strobe dédié
+        (addr_strobe > 0) puis le remet à 0 après duration_s via un Timer.
+        La valeur dépend du profil du projecteur (ici 0–20 Hz → 1–255).
+        Sans canal dédié, utiliser src.light_effects (mode "strobe") qui
+        module le dimmer à cadence fixe.
+        """
+        value = int(1 + 254 * max(0.0, min(1.0, float(speed_hz) / 20.0)))
         if self.simulate:
             print(f"[DMX SIM] STROBE addr={addr_strobe} speed={speed_hz}Hz for {duration_s}s")
-            time.sleep(duration_s)
             return
-        # Pour un vrai projecteur: écrire sur addr_strobe (valeur dépend du fixture profile)
-        # Ici on se contente d'un sleep pour l'exemple.
-        time.sleep(duration_s)
+        if not addr_strobe:
+            return
+        self._send_channel(addr_strobe, value)
+        timer = threading.Timer(max(0.0, float(duration_s)), self._send_channel, args=(addr_strobe, 0))
+        timer.daemon = True
+        timer.start()
+
+    def _send_channel(self, addr: int, value: int):
+        data = bytearray(512)
+        data[addr-1] = value
+        self.client.SendDmx(self.universe, data, lambda state: None)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+dmx_compositor.py
+Chambre Sonore – Composition vectorisée d'un univers DMX à partir de tableaux par cellule.
+
+État lumineux de la matrice (numpy, rows × cols) :
+    rgb        -> (rows, cols, 3) couleur 0–255
+    intensity  -> (rows, cols) 0–1 (dimmer)
+
+Carte de canaux précalculée (une fois, à la configuration) à partir de
+l'adresse et du profil de projecteur de chaque cellule
+(src/fixture_profiles.py), déduits de
+    - DMXMapping (pont DMX/Audio, adresses régulières, profil commun), ou
+    - CellConfigEntry.dmx.address / .profile / .channels (cells.json)
+Sans profil, une cellule à N canaux reçoit R, G, B, dimmer puis des 0.
+
+compose() calcule les colonnes sources de toutes les cellules (couleur
+brute, blanc extrait, même chose × intensité) en une opération numpy,
+puis les écrit dans l'univers de 512 octets par UNE seule affectation
+indexée (scatter) avec l'échelle de chaque canal ; les canaux fixes des
+profils (strobe, mode…) sont écrits de la même façon. Si plusieurs
+cellules partagent un slot (même adresse), la valeur la plus haute
+l'emporte (HTP, convention des consoles DMX) : les sources sont triées
+par slot une fois pour toutes et compose() ajoute un np.maximum.reduceat
+avant le scatter.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from src.fixture_profiles import (
+    N_RAW, N_SOURCES, FixtureProfile, compile_channel_map, get_profile,
+)
+
+
+DMX_SLOTS = 512
+
+
+class DMXCompositor:
+    """Univers DMX composé depuis rgb / intensity par cellule."""
+
+    def __init__(self, rows: int, cols: int) -> None:
+        self.rows = int(rows)
+        self.cols = int(cols)
+        self.rgb = np.zeros((self.rows, self.cols, 3), dtype=np.float32)
+        self.intensity = np.zeros((self.rows, self.cols), dtype=np.float32)
+        self.universe = np.zeros(DMX_SLOTS, dtype=np.uint8)
+        self.universe_id: Optional[int] = None      # univers DMX (from_cell_config)
+
+        # Colonnes sources par cellule (rows·cols, N_SOURCES) et carte de scatter
+        self._table = np.zeros((self.rows * self.cols, N_SOURCES), dtype=np.float32)
+        self.channel_map = compile_channel_map(np.zeros(0), [])
+        self.used_slots = 0                          # plus haut slot utilisé + 1
+
+    # ------------------------------------------------------------------
+    # Carte de canaux
+    # ------------------------------------------------------------------
+
+    def set_channel_map(self, addresses: np.ndarray,
+                        profiles: Union[FixtureProfile, Sequence[FixtureProfile]]) -> None:
+        """
+        addresses : (rows, cols) adresse DMX 1-based du premier canal (0 = pas de sortie)
+        profiles  : profil commun, ou (rows × cols) profils dans l'ordre des cellules
+        """
+        cmap = compile_channel_map(np.asarray(addresses).reshape(-1), profiles)
+        self.channel_map = cmap
+        self.used_slots = cmap.used_slots
+        self.universe.fill(0)
+        if cmap.shared:
+            print(f"[DMX] {cmap.shared} canaux partagés par plusieurs cellules (fusion HTP).")
+
+    @classmethod
+    def from_mapping(cls, mapping, rows: int, cols: int) -> "DMXCompositor":
+        """Adresses régulières d'un DMXMapping (pont DMX/Audio)."""
+        comp = cls(rows, cols)
+        addresses = np.array([[mapping.address_of(r, c) for c in range(cols)]
+                              for r in range(rows)])
+        profile = get_profile(getattr(mapping, "profile", ""), mapping.channels_per_cell)
+        comp.set_channel_map(addresses, profile)
+        return comp
+
+    @classmethod
+    def from_cell_config(cls, cell_config, rows: int, cols: int,
+                         universe: Optional[int] = None) -> "DMXCompositor":
+        """
+        Adresses, profils et couleurs de cells.json. Seules les cellules
+        de `universe` sont sorties (par défaut : celui de la première
+        cellule).
+        """
+        comp = cls(rows, cols)
+        addresses = np.zeros((rows, cols), dtype=np.intp)
+        profiles = [get_profile("", 0)] * (rows * cols)
+        for r in range(rows):
+            for c in range(cols):
+                entry = cell_config.get_cell(r, c)
+                if entry is None:
+                    continue
+                if universe is None:
+                    universe = entry.dmx.universe
+                if entry.dmx.universe != universe:
+                    continue
+                addresses[r, c] = entry.dmx.address
+                profiles[r * cols + c] = get_profile(entry.dmx.profile, entry.dmx.channels)
+                comp.rgb[r, c] = entry.dmx.color
+        comp.universe_id = universe
+        comp.set_channel_map(addresses, profiles)
+        return comp
+
+    # ------------------------------------------------------------------
+    # Composition
+    # ------------------------------------------------------------------
+
+    def compose(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Écrit l'univers (512 octets) à partir de rgb / intensity ; retourne `out`."""
+        out = self.universe if out is None else out
+        cmap = self.channel_map
+        raw, scaled = self._table[:, :N_RAW], self._table[:, N_RAW:]
+        rgb = self.rgb.reshape(-1, 3)
+        raw[:, 0:3] = rgb
+        np.min(rgb, axis=1, out=raw[:, 3])              # blanc extrait
+        np.subtract(rgb, raw[:, 3:4], out=raw[:, 4:7])  # couleur sans le blanc
+        raw[:, 7] = 255.0                                # plein (dimmer)
+        np.multiply(raw, self.intensity.reshape(-1, 1), out=scaled)
+
+        src = self._table.reshape(-1)[cmap.sources]
+        src *= cmap.scales
+        np.clip(src, 0.0, 255.0, out=src)
+        if cmap.starts is not None:
+            src = np.maximum.reduceat(src, cmap.starts)
+        out[cmap.const_slots] = cmap.const_values
+        out[cmap.slots] = src
+        return out
+
+    def blackout(self) -> None:
+        self.intensity.fill(0.0)
+        self.universe.fill(0)
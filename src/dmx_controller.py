@@ -11,9 +11,20 @@ au lieu de l'API Python d'OLA (trop fragile avec Python 3.12).
 Pré-requis :
     - OLA installé et fonctionnel
     - la commande `ola_set_dmx` disponible dans le PATH
+
+Chaque appel lance un processus : les trames identiques à la dernière
+envoyée sont ignorées et la cadence est limitée (DMXSendPolicy). Une
+trame retardée par la limite part d'elle-même à l'échéance (Timer) ; le
+maintien est inutile ici (olad rafraîchit l'univers), il est désactivé
+par défaut.
 """
 
 import subprocess
+import threading
+
+import numpy as np
+
+from src.dmx_policy import DMXSendPolicy
 
 
 class DMXController:
@@ -23,19 +34,35 @@ class DMXController:
     Universe par défaut : 0 (celui de ton Enttec USB Pro).
     """
 
-    def __init__(self, universe=0):
+    def __init__(self, universe=0, max_hz=20.0, keepalive_hz=0.0):
         self.universe = universe
+        self.policy = DMXSendPolicy(max_hz, keepalive_hz)
+        self._lock = threading.Lock()
+        self._latest = None
+        self._timer = None
 
-    def _run_ola_set_dmx(self, values):
+    def _run_ola_set_dmx(self, values, force=False):
         """
         Envoie une liste de valeurs DMX (0–255) via ola_set_dmx.
         Exemple :
             values = [255, 0, 0] -> --dmx 255,0,0
         """
-        if not values:
+        if len(values) == 0:
             return
 
-        dmx_str = ",".join(str(int(max(0, min(255, v)))) for v in values)
+        frame = np.clip(np.asarray(values, dtype=np.int32), 0, 255).astype(np.uint8)
+        with self._lock:
+            if not self.policy.should_send(frame, force=force):
+                # Trame retardée : elle partira à l'échéance si rien d'autre n'arrive
+                self._latest = frame
+                if self.policy.pending and self._timer is None:
+                    self._timer = threading.Timer(self.policy.next_due(), self._send_pending)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            self._latest = None
+
+        dmx_str = ",".join(str(v) for v in frame.tolist())
 
         cmd = [
             "ola_set_dmx",
@@ -51,6 +78,17 @@ class DMXController:
         except FileNotFoundError:
             print("[DMXController] Erreur : ola_set_dmx introuvable dans le PATH.")
 
+    def _send_pending(self):
+        with self._lock:
+            self._timer = None
+            frame = self._latest
+        if frame is not None:
+            self._run_ola_set_dmx(frame)
+
+    def stats(self):
+        """Compteurs d'émission (trames envoyées, ignorées, retardées, octets)."""
+        return self.policy.stats()
+
     def send_rgb(self, r, g, b):
         """
         Envoie un RGB simple sur les 3 premiers canaux du SlimPAR.
@@ -69,5 +107,5 @@ class DMXController:
         Met les 'channels' premiers canaux à zéro (par défaut 3,
         suffisant pour un SlimPAR RGB simple).
         """
-        self._run_ola_set_dmx([0] * channels)
+        self._run_ola_set_dmx([0] * channels, force=True)
 
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+dmx_policy.py
+Chambre Sonore – Politique d'émission DMX : détection de changement et cadence.
+
+Avant chaque envoi, la sortie DMX (DMXOutput du pont, DMXController)
+demande à DMXSendPolicy si la trame doit partir :
+    - trame identique à la dernière envoyée -> pas d'envoi, sauf
+      rafraîchissement de maintien (keepalive_hz, 0 = jamais) ;
+    - trame modifiée -> envoi immédiat, dans la limite de max_hz ;
+      au-delà, elle est retardée (pending) et partira au prochain appel
+      autorisé (next_due() donne le délai restant) ;
+    - force=True (blackout) -> envoi inconditionnel.
+
+La limite tolère une avance de RATE_TOLERANCE sur l'intervalle : un
+producteur cadencé à max_hz (LightEffects à 44 Hz, thread Enttec) dont
+un tick arrive quelques µs en avance n'est pas retardé d'une période.
+
+Compteurs (stats()) pour suivre la charge USB / réseau : trames
+envoyées (dont changements / maintiens / forcées), trames identiques
+ignorées, changements retardés par la limite de cadence, octets envoyés.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+
+# Fraction de l'intervalle min. exigée entre deux trames modifiées (gigue)
+RATE_TOLERANCE = 0.9
+
+
+class DMXSendPolicy:
+    """Décide, trame par trame, si un univers DMX doit être transmis."""
+
+    def __init__(
+        self,
+        max_hz: float = 44.0,
+        keepalive_hz: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        max_hz       : cadence max des trames envoyées (0 = illimitée).
+        keepalive_hz : cadence min de rafraîchissement d'un univers inchangé
+                       (0 = pas de rafraîchissement).
+        """
+        self.min_interval = 1.0 / max_hz if max_hz > 0 else 0.0
+        self._min_gap = RATE_TOLERANCE * self.min_interval
+        self.keepalive_interval = 1.0 / keepalive_hz if keepalive_hz > 0 else float("inf")
+        self._clock = clock
+        self._last: Optional[np.ndarray] = None
+        self._last_t = float("-inf")
+        self.pending = False
+
+        self.frames_sent = 0
+        self.changed = 0
+        self.keepalives = 0
+        self.forced = 0
+        self.unchanged = 0          # identiques, non envoyées
+        self.rate_limited = 0       # modifiées mais retardées (max_hz)
+        self.bytes_sent = 0
+
+    # ------------------------------------------------------------------
+
+    def should_send(self, frame: np.ndarray, now: Optional[float] = None,
+                    force: bool = False) -> bool:
+        """
+        True si `frame` doit être envoyée maintenant ; dans ce cas elle
+        devient la dernière trame envoyée (l'appelant DOIT l'envoyer).
+        """
+        now = self._clock() if now is None else float(now)
+        since = now - self._last_t
+
+        if force:
+            self.forced += 1
+        elif self._last is None or not np.array_equal(frame, self._last):
+            if since < self._min_gap:
+                self.rate_limited += 1
+                self.pending = True
+                return False
+            self.changed += 1
+        elif since >= self.keepalive_interval:
+            self.keepalives += 1
+        else:
+            self.unchanged += 1
+            self.pending = False
+            return False
+
+        self._last = np.array(frame, dtype=np.uint8, copy=True)
+        self._last_t = now
+        self.pending = False
+        self.frames_sent += 1
+        self.bytes_sent += int(self._last.size)
+        return True
+
+    def next_due(self, now: Optional[float] = None) -> float:
+        """Secondes avant qu'une trame modifiée puisse partir (0 = maintenant)."""
+        now = self._clock() if now is None else float(now)
+        return max(0.0, self._last_t + self._min_gap - now)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "frames_sent": self.frames_sent,
+            "changed": self.changed,
+            "keepalives": self.keepalives,
+            "forced": self.forced,
+            "unchanged": self.unchanged,
+            "rate_limited": self.rate_limited,
+            "bytes_sent": self.bytes_sent,
+        }
+
+    def summary(self) -> str:
+        return (f"{self.frames_sent} trames envoyées ({self.changed} changements, "
+                f"{self.keepalives} maintiens, {self.forced} forcées), "
+                f"{self.unchanged} identiques ignorées, {self.rate_limited} retardées, "
+                f"{self.bytes_sent / 1024:.1f} ko")
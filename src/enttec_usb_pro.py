@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+enttec_usb_pro.py
+Chambre Sonore – Sortie DMX directe vers un Enttec DMX USB Pro (port série, sans OLA).
+
+Trame Enttec (API « DMX USB Pro ») :
+    0x7E | label | longueur LSB | longueur MSB | données | 0xE7
+Label 6 = « Output Only Send DMX Packet Request » : données = start code
+DMX (0x00) suivi de 24 à 512 canaux.
+
+EnttecUsbPro :
+    - tampon d'univers (numpy uint8[512]) mis à jour par set_universe() /
+      send_buffer() (compatible DMXController), jamais bloquant ;
+    - thread d'écriture à cadence fixe (refresh_hz) : l'univers part s'il
+      a changé, sinon à keepalive_hz (le boîtier répète lui-même la
+      dernière trame sur la ligne DMX) — voir src/dmx_policy.py ;
+    - débranchement / erreur d'écriture : port fermé, nouvelle tentative
+      d'ouverture toutes les reconnect_s, univers complet renvoyé à la
+      reconnexion.
+
+pyserial est utilisé s'il est installé ; sinon le port est ouvert comme
+un fichier brut (suffisant pour le FTDI du boîtier et pour un pty de test).
+Vérification sans matériel : python -m src.diagnostics.enttec_pty_check
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+from src.dmx_policy import DMXSendPolicy
+
+try:
+    import serial  # type: ignore
+    HAS_SERIAL = True
+except Exception:
+    serial = None
+    HAS_SERIAL = False
+
+
+DMX_SLOTS = 512
+MIN_SLOTS = 24                    # minimum accepté par le boîtier
+
+SOM = 0x7E                        # début de message
+EOM = 0xE7                        # fin de message
+LABEL_SEND_DMX = 6                # Output Only Send DMX Packet Request
+DMX_START_CODE = 0x00
+
+
+def enttec_packet(label: int, payload: bytes) -> bytes:
+    """Encadre `payload` selon l'API Enttec USB Pro."""
+    n = len(payload)
+    return bytes((SOM, label, n & 0xFF, (n >> 8) & 0xFF)) + payload + bytes((EOM,))
+
+
+def dmx_packet(universe: np.ndarray, slots: Optional[int] = None) -> bytes:
+    """Trame « Send DMX » : start code + `slots` canaux (24–512, complétés à 0)."""
+    universe = np.asarray(universe, dtype=np.uint8).reshape(-1)
+    slots = universe.size if slots is None else int(slots)
+    slots = min(DMX_SLOTS, max(MIN_SLOTS, slots))
+    data = np.zeros(slots + 1, dtype=np.uint8)
+    n = min(slots, universe.size)
+    data[1:1 + n] = universe[:n]
+    data[0] = DMX_START_CODE
+    return enttec_packet(LABEL_SEND_DMX, data.tobytes())
+
+
+class _RawPort:
+    """Port ouvert comme fichier brut (repli sans pyserial)."""
+
+    def __init__(self, path: str) -> None:
+        self._fd = os.open(path, os.O_WRONLY | os.O_NOCTTY)
+        if os.isatty(self._fd):
+            import tty
+            tty.setraw(self._fd)        # pas de traduction 0x0A → CR LF
+
+    def write(self, data: bytes) -> int:
+        view = memoryview(data)
+        while view:
+            n = os.write(self._fd, view)
+            view = view[n:]
+        return len(data)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class EnttecUsbPro:
+    """Sortie DMX série vers un Enttec USB Pro, thread d'écriture + reconnexion."""
+
+    def __init__(
+        self,
+        port: str = "/dev/ttyUSB0",
+        refresh_hz: float = 40.0,
+        keepalive_hz: float = 1.0,
+        slots: int = DMX_SLOTS,
+        reconnect_s: float = 1.0,
+    ) -> None:
+        self.port = port
+        self.refresh_hz = float(refresh_hz)
+        self.slots = min(DMX_SLOTS, max(MIN_SLOTS, int(slots)))
+        self.reconnect_s = float(reconnect_s)
+        self.buffer = np.zeros(DMX_SLOTS, dtype=np.uint8)
+        self.policy = DMXSendPolicy(self.refresh_hz, keepalive_hz)
+
+        self._lock = threading.Lock()
+        self._dev = None
+        self._force = True
+        self._open_failed = False       # erreur d'ouverture déjà signalée
+        self.connected = False
+        self.reconnects = 0
+        self.write_errors = 0
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="enttec-usb-pro", daemon=True)
+        self._thread.start()
+        print(f"[Enttec] Sortie DMX sur {port} ({self.refresh_hz:.0f} Hz, "
+              f"{'pyserial' if HAS_SERIAL else 'fichier brut'})")
+
+    # ------------------------------------------------------------------
+    # Univers (appelants, non bloquant)
+    # ------------------------------------------------------------------
+
+    def set_universe(self, universe: np.ndarray) -> None:
+        """Remplace l'univers (jusqu'à 512 octets, le reste à 0)."""
+        universe = np.asarray(universe).reshape(-1)[:DMX_SLOTS]
+        with self._lock:
+            self.buffer[:universe.size] = np.clip(universe, 0, 255)
+            self.buffer[universe.size:] = 0
+
+    def send_buffer(self, values: Sequence[int]) -> None:
+        """Même usage que DMXController.send_buffer (canaux à partir de 1)."""
+        self.set_universe(np.asarray(values, dtype=np.int32))
+
+    def blackout(self) -> None:
+        with self._lock:
+            self.buffer.fill(0)
+            self._force = True
+
+    # ------------------------------------------------------------------
+    # Port série (thread d'écriture)
+    # ------------------------------------------------------------------
+
+    def _open(self) -> bool:
+        try:
+            if HAS_SERIAL:
+                # Le FTDI du boîtier ignore le débit ; 57600 8N1 par convention
+                self._dev = serial.Serial(self.port, 57600, timeout=0, write_timeout=1.0)
+            else:
+                self._dev = _RawPort(self.port)
+        except (OSError, ValueError) as e:
+            if not self._open_failed:
+                print(f"[Enttec] Ouverture impossible ({self.port}) : {e}")
+                self._open_failed = True
+            self._dev = None
+            return False
+        self._open_failed = False
+        if self.reconnects:
+            print(f"[Enttec] Reconnecté à {self.port}")
+        self.connected = True
+        self.reconnects += 1
+        with self._lock:
+            self._force = True
+        return True
+
+    def _drop(self, e: Exception) -> None:
+        self.write_errors += 1
+        print(f"[Enttec] Erreur d'écriture ({e}) : port fermé, reconnexion…")
+        try:
+            self._dev.close()
+        except Exception:
+            pass
+        self._dev = None
+        self.connected = False
+
+    def _write_frame(self) -> None:
+        with self._lock:
+            if not self.policy.should_send(self.buffer, force=self._force):
+                return
+            self._force = False
+            packet = dmx_packet(self.buffer, self.slots)
+        try:
+            self._dev.write(packet)
+        except Exception as e:      # OSError, serial.SerialException
+            self._drop(e)
+
+    def _run(self) -> None:
+        period = 1.0 / max(1e-3, self.refresh_hz)
+        next_open = 0.0
+        next_t = time.monotonic()
+        while not self._stop.is_set():
+            if self._dev is None and time.monotonic() >= next_open:
+                if not self._open():
+                    next_open = time.monotonic() + self.reconnect_s
+            if self._dev is not None:
+                self._write_frame()
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_t = time.monotonic()
+
+    def close(self) -> None:
+        """Arrête le thread ; envoie un blackout si le port est ouvert."""
+        self._stop.set()
+        self._thread.join(1.0)
+        if self._dev is not None:
+            self.blackout()
+            self._write_frame()
+            try:
+                self._dev.close()
+            except Exception:
+                pass
+            self._dev = None
+        self.connected = False
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+event_bus.py
+Chambre Sonore – Bus d'événements en processus pour les sorties (audio, DMX, journal).
+
+Le producteur (boucle de détection) publie des événements horodatés
+(CellEvent : "enter", "exit", "dwell", "occupancy") sans jamais attendre
+un consommateur :
+    - chaque abonné a sa propre file BORNÉE ;
+    - si la file est pleine, l'événement le plus ancien est jeté
+      (drop-oldest) et compté ;
+    - maxlen=None : file non bornée, aucun événement jeté (pour les
+      abonnés dont l'état dépend de chaque paire enter/exit, comme l'audio
+      qui boucle un son jusqu'à la sortie) ;
+    - les abonnés s'exécutent sur leur propre thread (ThreadSubscriber)
+      ou comme tâche asyncio dans une boucle existante (AsyncSubscriber).
+Un consommateur lent (journal, appel DMX externe) ne retarde donc jamais
+la détection ; au pire il perd des événements anciens.
+
+Usage :
+    bus = EventBus()
+    bus.subscribe("audio", on_event, kinds=("enter", "exit"), maxlen=None)
+    bus.publish_many(events)
+    ...
+    bus.close()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import traceback
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+
+class _Subscriber(ABC):
+    """File bornée drop-oldest (ou non bornée) + filtre par type d'événement."""
+
+    def __init__(self, name: str, kinds: Optional[Iterable[str]],
+                 maxlen: Optional[int]) -> None:
+        self.name = name
+        self.kinds = frozenset(kinds) if kinds else None
+        self.maxlen = None if maxlen is None else max(1, int(maxlen))
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def accepts(self, event) -> bool:
+        return self.kinds is None or event.kind in self.kinds
+
+    def _full(self, queue) -> bool:
+        return self.maxlen is not None and len(queue) >= self.maxlen
+
+    def _report_error(self, exc: BaseException) -> None:
+        self.failed += 1
+        print(f"[EventBus] Abonné '{self.name}' : erreur {exc!r}")
+        if self.failed == 1:
+            traceback.print_exc()
+
+    @abstractmethod
+    def pending(self) -> int:
+        """Nombre d'événements en attente dans la file."""
+
+    @abstractmethod
+    def deliver(self, event) -> None:
+        """Dépose `event` dans la file (drop-oldest si bornée et pleine), sans bloquer."""
+
+    @abstractmethod
+    def close(self, timeout: float = 1.0) -> None:
+        """Termine les événements en attente puis arrête l'abonné."""
+
+
+# ----------------------------------------------------------------------
+# Abonné sur thread dédié
+# ----------------------------------------------------------------------
+
+class ThreadSubscriber(_Subscriber):
+    """Appelle callback(event) sur un thread démon dédié."""
+
+    def __init__(self, name: str, callback: Callable[[object], None],
+                 kinds: Optional[Iterable[str]] = None, maxlen: Optional[int] = 256) -> None:
+        super().__init__(name, kinds, maxlen)
+        self.callback = callback
+        self._queue: Deque[object] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"bus-{name}", daemon=True)
+        self._thread.start()
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def deliver(self, event) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            if self._full(self._queue):
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(event)
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                event = self._queue.popleft()
+            try:
+                self.callback(event)
+                self.delivered += 1
+            except Exception as e:
+                self._report_error(e)
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Termine les événements en attente puis arrête le thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+
+# ----------------------------------------------------------------------
+# Abonné asyncio
+# ----------------------------------------------------------------------
+
+class AsyncSubscriber(_Subscriber):
+    """Exécute `await handler(event)` dans une tâche de la boucle asyncio `loop`."""
+
+    def __init__(self, name: str, handler, loop: asyncio.AbstractEventLoop,
+                 kinds: Optional[Iterable[str]] = None, maxlen: Optional[int] = 256) -> None:
+        super().__init__(name, kinds, maxlen)
+        self.handler = handler
+        self.loop = loop
+        self._queue: Deque[object] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._task = asyncio.run_coroutine_threadsafe(self._run(), loop)
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def deliver(self, event) -> None:
+        # La file est protégée par un verrou : deliver() est appelé depuis
+        # le thread producteur, la tâche consomme dans la boucle asyncio.
+        with self._lock:
+            if self._closed:
+                return
+            if self._full(self._queue):
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(event)
+        self.loop.call_soon_threadsafe(self._notify)
+
+    def _notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        self._wakeup = asyncio.Event()
+        while True:
+            with self._lock:
+                event = self._queue.popleft() if self._queue else None
+                closed = self._closed
+            if event is None:
+                if closed:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            try:
+                await self.handler(event)
+                self.delivered += 1
+            except Exception as e:
+                self._report_error(e)
+
+    def close(self, timeout: float = 1.0) -> None:
+        with self._lock:
+            self._closed = True
+        self.loop.call_soon_threadsafe(self._notify)
+        try:
+            self._task.result(timeout)
+        except Exception:
+            self._task.cancel()
+
+
+# ----------------------------------------------------------------------
+# Bus
+# ----------------------------------------------------------------------
+
+class EventBus:
+    """Diffuse les événements publiés à tous les abonnés intéressés, sans bloquer."""
+
+    def __init__(self) -> None:
+        self._subscribers: List[_Subscriber] = []
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, name: str, callback: Callable[[object], None],
+                  kinds: Optional[Iterable[str]] = None, maxlen: Optional[int] = 256) -> ThreadSubscriber:
+        """Abonné sur thread dédié ; kinds = types acceptés (None = tous),
+        maxlen = taille de la file (None = non bornée, rien n'est jeté)."""
+        return self._add(ThreadSubscriber(name, callback, kinds, maxlen))
+
+    def subscribe_async(self, name: str, handler, loop: asyncio.AbstractEventLoop,
+                        kinds: Optional[Iterable[str]] = None,
+                        maxlen: Optional[int] = 256) -> AsyncSubscriber:
+        """Abonné coroutine (async def handler(event)) dans la boucle `loop`."""
+        return self._add(AsyncSubscriber(name, handler, loop, kinds, maxlen))
+
+    def _add(self, sub: _Subscriber) -> _Subscriber:
+        with self._lock:
+            self._subscribers = self._subscribers + [sub]
+        return sub
+
+    def unsubscribe(self, sub: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not sub]
+        sub.close()
+
+    # ------------------------------------------------------------------
+
+    def publish(self, event) -> None:
+        """Dépose l'événement dans la file de chaque abonné concerné (non bloquant)."""
+        self.published += 1
+        for sub in self._subscribers:
+            if sub.accepts(event):
+                sub.deliver(event)
+
+    def publish_many(self, events: Iterable[object]) -> None:
+        for event in events:
+            self.publish(event)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Par abonné : traités, jetés (file pleine), en erreur, en attente."""
+        return {
+            s.name: {
+                "delivered": s.delivered,
+                "dropped": s.dropped,
+                "failed": s.failed,
+                "pending": s.pending(),
+            }
+            for s in self._subscribers
+        }
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Arrête tous les abonnés (après les événements en attente)."""
+        with self._lock:
+            subs, self._subscribers = self._subscribers, []
+        for sub in subs:
+            sub.close(timeout)
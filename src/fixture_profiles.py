@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+fixture_profiles.py
+Chambre Sonore – Profils de projecteurs DMX (ordre et rôle des canaux).
+
+Un profil décrit, canal par canal, ce qu'attend le projecteur :
+    red, green, blue, white  -> couleur de la cellule
+    dimmer                   -> intensité de la cellule
+    tout autre nom (strobe, mode, macro, none…) -> valeur fixe
+                                (`values`, 0 par défaut)
+et un facteur d'échelle optionnel par rôle (`scales`, ex. plafonner le
+dimmer à 0.8).
+
+Règles de rendu :
+    - profil AVEC dimmer : les canaux couleur reçoivent la couleur brute,
+      l'intensité passe par le dimmer ;
+    - profil SANS dimmer, ou `premultiplied` : les canaux couleur sont
+      multipliés par l'intensité (profil générique des cellules sans
+      profil : R, G, B × intensité + dimmer, comme avant les profils, donc
+      tout à 0 quand la cellule est inactive) ;
+    - profil avec white : white = min(R, G, B), retiré des canaux R, G, B.
+
+compile_channel_map() « compile » les profils d'une grille de cellules en
+tableaux précalculés (slot DMX, colonne source, échelle, + canaux fixes).
+DMXCompositor (src/dmx_compositor.py) rend alors toutes les cellules en
+une seule étape vectorisée, quel que soit le mélange de projecteurs.
+
+Profils utilisateur : config/fixtures.json (voir load_profiles()).
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+DMX_SLOTS = 512
+
+# ----------------------------------------------------------------------
+# Colonnes sources par cellule (calculées par DMXCompositor.compose)
+# ----------------------------------------------------------------------
+
+# Valeurs brutes 0–255, puis les mêmes multipliées par l'intensité
+SOURCE_COLUMNS = ("red", "green", "blue", "white", "red_w", "green_w", "blue_w", "full")
+N_RAW = len(SOURCE_COLUMNS)
+N_SOURCES = 2 * N_RAW
+_RAW = {name: i for i, name in enumerate(SOURCE_COLUMNS)}
+
+COLOR_ROLES = ("red", "green", "blue", "white")
+DYNAMIC_ROLES = COLOR_ROLES + ("dimmer",)
+
+
+@dataclass
+class FixtureProfile:
+    name: str
+    channels: Tuple[str, ...]
+    values: Dict[str, int] = field(default_factory=dict)      # canaux fixes
+    scales: Dict[str, float] = field(default_factory=dict)    # échelle par rôle
+    premultiplied: bool = False     # couleur × intensité même avec un dimmer
+
+    @property
+    def has_dimmer(self) -> bool:
+        return "dimmer" in self.channels
+
+    @property
+    def has_white(self) -> bool:
+        return "white" in self.channels
+
+    def source_of(self, role: str) -> int:
+        """Colonne source d'un rôle dynamique (-1 = canal fixe)."""
+        if role not in DYNAMIC_ROLES:
+            return -1
+        if role == "dimmer":
+            return N_RAW + _RAW["full"]
+        raw = _RAW[role + "_w"] if self.has_white and role != "white" else _RAW[role]
+        # Avec dimmer : couleur brute ; sans (ou premultiplied) : couleur × intensité
+        return raw if self.has_dimmer and not self.premultiplied else N_RAW + raw
+
+    @classmethod
+    def from_dict(cls, name: str, d: dict) -> "FixtureProfile":
+        return cls(
+            name=name,
+            channels=tuple(str(c) for c in d.get("channels", ())),
+            values={str(k): int(v) for k, v in d.get("values", {}).items()},
+            scales={str(k): float(v) for k, v in d.get("scales", {}).items()},
+            premultiplied=bool(d.get("premultiplied", False)),
+        )
+
+    def to_dict(self) -> dict:
+        return {"channels": list(self.channels), "values": dict(self.values),
+                "scales": dict(self.scales), "premultiplied": self.premultiplied}
+
+
+PROFILES: Dict[str, FixtureProfile] = {p.name: p for p in (
+    FixtureProfile("dimmer", ("dimmer",)),
+    FixtureProfile("rgb", ("red", "green", "blue")),
+    FixtureProfile("rgbd", ("red", "green", "blue", "dimmer")),
+    FixtureProfile("drgb", ("dimmer", "red", "green", "blue")),
+    FixtureProfile("rgbw", ("red", "green", "blue", "white")),
+    FixtureProfile("drgbws", ("dimmer", "red", "green", "blue", "white", "strobe")),
+    # Chauvet SlimPAR 56, mode 7 canaux (mode 0 = contrôle DMX direct)
+    FixtureProfile("slimpar56_7ch",
+                   ("red", "green", "blue", "macro", "strobe", "mode", "dimmer")),
+)}
+
+
+def generic_profile(channels: int) -> FixtureProfile:
+    """Profil implicite d'une cellule sans profil : R, G, B (× intensité), dimmer puis canaux à 0."""
+    n = max(0, int(channels))
+    if n == 1:
+        return PROFILES["dimmer"]
+    roles = ("red", "green", "blue", "dimmer")[:n] + ("none",) * max(0, n - 4)
+    return FixtureProfile(f"generic_{n}", roles, premultiplied=True)
+
+
+def get_profile(name: str, channels: int = 3) -> FixtureProfile:
+    """Profil nommé ; nom vide ou inconnu -> profil générique à `channels` canaux."""
+    profile = PROFILES.get(name) if name else None
+    if profile is None:
+        if name:
+            print(f"[DMX] Profil de projecteur inconnu : {name!r} (générique utilisé)")
+        profile = generic_profile(channels)
+    return profile
+
+
+def load_profiles(path: Union[str, Path, None] = None) -> Dict[str, FixtureProfile]:
+    """
+    Ajoute à PROFILES les profils d'un JSON :
+        {"mon_par": {"channels": ["dimmer", "red", "green", "blue", "strobe"],
+                     "values": {"strobe": 0}, "scales": {"dimmer": 0.8}}}
+    """
+    if path is None:
+        path = Path(__file__).resolve().parent.parent / "config" / "fixtures.json"
+    path = Path(path)
+    if path.exists():
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            for name, d in raw.items():
+                PROFILES[name] = FixtureProfile.from_dict(name, d)
+        except Exception as exc:
+            print(f"[DMX] Erreur chargement {path.name} : {exc}")
+    return PROFILES
+
+
+# ----------------------------------------------------------------------
+# Compilation de la carte de canaux
+# ----------------------------------------------------------------------
+
+@dataclass
+class ChannelMap:
+    """Tableaux précalculés : slots dynamiques (source, échelle) et slots fixes."""
+    slots: np.ndarray           # slots DMX 0-based (uniques si starts est fixé)
+    sources: np.ndarray         # index à plat dans la table (cellules, N_SOURCES)
+    scales: np.ndarray          # échelle par source (float32)
+    starts: Optional[np.ndarray]  # débuts de groupes des slots partagés (HTP)
+    const_slots: np.ndarray
+    const_values: np.ndarray    # uint8
+    used_slots: int
+    shared: int                 # nombre de canaux partagés
+
+
+def _compile_template(profile: FixtureProfile):
+    """(offsets, sources, scales) dynamiques et (offsets, valeurs) fixes d'un profil."""
+    dyn, const = [], []
+    for k, role in enumerate(profile.channels):
+        src = profile.source_of(role)
+        if src >= 0:
+            dyn.append((k, src, float(profile.scales.get(role, 1.0))))
+        else:
+            const.append((k, int(profile.values.get(role, 0))))
+    d = np.array(dyn, dtype=np.float64).reshape(-1, 3)
+    c = np.array(const, dtype=np.int64).reshape(-1, 2)
+    return (d[:, 0].astype(np.intp), d[:, 1].astype(np.intp), d[:, 2].astype(np.float32),
+            c[:, 0].astype(np.intp), np.clip(c[:, 1], 0, 255).astype(np.uint8))
+
+
+def compile_channel_map(addresses: np.ndarray,
+                        profiles: Union[FixtureProfile, Sequence[FixtureProfile]]) -> ChannelMap:
+    """
+    addresses : (N,) adresse DMX 1-based du premier canal de chaque cellule (0 = pas de sortie)
+    profiles  : un profil commun, ou un profil par cellule
+    Vectorisé par profil : une boucle sur les profils DISTINCTS, pas sur les cellules.
+    """
+    addresses = np.asarray(addresses, dtype=np.intp).reshape(-1)
+    n = addresses.size
+    if isinstance(profiles, FixtureProfile):
+        profiles = [profiles] * n
+    if len(profiles) != n:
+        raise ValueError(f"{len(profiles)} profils pour {n} cellules")
+
+    by_name: Dict[str, Tuple[FixtureProfile, list]] = {}
+    for i, p in enumerate(profiles):
+        by_name.setdefault(p.name, (p, []))[1].append(i)
+
+    slots, sources, scales, cslots, cvals = [], [], [], [], []
+    for profile, idx in by_name.values():
+        cells = np.asarray(idx, dtype=np.intp)
+        cells = cells[addresses[cells] > 0]
+        if cells.size == 0:
+            continue
+        base = addresses[cells, None] - 1
+        off, src, scl, coff, cval = _compile_template(profile)
+        slots.append((base + off[None, :]).reshape(-1))
+        sources.append((cells[:, None] * N_SOURCES + src[None, :]).reshape(-1))
+        scales.append(np.broadcast_to(scl, (cells.size, scl.size)).reshape(-1))
+        cslots.append((base + coff[None, :]).reshape(-1))
+        cvals.append(np.broadcast_to(cval, (cells.size, cval.size)).reshape(-1))
+
+    def cat(parts, dtype):
+        return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+    slots, sources, scales = cat(slots, np.intp), cat(sources, np.intp), cat(scales, np.float32)
+    cslots, cvals = cat(cslots, np.intp), cat(cvals, np.uint8)
+
+    ok = (slots >= 0) & (slots < DMX_SLOTS)
+    slots, sources, scales = slots[ok], sources[ok], scales[ok]
+    ok = (cslots >= 0) & (cslots < DMX_SLOTS)
+    cslots, cvals = cslots[ok], cvals[ok]
+    used = int(max(slots.max(initial=-1), cslots.max(initial=-1))) + 1
+
+    # Slots partagés : sources regroupées par slot pour le max (HTP)
+    order = np.argsort(slots, kind="stable")
+    unique, starts = np.unique(slots[order], return_index=True)
+    shared = slots.size - unique.size
+    if shared:
+        return ChannelMap(unique, sources[order], scales[order], starts, cslots, cvals, used, shared)
+    return ChannelMap(slots, sources, scales, None, cslots, cvals, used, 0)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+floor_calibration.py
+Chambre Sonore – Auto-calibration de la pose caméra sur le sol de la pièce vide.
+
+Principe :
+    1) nuage de points sous-échantillonné (un pixel sur `stride`) reconstruit
+       avec les rayons précalculés de ZoneMapper3D (repère caméra)
+    2) RANSAC vectorisé : toutes les hypothèses de plan (triplets tirés au
+       hasard) sont évaluées d'un coup sur un échantillon de points ;
+       seuls les plans « sous » la caméra et à peu près horizontaux sont
+       retenus (les murs sont écartés)
+    3) raffinement par moindres carrés (SVD) sur les inliers
+    4) la normale donne la verticale dans le repère caméra :
+           pitch = asin(g_z), roulis = atan2(g_x, g_y)
+       et la distance caméra → plan donne la hauteur
+
+Le résultat s'applique par ZoneMapper3D.set_pose(), qui reconstruit les
+tables dérivées une seule fois.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class FloorCalibrationResult:
+    height_m: float
+    pitch_deg: float
+    roll_deg: float
+    normal: Tuple[float, float, float]   # verticale (vers le bas), repère caméra
+    inlier_ratio: float                  # inliers / points échantillonnés
+    rms_mm: float                        # écart RMS des inliers au plan
+    n_points: int
+    elapsed_ms: float
+
+    def describe(self) -> str:
+        return (
+            f"hauteur={self.height_m:.3f} m, pitch={self.pitch_deg:.2f}°, "
+            f"roulis={self.roll_deg:.2f}°, inliers={self.inlier_ratio * 100:.0f} %, "
+            f"rms={self.rms_mm:.1f} mm ({self.elapsed_ms:.0f} ms)"
+        )
+
+
+# ----------------------------------------------------------------------
+# RANSAC
+# ----------------------------------------------------------------------
+
+def fit_floor_plane(
+    points: np.ndarray,
+    iterations: int = 256,
+    threshold_m: float = 0.02,
+    max_tilt_deg: float = 60.0,
+    min_height_m: float = 0.3,
+    max_points: int = 4000,
+    rng: Optional[np.random.Generator] = None,
+) -> Optional[Tuple[np.ndarray, float, np.ndarray]]:
+    """
+    Ajuste le plan du sol sur un nuage (N, 3) en repère caméra (m).
+
+    Retourne (g, h, inliers) avec g la verticale unitaire vers le bas
+    (g·p = h sur le sol), h la hauteur de la caméra et inliers un masque
+    booléen sur `points` ; None si aucun plan plausible.
+    """
+    pts = np.asarray(points, dtype=np.float32)
+    if pts.shape[0] < 3:
+        return None
+    rng = rng or np.random.default_rng(0)
+
+    # Échantillon pour le score (les hypothèses sont tirées dedans)
+    if pts.shape[0] > max_points:
+        sample = pts[rng.choice(pts.shape[0], max_points, replace=False)]
+    else:
+        sample = pts
+
+    # Hypothèses : K triplets → normales (K, 3)
+    idx = rng.integers(0, sample.shape[0], size=(iterations, 3))
+    p0, p1, p2 = sample[idx[:, 0]], sample[idx[:, 1]], sample[idx[:, 2]]
+    n = np.cross(p1 - p0, p2 - p0)
+    norm = np.linalg.norm(n, axis=1)
+    ok = norm > 1e-9
+    n[ok] /= norm[ok, None]
+
+    # Orientation : g·p0 = h > 0 (le plan est « sous » la caméra)
+    h = np.einsum("ij,ij->i", n, p0)
+    flip = h < 0
+    n[flip] *= -1.0
+    h = np.abs(h)
+
+    # Plans plausibles : assez bas, verticale proche de l'axe Y image
+    ok &= (h > min_height_m) & (n[:, 1] > np.cos(np.radians(max_tilt_deg)))
+    if not ok.any():
+        return None
+    n, h = n[ok], h[ok]
+
+    # Score de toutes les hypothèses d'un coup : (K, M)
+    dist = np.abs(sample @ n.T - h[None, :])
+    counts = (dist < threshold_m).sum(axis=0)
+    best = int(np.argmax(counts))
+    g, hb = n[best], float(h[best])
+
+    # Raffinement SVD sur les inliers de tout le nuage (deux passes)
+    for _ in range(2):
+        inliers = np.abs(pts @ g - hb) < threshold_m
+        if inliers.sum() < 3:
+            return None
+        sel = pts[inliers].astype(np.float64)
+        centroid = sel.mean(axis=0)
+        _u, _s, vt = np.linalg.svd(sel - centroid, full_matrices=False)
+        g = vt[2]
+        hb = float(g @ centroid)
+        if hb < 0:
+            g, hb = -g, -hb
+
+    inliers = np.abs(pts @ g - hb) < threshold_m
+    return g.astype(np.float64), hb, inliers
+
+
+# ----------------------------------------------------------------------
+# Calibration depuis une frame de profondeur
+# ----------------------------------------------------------------------
+
+def calibrate_floor(
+    depth_mm: np.ndarray,
+    mapper,
+    stride: int = 4,
+    iterations: int = 256,
+    threshold_m: float = 0.02,
+    seed: int = 0,
+    roi=None,
+) -> Optional[FloorCalibrationResult]:
+    """
+    Estime hauteur, pitch et roulis de la caméra à partir d'une frame de
+    profondeur (mm) de la pièce vide. Les intrinsèques sont celles du mapper.
+
+    roi : (y0, y1, x0, x1) si la frame est recadrée (PipelineOrbbec.roi) ;
+          les rayons pleine résolution du mapper sont recadrés de même.
+    """
+    t0 = time.perf_counter()
+    if depth_mm is None:
+        return None
+
+    if roi is None:
+        mapper._ensure_tables(depth_mm.shape)
+        ray_x, ray_y = mapper.ray_x, mapper.ray_y
+    else:
+        y0, y1, x0, x1 = roi
+        ray_x, ray_y = mapper.ray_x[y0:y1, x0:x1], mapper.ray_y[y0:y1, x0:x1]
+        if ray_x.shape != depth_mm.shape:
+            return None
+
+    step = max(1, int(stride))
+    d = depth_mm[::step, ::step]
+    valid = d > 200
+    z = d[valid].astype(np.float32) / 1000.0
+    pts = np.stack([
+        ray_x[::step, ::step][valid] * z,
+        ray_y[::step, ::step][valid] * z,
+        z,
+    ], axis=1)
+
+    fit = fit_floor_plane(
+        pts,
+        iterations=iterations,
+        threshold_m=threshold_m,
+        rng=np.random.default_rng(seed),
+    )
+    if fit is None:
+        return None
+    g, h, inliers = fit
+
+    residual = pts[inliers] @ g - h
+    pitch_deg = float(np.degrees(np.arcsin(np.clip(g[2], -1.0, 1.0))))
+    roll_deg = float(np.degrees(np.arctan2(g[0], g[1])))
+
+    return FloorCalibrationResult(
+        height_m=float(h),
+        pitch_deg=pitch_deg,
+        roll_deg=roll_deg,
+        normal=(float(g[0]), float(g[1]), float(g[2])),
+        inlier_ratio=float(inliers.mean()) if inliers.size else 0.0,
+        rms_mm=float(np.sqrt(np.mean(residual ** 2)) * 1000.0) if residual.size else 0.0,
+        n_points=int(pts.shape[0]),
+        elapsed_ms=(time.perf_counter() - t0) * 1000.0,
+    )
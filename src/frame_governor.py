@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+frame_governor.py
+Chambre Sonore – Régulation de la qualité selon le budget de temps par frame.
+
+Quand la machine est chargée (autres applications, throttling thermique),
+le traitement d'une frame dépasse la période du QTimer et la latence de
+déclenchement des cellules dérive. Le gouverneur :
+    - mesure le temps de traitement de chaque frame (moyenne exponentielle)
+    - descend d'un niveau de qualité quand la moyenne dépasse le budget
+      pendant `down_after` frames consécutives
+    - remonte d'un niveau quand il reste de la marge (moyenne sous
+      headroom × budget) pendant `up_after` frames consécutives
+    - respecte un délai minimal entre deux transitions
+    - journalise chaque transition (DiagnosticLog si fourni)
+
+Les niveaux sont de simples descriptions (décimation, fenêtre du filtre
+temporel, cadence des vues) ; leur application est déléguée au callback
+on_change, pour rester indépendant de Qt et du pipeline. Sans filtre
+temporel configuré, effective_levels() retire les niveaux qui ne
+changeraient que la fenêtre du filtre.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    name: str
+    decimation_mode: str = "off"            # voir depth_filters.DECIMATION_MODES
+    decimation_factor: int = 1
+    temporal_window: Optional[int] = None   # None = réglage du pipeline, 0 = coupé
+    view_fps: float = 15.0                  # cadence des vues profondeur / couleur
+
+
+# Du meilleur au plus économique
+DEFAULT_LEVELS: List[QualityLevel] = [
+    QualityLevel("pleine qualité"),
+    QualityLevel("vues 8 fps", view_fps=8.0),
+    QualityLevel("1/2 médiane", "median", 2, view_fps=8.0),
+    QualityLevel("1/2 min, filtre N=3", "min", 2, temporal_window=3, view_fps=5.0),
+    QualityLevel("1/4 pas, sans filtre", "stride", 4, temporal_window=0, view_fps=3.0),
+]
+
+
+def effective_levels(levels: List[QualityLevel], temporal: bool = True) -> List[QualityLevel]:
+    """Niveaux qui changent réellement quelque chose par rapport au précédent.
+
+    temporal=False : le pipeline n'a pas de filtre temporel, temporal_window
+    est ignoré (un niveau qui ne diffère que par là n'économise rien).
+    """
+    kept: List[QualityLevel] = []
+    previous = None
+    for level in levels:
+        key = (level.decimation_mode, level.decimation_factor, level.view_fps,
+               level.temporal_window if temporal else None)
+        if key != previous:
+            kept.append(level)
+            previous = key
+    return kept
+
+
+class FrameGovernor:
+    """Choisit un niveau de qualité à partir des temps de traitement mesurés."""
+
+    def __init__(
+        self,
+        budget_ms: float = 40.0,
+        levels: Optional[List[QualityLevel]] = None,
+        on_change: Optional[Callable[[QualityLevel], None]] = None,
+        diag=None,
+        alpha: float = 0.2,
+        down_after: int = 5,
+        up_after: int = 60,
+        headroom: float = 0.6,
+        min_interval_s: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        budget_ms      : temps de traitement visé par frame.
+        on_change      : appelé avec le nouveau QualityLevel à chaque transition.
+        diag           : DiagnosticLog (optionnel) pour journaliser les transitions.
+        down_after     : frames consécutives au-dessus du budget avant de descendre.
+        up_after       : frames consécutives sous headroom × budget avant de remonter.
+        min_interval_s : délai minimal entre deux transitions (laisse la mesure
+                         se stabiliser au nouveau niveau).
+        """
+        self.budget_ms = float(budget_ms)
+        self.levels = list(levels or DEFAULT_LEVELS)
+        self.on_change = on_change
+        self.diag = diag
+        self.alpha = float(alpha)
+        self.down_after = int(down_after)
+        self.up_after = int(up_after)
+        self.headroom = float(headroom)
+        self.min_interval_s = float(min_interval_s)
+        self._clock = clock
+
+        self.enabled = True
+        self.index = 0
+        self.avg_ms: Optional[float] = None
+        self.transitions = 0
+        self._over = 0
+        self._under = 0
+        self._last_change = -float("inf")
+
+    # ------------------------------------------------------------------
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.levels[self.index]
+
+    def reset(self, index: int = 0) -> None:
+        """Revient au niveau `index` (appliqué via on_change) et oublie la mesure."""
+        self.avg_ms = None
+        self._over = self._under = 0
+        if index != self.index:
+            self._set_level(index, "réinitialisation")
+
+    def update(self, frame_ms: float) -> Optional[QualityLevel]:
+        """Ajoute la mesure d'une frame ; retourne le nouveau niveau en cas de transition."""
+        ms = float(frame_ms)
+        self.avg_ms = ms if self.avg_ms is None else self.avg_ms + self.alpha * (ms - self.avg_ms)
+
+        if not self.enabled:
+            return None
+
+        if self.avg_ms > self.budget_ms:
+            self._over += 1
+            self._under = 0
+        elif self.avg_ms < self.budget_ms * self.headroom:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+
+        if self._clock() - self._last_change < self.min_interval_s:
+            return None
+
+        if self._over >= self.down_after and self.index < len(self.levels) - 1:
+            reason = f"{self.avg_ms:.1f} ms > budget {self.budget_ms:.0f} ms"
+            return self._set_level(self.index + 1, reason)
+
+        if self._under >= self.up_after and self.index > 0:
+            reason = f"{self.avg_ms:.1f} ms < {self.budget_ms * self.headroom:.0f} ms"
+            return self._set_level(self.index - 1, reason)
+
+        return None
+
+    # ------------------------------------------------------------------
+
+    def _set_level(self, index: int, reason: str) -> QualityLevel:
+        index = max(0, min(len(self.levels) - 1, int(index)))
+        previous_index = self.index
+        previous = self.levels[previous_index]
+        self.index = index
+        self._over = self._under = 0
+        self._last_change = self._clock()
+        self.transitions += 1
+
+        level = self.levels[index]
+        message = f"Gouverneur : {previous.name} → {level.name} ({reason})"
+        if self.diag is None:
+            print(f"[Governor] {message}")
+        elif index > previous_index:
+            self.diag.warning(message)
+        else:
+            self.diag.info(message)
+
+        if self.on_change is not None:
+            self.on_change(level)
+        return level
@@ -13,6 +13,7 @@ Boucle Qt :
 
 import numpy as np
 import math
+import time
 
 from PyQt6.QtCore import Qt, QTimer, QPoint
 from PyQt6.QtWidgets import (
@@ -33,7 +34,9 @@ from PyQt6.QtWidgets import (
     QTextEdit,
     QMessageBox,
     QSizePolicy,
-    QStackedLayout
+    QStackedLayout,
+    QComboBox,
+    QCheckBox
 )
 from PyQt6.QtGui import QAction
 
@@ -41,9 +44,21 @@ from PyQt6.QtGui import QAction
 from src.orbbec_view_depth import OrbbecDepthView
 from src.zone_detector import ZoneDetector
 from src.cell_config import CellConfig, CellConfigEntry, DMXConfig
-from src.zone_mapper_3d import ZoneMapper3D
+from src.zone_mapper_3d import ZoneMapper3D, DECIMATION_LEVELS
+from src.floor_calibration import calibrate_floor
+from src.frame_governor import DEFAULT_LEVELS, FrameGovernor, effective_levels
+from src.occupancy_grid import OccupancyGrid
+from src.cell_state import CellStateEngine
+from src.event_bus import EventBus
+from src.osc_output import OscConfig, OscOutput
+from src.control_engine import ControlConfig, ControlEngine
+from src.dmx_compositor import DMXCompositor
+from src.fixture_profiles import PROFILES, load_profiles
 from src.sound_engine import SoundEngine
 from src.orbbec_view_color import OrbbecColorView
+from src.grid_view import GridView, CELL_ACTIVE
+from src.diagnostic_log import DiagnosticLog
+from src.diagnostic_panel import DiagnosticPanel
 
 
 # ----------------------------------------------------------------------
@@ -119,11 +134,10 @@ class GridUI(QWidget):
         print("GridUI initialisé, pipeline reçu :", self.pipeline)
 
         self.depth_view = None
-        self.cells = []
+        self.grid_view = None
 
         # Moteur audio (lecture des .wav associés aux cellules)
         self.sound_engine = SoundEngine()
-        self._last_active_cell = None
 
         self._last_ground_xy = None
         self._calibration_active = False
@@ -132,9 +146,25 @@ class GridUI(QWidget):
         self._calibration_countdown = 0
         
 
+        # Canal de diagnostic borné (journal + statistiques live)
+        self.diag = DiagnosticLog(capacity=500)
+
+        # Bus des événements de cellule : chaque sortie sur son propre
+        # thread, file bornée (un consommateur lent ne retarde pas la détection) ;
+        # l'audio ne perd rien : une sortie jetée laisserait un son en boucle
+        self.bus = EventBus()
+        self.bus.subscribe("audio", self.handle_zone_activity_3d,
+                           kinds=("enter", "exit"), maxlen=None)
+        self.bus.subscribe("journal", self._log_cell_event, maxlen=64)
+        if self.dmx is not None:
+            self.bus.subscribe("dmx", self._send_lights, kinds=("enter", "exit"), maxlen=8)
+
         # Clipboard interne pour copier/coller config de cellule
         self._cell_clipboard = None
 
+        # Cellules en cours de test (son en boucle)
+        self._testing_cells = set()
+
         # ------------------------------------------------------------------
         # Charger l'état système (camera + pièce + matrice)
         # ------------------------------------------------------------------
@@ -145,6 +175,7 @@ class GridUI(QWidget):
         self.cam_angle_deg   = state["camera"]["angle_deg"]
         self.cam_wall_dist_m = state["camera"]["wall_dist_m"]
         self.cam_offset_m    = state["camera"]["offset_m"]
+        self.cam_roll_deg    = state["camera"].get("roll_deg", 0.0)
 
         # Pièce
         self.room_width_m    = state["room"]["width_m"]
@@ -154,6 +185,34 @@ class GridUI(QWidget):
         self.grid_rows       = state["grid"]["rows"]
         self.grid_cols       = state["grid"]["cols"]
 
+        # Mapping (décimation de la profondeur, estimateur de position)
+        mapping = state.get("mapping", {})
+        self.decimation_mode    = mapping.get("decimation_mode", "off")
+        self.decimation_factor  = int(mapping.get("decimation_factor", 1))
+        self.auto_quality       = bool(mapping.get("auto_quality", False))
+        self.centroid_estimator = mapping.get("centroid_estimator", "median")
+        self.centroid_method    = mapping.get("centroid_method", "histogram")
+        # Filtres de profondeur : lus par main.py pour construire le pipeline,
+        # conservés ici pour être réécrits tels quels
+        self.temporal_filter    = mapping.get("temporal_filter", "off")
+        self.temporal_window    = int(mapping.get("temporal_window", 5))
+        self.temporal_alpha     = float(mapping.get("temporal_alpha", 0.4))
+        self.spatial_filter     = mapping.get("spatial_filter")
+
+        # Sortie OSC vers un moteur sonore externe (abonnée au bus si activée)
+        self.osc_config = OscConfig.from_dict(state.get("osc", {}))
+        self.osc = None
+        if self.osc_config.enabled:
+            self.osc = OscOutput(self.osc_config)
+            self.bus.subscribe("osc", self.osc.on_event)
+
+        # Gain continu par cellule (distance, présence, occupation) à cadence
+        # de contrôle, indépendante de la caméra ; géométrie fixée par
+        # _build_grid_labels
+        self.control_config = ControlConfig.from_dict(state.get("control", {}))
+        self.control = ControlEngine(self.grid_rows, self.grid_cols,
+                                     self.control_config, on_gain=self._apply_cell_gain)
+
         # ------------------------------------------------------------------
         # Mapper 3D à partir des paramètres chargés
         # ------------------------------------------------------------------
@@ -161,12 +220,36 @@ class GridUI(QWidget):
             cam_height_m=self.cam_height_m,
             cam_angle_deg=self.cam_angle_deg,
             cam_wall_dist_m=self.cam_wall_dist_m,
-            cam_offset_m=self.cam_offset_m
+            cam_offset_m=self.cam_offset_m,
+            cam_roll_deg=self.cam_roll_deg,
+            room_width_m=self.room_width_m,
+            room_depth_m=self.room_depth_m
+        )
+        self.mapper3d.set_decimation(self.decimation_mode, self.decimation_factor)
+        self.mapper3d.set_centroid(self.centroid_estimator, self.centroid_method)
+
+        # Gouverneur : dégrade / rétablit la qualité selon le temps par frame
+        # (budget sous la période de 50 ms du QTimer)
+        self._base_temporal = None
+        pipeline_cfg = getattr(self.pipeline, "cfg", None)
+        if pipeline_cfg is not None and getattr(pipeline_cfg, "temporal_filter", "off") != "off":
+            self._base_temporal = (
+                pipeline_cfg.temporal_filter,
+                pipeline_cfg.temporal_window,
+                pipeline_cfg.temporal_alpha,
+            )
+        self.governor = FrameGovernor(
+            budget_ms=40.0,
+            levels=effective_levels(DEFAULT_LEVELS, temporal=self._base_temporal is not None),
+            on_change=self._apply_quality_level,
+            diag=self.diag,
         )
+        self.governor.enabled = self.auto_quality
 
         # ------------------------------------------------------------------
-        # Configuration des cellules
+        # Configuration des cellules (+ profils de projecteurs utilisateur)
         # ------------------------------------------------------------------
+        load_profiles()
         self.cell_config = CellConfig(
             room_width_m=self.room_width_m,
             room_depth_m=self.room_depth_m,
@@ -199,6 +282,7 @@ class GridUI(QWidget):
 
         self._build_ui()
         self._start_timer()
+        self.control.start()
 
     # ------------------------------------------------------------------
     def _load_system_state(self):
@@ -214,7 +298,8 @@ class GridUI(QWidget):
                 "height_m": 1.75,
                 "angle_deg": 10.0,
                 "wall_dist_m": 0.04,
-                "offset_m": 0.0
+                "offset_m": 0.0,
+                "roll_deg": 0.0
             },
             "room": {
                 "width_m": 4.328,
@@ -248,7 +333,8 @@ class GridUI(QWidget):
                 "height_m": self.cam_height_m,
                 "angle_deg": self.cam_angle_deg,
                 "wall_dist_m": self.cam_wall_dist_m,
-                "offset_m": self.cam_offset_m
+                "offset_m": self.cam_offset_m,
+                "roll_deg": self.cam_roll_deg
             },
             "room": {
                 "width_m": self.room_width_m,
@@ -257,7 +343,20 @@ class GridUI(QWidget):
             "grid": {
                 "rows": self.grid_rows,
                 "cols": self.grid_cols
-            }
+            },
+            "mapping": {
+                "decimation_mode": self.decimation_mode,
+                "decimation_factor": self.decimation_factor,
+                "auto_quality": self.auto_quality,
+                "centroid_estimator": self.centroid_estimator,
+                "centroid_method": self.centroid_method,
+                "temporal_filter": self.temporal_filter,
+                "temporal_window": self.temporal_window,
+                "temporal_alpha": self.temporal_alpha,
+                "spatial_filter": self.spatial_filter
+            },
+            "osc": self.osc_config.to_dict(),
+            "control": self.control_config.to_dict()
         }
 
         if not os.path.exists("config"):
@@ -306,33 +405,48 @@ class GridUI(QWidget):
         # Bouton de bascule
         self.toggle_button = QPushButton("Afficher couleur / profondeur")
         self.toggle_button.clicked.connect(self.toggle_view_mode)
-        main_layout.addWidget(self.toggle_button)
+
+        # Résolution du mapping (décimation), modifiable à chaud
+        self.decimation_combo = QComboBox()
+        current = 0
+        for i, (label, mode, factor) in enumerate(DECIMATION_LEVELS):
+            self.decimation_combo.addItem(label, (mode, factor))
+            if (mode, factor) == (self.decimation_mode, self.decimation_factor):
+                current = i
+        self.decimation_combo.setCurrentIndex(current)
+        self.decimation_combo.currentIndexChanged.connect(self._on_decimation_changed)
+
+        view_row = QHBoxLayout()
+        view_row.addWidget(self.toggle_button, stretch=1)
+        view_row.addWidget(QLabel("Mapping :"))
+        view_row.addWidget(self.decimation_combo)
+
+        # Qualité automatique (gouverneur) : remplace le choix manuel
+        self.auto_quality_check = QCheckBox("Auto")
+        self.auto_quality_check.setToolTip(
+            "Réduit automatiquement la qualité (décimation, filtre, vues) "
+            "quand une frame dépasse son budget de temps"
+        )
+        self.auto_quality_check.setChecked(self.auto_quality)
+        self.decimation_combo.setEnabled(not self.auto_quality)
+        self.auto_quality_check.toggled.connect(self._on_auto_quality_toggled)
+        view_row.addWidget(self.auto_quality_check)
+        main_layout.addLayout(view_row)
 
 
 
-        # GRILLE DYNAMIQUE
-        self.grid_layout = QGridLayout()
-        self.grid_layout.setSpacing(2)
+        # GRILLE DYNAMIQUE (un seul widget peint, piloté par un tableau d'états)
         self._build_grid_labels()
-        self.grid_layout.setHorizontalSpacing(3)
-        self.grid_layout.setVerticalSpacing(3)
 
         grid_container = QHBoxLayout()
         grid_container.addStretch(1)
-        grid_container.addLayout(self.grid_layout)
+        grid_container.addWidget(self.grid_view, alignment=Qt.AlignmentFlag.AlignTop)
         grid_container.addStretch(1)
         main_layout.addLayout(grid_container, stretch=1)
 
-        self.grid_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-
-        self.calibration_log = QTextEdit()
-        self.calibration_log.setReadOnly(True)
-        self.calibration_log.setMinimumHeight(120)
-        self.calibration_log.setStyleSheet(
-            "background:#f5f5f5; color:#000; font-size:15px; "
-            "padding:8px; border:1px solid #aaa;"
-        )
-        main_layout.addWidget(self.calibration_log)
+        # Diagnostic : statistiques live + journal borné (rafraîchi à 4 Hz)
+        self.diag_panel = DiagnosticPanel(self.diag, refresh_ms=250, parent=self)
+        main_layout.addWidget(self.diag_panel)
 
 
         # BOUTONS
@@ -356,6 +470,11 @@ class GridUI(QWidget):
         self.btn_cam.setFixedHeight(50)
         self.btn_cam.clicked.connect(self.open_camera_config_dialog)
 
+        self.btn_floor = QPushButton("Calibrer le sol")
+        self.btn_floor.setStyleSheet(btn_style)
+        self.btn_floor.setFixedHeight(50)
+        self.btn_floor.clicked.connect(self._auto_calibrate_floor)
+
         self.btn_quit = QPushButton("Quitter")
         self.btn_quit.setStyleSheet(btn_style)
         self.btn_quit.setFixedHeight(50)
@@ -366,6 +485,7 @@ class GridUI(QWidget):
         btn_layout.addWidget(self.btn_reset)
         btn_layout.addWidget(self.btn_config)
         btn_layout.addWidget(self.btn_cam)
+        btn_layout.addWidget(self.btn_floor)
         # Bouton Calibration
         self.btn_calibrate = QPushButton("Capturer position")
         self.btn_calibrate.setStyleSheet(btn_style)
@@ -389,36 +509,37 @@ class GridUI(QWidget):
 
     # ------------------------------------------------------------------
     def _build_grid_labels(self) -> None:
-        """Construit les cellules de la matrice comme des QPushButton cliquables."""
-        # Nettoyer l'ancienne grille
-        while self.grid_layout.count():
-            item = self.grid_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.setParent(None)
-
-        self.cells = []
-
-        for row in range(self.grid_rows):
-            row_cells = []
-            for col in range(self.grid_cols):
-
-                btn = CellWidget(row, col, self)
-
-                # Cellules carrées
-                cell_size = self._compute_cell_size()
-                btn.setFixedSize(cell_size, cell_size)
-
-                btn.setStyleSheet(
-                    "background:#222; color:white; "
-                    "border:1px solid #444; padding:4px;"
-                )
-
-
-                self.grid_layout.addWidget(btn, row, col)
-                row_cells.append(btn)
+        """Construit (ou redimensionne) la vue matrice et son tableau d'états."""
+        self._cell_states = np.zeros((self.grid_rows, self.grid_cols), dtype=np.uint8)
+
+        # Occupation 3D (cellules × tranches de hauteur) et anti-rebond des
+        # cellules à la même taille ; les sons des cellules actives sont
+        # relâchés avant redimensionnement
+        if getattr(self, "occupancy", None) is None:
+            self.occupancy = OccupancyGrid(self.grid_rows, self.grid_cols)
+            self.cell_engine = CellStateEngine(self.grid_rows, self.grid_cols,
+                                               activate_n=3, deactivate_n=6,
+                                               dwell_tick_s=1.0)
+        else:
+            self.occupancy.resize(self.grid_rows, self.grid_cols)
+            if (self.grid_rows, self.grid_cols) != (self.cell_engine.rows, self.cell_engine.cols):
+                self.bus.publish_many(self.cell_engine.reset())
+                self.cell_engine.resize(self.grid_rows, self.grid_cols)
+        self._rebuild_lights()
+        self.control.set_geometry(self.room_width_m, self.room_depth_m,
+                                  self.grid_rows, self.grid_cols)
+
+        if self.grid_view is None:
+            self.grid_view = GridView(self.grid_rows, self.grid_cols, self.cell_config, self)
+            self.grid_view.cellTestRequested.connect(self.test_cell)
+            self.grid_view.cellEditRequested.connect(self._edit_cell_from_grid_button_core)
+            self.grid_view.cellCopyRequested.connect(self._copy_cell)
+            self.grid_view.cellPasteRequested.connect(self._paste_cell)
+        else:
+            self.grid_view.set_grid(self.grid_rows, self.grid_cols)
 
-            self.cells.append(row_cells)
+        # Cellules carrées
+        self.grid_view.set_cell_size(self._compute_cell_size())
 
     # ------------------------------------------------------------------
     def _copy_cell(self, row, col):
@@ -427,32 +548,29 @@ class GridUI(QWidget):
             self._cell_clipboard = entry.clone()
             print(f"[COPY] {row},{col}")
 
-    def _paste_cell(self, row, col, display_btn):
+    def _paste_cell(self, row, col):
         if self._cell_clipboard:
             entry = self.cell_config.get_cell(row, col)
             entry.apply_from(self._cell_clipboard)
-            display_btn.setText(entry.name)
             self.cell_config.set_cell(entry)
             self.cell_config.save()
+            self.grid_view.refresh_labels()
+            self._rebuild_lights()
             print(f"[PASTE] {row},{col}")
 
     # ------------------------------------------------------------------
 
-    # Petite méthode utilitaire pour édition
-    def _edit_cell_from_grid_button(self, btn):
-        row = btn.property("cell_row")
-        col = btn.property("cell_col")
-        self._edit_cell_from_grid_button_core(row, col, btn)
-
-    def _edit_cell_from_grid_button_core(self, row, col, btn):
+    # Édition d'une cellule (menu contextuel de la grille)
+    def _edit_cell_from_grid_button_core(self, row, col):
         entry = self.cell_config.get_cell(row, col)
         if entry is None:
             return
         dialog = CellEditorDialog(entry, parent=self)
         if dialog.exec():
             self.cell_config.set_cell(dialog.entry)
-            btn.setText(dialog.entry.name)
             self.cell_config.save()
+            self.grid_view.refresh_labels()
+            self._rebuild_lights()
 
     # ------------------------------------------------------------------
 
@@ -464,51 +582,14 @@ class GridUI(QWidget):
 
     # ------------------------------------------------------------------
 
-    def _map_position_to_cell_local(self, pos_xy, ground_xy):
-        """Mappe une position (x, y) + le nuage au sol vers une cellule (r, c).
+    def _map_position_to_cell_local(self, pos_xy):
+        """Mappe une position (x, y) absolue (repère pièce) vers une cellule (r, c).
 
-        - y (profondeur réelle) → rangée
-        - x (largeur relative dans le nuage) → colonne
+        x et y sont absolus (sol segmenté, ROI sans les murs) : la cellule
+        vient directement de ZoneMapper3D.map_to_cell, None hors pièce.
         """
-        if pos_xy is None:
-            return None
-
-        x, y = pos_xy
-
-        # ----------------------------
-        # RANGÉE : basée sur la profondeur
-        # ----------------------------
-        if not (0 <= y < self.room_depth_m):
-            return None
-
-        cell_h = self.room_depth_m / float(self.grid_rows)
-        r = int(y // cell_h)
-        r = max(0, min(self.grid_rows - 1, r))
-
-        # ----------------------------
-        # COLONNE : basée sur la largeur du nuage de points
-        # ----------------------------
-        if ground_xy is None or ground_xy.size == 0:
-            # pas d'info → colonne centrale
-            c = self.grid_cols // 2
-            return (r, c)
-
-        xs = ground_xy[:, 0].astype(float)
-
-        min_x = float(xs.min())
-        max_x = float(xs.max())
-        span = max_x - min_x
-
-        if span < 0.05:
-            # nuage trop étroit → personne est presque en face de la caméra
-            c = self.grid_cols // 2
-        else:
-            ratio = (x - min_x) / span
-            ratio = max(0.0, min(0.999, ratio))
-            c = int(ratio * self.grid_cols)
-
-        c = max(0, min(self.grid_cols - 1, c))
-        return (r, c)
+        return self.mapper3d.map_to_cell(pos_xy, self.room_width_m, self.room_depth_m,
+                                         self.grid_rows, self.grid_cols)
 
 
     # ------------------------------------------------------------------
@@ -516,6 +597,7 @@ class GridUI(QWidget):
 
 
     def update_frame_and_zones(self) -> None:
+        t_frame = time.perf_counter()   # poll + filtres compris (gouverneur)
         ok = self.pipeline.poll()
         if not ok:
             return
@@ -533,14 +615,14 @@ class GridUI(QWidget):
 
                 if self._calibration_wait % 20 == 0:  # toutes les ~1 sec
                     seconds_left = self._calibration_wait // 20
-                    self.calibration_log.append(f"Préparation : {seconds_left} s")
+                    self.diag.info(f"Préparation : {seconds_left} s")
 
                 if self._calibration_wait <= 0:
                     # Activer la PHASE 2 : vrai décompte
                     self._calibration_phase = 2
                     self._calibration_last_seconds = -1
                     self._calibration_countdown = 200   # ≈10 sec
-                    self.calibration_log.append("Décompte lancé…")
+                    self.diag.info("Décompte lancé…")
                 return
 
             # ----------------------------------------------------
@@ -554,27 +636,23 @@ class GridUI(QWidget):
                 if self._calibration_countdown >= 0:
                     seconds_left = (self._calibration_countdown + ticks_per_second - 1) // ticks_per_second
                     if seconds_left != self._calibration_last_seconds:
-                        self.calibration_log.append(f"Décompte : {seconds_left} s")
+                        self.diag.info(f"Décompte : {seconds_left} s")
                         self._calibration_last_seconds = seconds_left
 
                 if self._calibration_countdown <= 0:
 
                     if self._last_ground_xy is None:
-                        self.calibration_log.append("Aucune donnée 3D capturée.")
+                        self.diag.info("Aucune donnée 3D capturée.")
                         self._calibration_active = False
                         return
 
                     pos = self.mapper3d.detect_person_position(self._last_ground_xy)
-                    if pos is not None:
-                        xd, yd = pos
-                        self.calibration_log.append(f"POS: x={xd:.2f}, y={yd:.2f}")
-
 
                     if pos is None:
-                        self.calibration_log.append("Aucune personne détectée.")
+                        self.diag.info("Aucune personne détectée.")
                     else:
                         xd, yd = pos
-                        self.calibration_log.append(
+                        self.diag.info(
                             f"Calibration - position détectée = ({xd:.3f}, {yd:.3f})"
                         )
 
@@ -587,7 +665,7 @@ class GridUI(QWidget):
                         offset_x = target_x - xd
                         offset_y = target_y - yd
 
-                        self.calibration_log.append(
+                        self.diag.info(
                             f"Offset appliqué : x={offset_x:.3f}, y={offset_y:.3f}"
                         )
 
@@ -595,7 +673,7 @@ class GridUI(QWidget):
                         self.mapper3d.offset_y = offset_y
                         self._save_system_state()
 
-                        self.calibration_log.append("Calibration complétée.")
+                        self.diag.info("Calibration complétée.")
 
                     self._calibration_active = False
 
@@ -604,6 +682,8 @@ class GridUI(QWidget):
         # --------------------------------------------------------
         # PIPELINE NORMAL
         # --------------------------------------------------------
+        t_start = time.perf_counter()
+        self.diag.tick_frame()
 
         # 1. Profondeur
         depth_img = self.pipeline.get_depth_frame()
@@ -618,16 +698,37 @@ class GridUI(QWidget):
         # 2. Données profondeur
         depth_data = self.pipeline.get_depth_data()
         if depth_data is None:
-            self._clear_grid()
+            self.diag.warning("Aucune donnée de profondeur.", key="no_depth", interval_s=5.0)
+            self._update_cells(None)
+            self._finish_frame(t_frame, t_start)   # un blocage compte aussi
             return
 
-        # 3. Reconstruction 3D
-        cloud = self.mapper3d.compute_point_cloud(depth_data)
-
-        # 4. Projection sol
+        t_acq = time.perf_counter()
+        self.diag.record_timing("acquisition", (t_acq - t_start) * 1000.0)
+
+        # 3. Reconstruction 3D (intrinsèques du profil actif ; no-op si inchangées)
+        #    sur la frame recadrée à l'acquisition ; le recadrage n'est
+        #    recalculé que si la géométrie change
+        self.mapper3d.set_intrinsics(getattr(self.pipeline, "intrinsics", None))
+        cloud = self.mapper3d.compute_point_cloud(
+            depth_data, roi=getattr(self.pipeline, "roi", None))
+        frame_shape = getattr(self.pipeline, "frame_shape", None)
+        if frame_shape is not None:
+            self.pipeline.set_roi(self.mapper3d.roi_rect(frame_shape))
+        t_cloud = time.perf_counter()
+        self.diag.record_timing("cloud", (t_cloud - t_acq) * 1000.0)
+
+        # 4. Projection sol + occupation par tranches de hauteur
         ground_xy = self.mapper3d.project_to_ground(cloud)
-        self.calibration_log.append(f"cloud={cloud.shape}, ground={ground_xy.shape}")
+        self.occupancy.update(cloud, self.mapper3d)
+        if self.osc is not None:
+            self.osc.set_occupancy(self.occupancy.max_height_m)
+        self.bus.publish_many(self.occupancy.posture_events(time.monotonic()))
+        t_ground = time.perf_counter()
+        self.diag.record_timing("ground", (t_ground - t_cloud) * 1000.0)
 
+        self.diag.set_stat("cloud_points", int(cloud.shape[0]))
+        self.diag.set_stat("ground_points", int(ground_xy.shape[0]))
 
         # Conserver la dernière projection valide
         if ground_xy is not None and len(ground_xy) > 0:
@@ -635,63 +736,80 @@ class GridUI(QWidget):
 
         # 5. Position XY
         pos = self.mapper3d.detect_person_position(ground_xy)
+        self.diag.record_timing("position", (time.perf_counter() - t_ground) * 1000.0)
+
         if ground_xy is not None and ground_xy.size > 0:
-            if hasattr(self, "calibration_log"):
-                xs = ground_xy[:, 0]
-                ys = ground_xy[:, 1]
-                self.calibration_log.append(
-                    f"XY range: x=({xs.min():.2f},{xs.max():.2f}), y=({ys.min():.2f},{ys.max():.2f})"
-                )
-
-        if pos is not None:
-            xd, yd = pos
-            if hasattr(self, "calibration_log"):
-                self.calibration_log.append(
-                    f"POS: x={xd:.2f}, y={yd:.2f}"
-                )
-        
+            xs = ground_xy[:, 0]
+            ys = ground_xy[:, 1]
+            self.diag.set_stat(
+                "xy_range",
+                f"x=({xs.min():.2f},{xs.max():.2f}), y=({ys.min():.2f},{ys.max():.2f})"
+            )
+
         if pos is None:
-            self._clear_grid()
+            self.diag.set_stat("position", "–")
+            if self.osc is not None:
+                self.osc.set_positions([])
+            self.diag.set_stat("cell", "–")
+            self.diag.set_stat("posture", "–")
+            self._finish_frame(t_frame, t_start)
+            self._update_cells(None)
             return
 
-        # 6. XY → Cellule (nouvelle méthode locale)
-        cell = self._map_position_to_cell_local(pos, ground_xy)
+        xd, yd = pos
+        self.diag.set_stat("position", f"x={xd:.2f}, y={yd:.2f}")
+        if self.osc is not None:
+            self.osc.set_positions([{"id": 1, "x": xd, "y": yd, "z": 0.0}])
 
-        if cell is not None and hasattr(self, "calibration_log"):
-            r, c = cell
-            self.calibration_log.append(f"CELL: r={r}, c={c}")
+        # 6. XY → Cellule (nouvelle méthode locale)
+        cell = self._map_position_to_cell_local(pos)
+        self._finish_frame(t_frame, t_start)
 
         if cell is None:
-            self._clear_grid()
+            self.diag.set_stat("cell", "hors pièce")
+            self.diag.set_stat("posture", "–")
+            self._update_cells(None)
             return
 
-        r, c = cell
-
-        # 7. Mettre à jour la grille (une seule cellule active)
-        self._clear_grid()
+        self.diag.set_stat("cell", f"r={cell[0]}, c={cell[1]}")
 
-        if 0 <= r < self.grid_rows and 0 <= c < self.grid_cols:
-            self.cells[r][c].setStyleSheet(
-                "background:#ff8800; color:black; "
-                "border:3px solid white; padding:4px;"
+        r, c = cell
+        if 0 <= r < self.occupancy.rows and 0 <= c < self.occupancy.cols:
+            self.diag.set_stat(
+                "posture",
+                f"{self.occupancy.posture(r, c)} ({self.occupancy.max_height_m[r, c]:.1f} m)"
             )
-            self.cells[r][c].setText(f"{r},{c}\nACTIVE")
 
-        # 8. Hook DMX / sons
-        self.handle_zone_activity_3d(pos, (r, c))
+        # 7. Anti-rebond, grille et sons
+        self._update_cells((r, c), pos)
 
     # ------------------------------------------------------------------
 
-    def _clear_grid(self):
-        """Efface la coloration de la grille."""
-        for r in range(self.grid_rows):
-            for c in range(self.grid_cols):
-                btn = self.cells[r][c]
-                btn.refresh_display()
+    def _update_cells(self, cell, pos=None) -> None:
+        """
+        Ajoute l'observation de la frame (cellule vue, ou None) à l'anti-rebond,
+        transmet la position (x, y) absolue au moteur de contrôle,
+        puis met à jour la grille (seules les cellules dont l'état change sont
+        repeintes) ; entrées / sorties / présence partent sur le bus.
+        """
+        events = self.cell_engine.update([cell] if cell is not None else None)
+        np.multiply(self.cell_engine.active, CELL_ACTIVE, out=self._cell_states,
+                    casting="unsafe")
+        self.grid_view.set_states(self._cell_states)
+        np.copyto(self.lights.intensity, self.cell_engine.active)
+        # Dernières mesures pour le thread de contrôle (lissage à 100 Hz)
+        self.control.set_targets([pos] if cell is not None and pos is not None else [])
+        self.control.set_state(self.cell_engine.active, self.cell_engine.dwell_s(),
+                               self.occupancy.max_height_m)
+        self.bus.publish_many(events)
 
-                self.cells[r][c].setStyleSheet(
-                    "background:#222; color:white; border:1px solid #444; padding:4px;"
-                )
+    def _clear_grid(self):
+        """Relâche toutes les cellules et efface la coloration de la grille."""
+        events = self.cell_engine.reset()
+        self.lights.intensity.fill(0.0)
+        self.bus.publish_many(events)
+        self._cell_states.fill(0)
+        self.grid_view.set_states(self._cell_states)
 
     # ------------------------------------------------------------------
 
@@ -742,34 +860,50 @@ class GridUI(QWidget):
         # print("zones actives:\n", active_map.astype(int))
 
     # ------------------------------------------------------------------
-    def handle_zone_activity_3d(self, pos_xy, cell_rc):
-        """Déclenche lecture audio pour la cellule active."""
-        if cell_rc is None:
-            return
-
-        r, c = cell_rc
-        cell_info = self.cell_config.get_cell(r, c)
-        if cell_info is None:
+    def handle_zone_activity_3d(self, ev) -> None:
+        """Abonné "audio" du bus : arrêt à la sortie, lecture à l'entrée (CellEvent)."""
+        if ev.kind == "exit":
+            self.sound_engine.stop_cell(ev.cell_id)
             return
 
-        # Identifiant unique pour cette cellule
-        cell_id = f"{r},{c}"
-
-        # Si c'est la même cellule qu'à la frame précédente → ne relance pas
-        if self._last_active_cell == cell_id:
-            return
-
-        # Si une cellule jouait avant : l'arrêter
-        if self._last_active_cell is not None:
-            self.sound_engine.release_cell(self._last_active_cell)
-
-        # Nouveau son à jouer
-        wav_path = cell_info.wav
-        if wav_path:
-            self.sound_engine.play_for_cell(cell_id, wav_path, volume=1.0, pan=0.0)
-
-        # Mémoriser la cellule active
-        self._last_active_cell = cell_id
+        cell_info = self.cell_config.get_cell(ev.row, ev.col)
+        if cell_info is not None and cell_info.wav:
+            # Démarre au gain courant du moteur de contrôle, qui prend ensuite le relais
+            gain = self.control.gain_of(ev.row, ev.col) if self.control_config.enabled else 1.0
+            self.sound_engine.play_for_cell(ev.cell_id, cell_info.wav, volume=gain, pan=0.0)
+
+    def _apply_cell_gain(self, r: int, c: int, gain: float) -> None:
+        """Sortie du moteur de contrôle (son thread, ~100 Hz) : volume d'une cellule qui joue."""
+        self.sound_engine.set_volume(f"{r},{c}", gain)
+
+    def _rebuild_lights(self) -> None:
+        """Carte de canaux DMX et couleurs depuis cells.json (après édition / redimensionnement)."""
+        self.lights = DMXCompositor.from_cell_config(self.cell_config, self.grid_rows, self.grid_cols)
+        if hasattr(self, "cell_engine"):
+            np.copyto(self.lights.intensity, self.cell_engine.active)
+
+    def _send_lights(self, ev) -> None:
+        """Abonné "dmx" du bus : univers recomposé (un seul scatter) puis envoyé."""
+        universe = self.lights.compose()
+        self.dmx.send_buffer(universe[:self.lights.used_slots])
+
+    def _log_cell_event(self, ev) -> None:
+        """Abonné "journal" du bus (DiagnosticLog est thread-safe)."""
+        if ev.kind == "enter":
+            self.diag.info(f"Cellule {ev.cell_id} : entrée")
+        elif ev.kind == "exit":
+            self.diag.info(f"Cellule {ev.cell_id} : sortie après {ev.dwell_s:.1f} s")
+        elif ev.kind == "occupancy":
+            self.diag.debug(f"Cellule {ev.cell_id} : hauteur max {ev.level:.1f} m")
+
+    def closeEvent(self, event) -> None:
+        """Relâche les cellules et arrête les abonnés du bus."""
+        self.bus.publish_many(self.cell_engine.reset())
+        self.bus.close()
+        self.control.stop()
+        if self.osc is not None:
+            self.osc.close()
+        super().closeEvent(event)
 
     # ------------------------------------------------------------------
 
@@ -780,24 +914,6 @@ class GridUI(QWidget):
 
     # ------------------------------------------------------------------
 
-    def _edit_cell_from_grid(self):
-        """Édition directe d’une cellule en cliquant dans la grille."""
-        btn = self.sender()
-        row = btn.property("cell_row")
-        col = btn.property("cell_col")
-
-        entry = self.cell_config.get_cell(row, col)
-        if entry is None:
-            return
-
-        dialog = CellEditorDialog(entry, parent=self)
-        if dialog.exec():
-            # mettre à jour
-            self.cell_config.set_cell(dialog.entry)
-            btn.setText(dialog.entry.name)
-            self.cell_config.save()
-
-
     # ------------------------------------------------------------------
     def open_config_dialog(self) -> None:
         """Ouvre la fenêtre de configuration pièce / matrice."""
@@ -815,6 +931,7 @@ class GridUI(QWidget):
             self.room_depth_m = dialog.room_depth_m
             self.grid_rows = dialog.rows
             self.grid_cols = dialog.cols
+            self.mapper3d.set_room(self.room_width_m, self.room_depth_m)
 
             # print("Nouvelle configuration pièce/matrice :")
             # print("  largeur      :", self.room_width_m, "m")
@@ -836,6 +953,7 @@ class GridUI(QWidget):
 
             # Reconstruction UI
             self._build_grid_labels()
+            self.grid_view.refresh_labels()
             self.zone_detector = ZoneDetector(
                 rows=self.grid_rows,
                 cols=self.grid_cols
@@ -869,41 +987,138 @@ class GridUI(QWidget):
             print("  offset  =", self.cam_offset_m, "m")
 
             # Appliquer dans mapper 3D
-            self.mapper3d.cam_height_m    = self.cam_height_m
-            self.mapper3d.cam_angle_deg   = self.cam_angle_deg
             self.mapper3d.cam_wall_dist_m = self.cam_wall_dist_m
             self.mapper3d.cam_offset_m    = self.cam_offset_m
-            self.mapper3d._update_rotation_matrix()
+            self.mapper3d.set_pose(self.cam_height_m, self.cam_angle_deg, self.cam_roll_deg)
 
             # Sauvegarde globale
             self._save_system_state()
 
+    # ------------------------------------------------------------------
+    def _on_auto_quality_toggled(self, checked: bool) -> None:
+        self.auto_quality = bool(checked)
+        self.decimation_combo.setEnabled(not checked)
+        self.governor.enabled = self.auto_quality
+        if checked:
+            self.diag.info("Qualité automatique activée")
+        else:
+            # Retour au niveau 0 puis au choix manuel
+            self.governor.reset(0)
+            self.mapper3d.set_decimation(self.decimation_mode, self.decimation_factor)
+            self.diag.info("Qualité automatique désactivée")
+        self._save_system_state()
+
+    def _apply_quality_level(self, level) -> None:
+        """Applique un niveau du gouverneur : décimation, filtre temporel, vues."""
+        # Jamais moins décimé que le réglage de l'utilisateur : un niveau
+        # dégradé ne remplace la décimation que s'il réduit davantage
+        if self.governor.index > 0 and level.decimation_factor > self.decimation_factor:
+            self.mapper3d.set_decimation(level.decimation_mode, level.decimation_factor)
+        else:
+            self.mapper3d.set_decimation(self.decimation_mode, self.decimation_factor)
+
+        if self._base_temporal is not None and hasattr(self.pipeline, "set_temporal_filter"):
+            mode, window, alpha = self._base_temporal
+            if level.temporal_window == 0:
+                self.pipeline.set_temporal_filter("off")
+            else:
+                self.pipeline.set_temporal_filter(mode, level.temporal_window or window, alpha)
+
+        for view in (self.depth_view, self.color_view):
+            if view is not None:
+                view.max_fps = level.view_fps
+
+        self.diag.set_stat("quality", level.name)
+
+    def _finish_frame(self, t_frame: float, t_start: float) -> None:
+        """Fin de frame : temps total (diagnostic) et mesure pour le gouverneur."""
+        now = time.perf_counter()
+        self.diag.record_timing("total", (now - t_start) * 1000.0)
+        self.governor.update((now - t_frame) * 1000.0)
+
+    def _on_decimation_changed(self, index: int) -> None:
+        mode, factor = self.decimation_combo.itemData(index)
+        self.decimation_mode, self.decimation_factor = mode, int(factor)
+        self.mapper3d.set_decimation(mode, factor)
+        self.diag.info(f"Mapping : {self.decimation_combo.itemText(index)}")
+        self._save_system_state()
+
+    # ------------------------------------------------------------------
+    def _auto_calibrate_floor(self) -> None:
+        """Estime hauteur / pitch / roulis sur la pièce vide (RANSAC sur le sol)."""
+        depth_data, roi = self._capture_full_depth()
+        if depth_data is None:
+            QMessageBox.warning(self, "Calibration du sol", "Aucune donnée de profondeur.")
+            return
+
+        result = calibrate_floor(depth_data, self.mapper3d, roi=roi)
+        if result is None:
+            self.diag.warning("Calibration du sol : aucun plan trouvé (pièce vide ? sol visible ?)")
+            QMessageBox.warning(
+                self, "Calibration du sol",
+                "Aucun plan de sol trouvé.\nVérifier que la pièce est vide et le sol visible.",
+            )
+            return
+
+        self.diag.info(f"Calibration du sol : {result.describe()}")
+        answer = QMessageBox.question(
+            self, "Calibration du sol",
+            f"Hauteur : {result.height_m:.3f} m (actuelle {self.cam_height_m:.3f})\n"
+            f"Angle   : {result.pitch_deg:.2f}° (actuel {self.cam_angle_deg:.2f})\n"
+            f"Roulis  : {result.roll_deg:.2f}°\n"
+            f"Inliers : {result.inlier_ratio * 100:.0f} %, écart RMS {result.rms_mm:.1f} mm\n\n"
+            "Appliquer et enregistrer ?",
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+
+        self.cam_height_m  = round(result.height_m, 3)
+        self.cam_angle_deg = round(result.pitch_deg, 2)
+        self.cam_roll_deg  = round(result.roll_deg, 2)
+        self.mapper3d.set_pose(self.cam_height_m, self.cam_angle_deg, self.cam_roll_deg)
+        self._save_system_state()
+
+    def _capture_full_depth(self, attempts: int = 10):
+        """
+        Frame de profondeur SANS recadrage : la ROI dérive de la pose
+        actuelle, justement celle que la calibration doit corriger.
+        Le recadrage est rétabli ensuite (la boucle de frames le recalcule).
+        Retourne (profondeur, roi effectivement appliquée).
+        """
+        if not hasattr(self.pipeline, "set_roi") or getattr(self.pipeline, "roi", None) is None:
+            return self.pipeline.get_depth_data(), getattr(self.pipeline, "roi", None)
+
+        previous = self.pipeline.roi
+        self.pipeline.set_roi(None)
+        try:
+            for _ in range(attempts):
+                if self.pipeline.poll(100) and self.pipeline.roi is None:
+                    return self.pipeline.get_depth_data(), None
+            return None, None
+        finally:
+            self.pipeline.set_roi(previous)
+
     def resizeEvent(self, event):
         """Recalcule la taille des cellules quand la fenêtre est redimensionnée."""
-        cell_size = self._compute_cell_size()
-        for row in self.cells:
-            for btn in row:
-                btn.setFixedSize(cell_size, cell_size)
+        if self.grid_view is not None:
+            self.grid_view.set_cell_size(self._compute_cell_size())
         super().resizeEvent(event)
 
     def _start_calibration(self):
         """Déclenche la calibration en demandant à l’utilisateur d’aller au centre."""
 
         # Reset du log visuel
-        if hasattr(self, "calibration_log"):
-            self.calibration_log.clear()
+        self.diag_panel.clear_log()
 
         # Vérifier que la caméra a déjà fourni un nuage au moins une fois
         if not hasattr(self, "_last_ground_xy") or self._last_ground_xy is None:
-            if hasattr(self, "calibration_log"):
-                self.calibration_log.append("Caméra pas encore prête.\nBouge un peu et réessaie.")
+            self.diag.warning("Caméra pas encore prête. Bouge un peu et réessaie.")
             return
 
         # Afficher instructions
-        if hasattr(self, "calibration_log"):
-            self.calibration_log.append("=== CALIBRATION ===")
-            self.calibration_log.append("Va te placer au centre entre (1,1) et (1,2).")
-            self.calibration_log.append("Début du décompte dans 5 secondes…")
+        self.diag.info("=== CALIBRATION ===")
+        self.diag.info("Va te placer au centre entre (1,1) et (1,2).")
+        self.diag.info("Début du décompte dans 5 secondes…")
 
         # IMPORTANT : initialiser les deux variables
         self._calibration_active = True
@@ -912,29 +1127,31 @@ class GridUI(QWidget):
     def test_cell(self, row, col):
         """
         Active la cellule en mode test :
-        - Allume la SlimPAR DMX via dmx_controller
+        - Allume la SlimPAR DMX via dmx_controller (couleur de la cellule)
         - Joue le fichier wav associé
-        - Le son joue en boucle jusqu'à nouvel appel
+        - Le son joue en boucle jusqu'à nouvel appel (second clic = arrêt)
         """
-        key = f"{row}_{col}"
-        cell = self.cells.get(key)
-        if not cell:
+        key = f"{row},{col}"
+        cell = self.cell_config.get_cell(row, col)
+        if cell is None:
             print(f"[Test] Cellule {key} inconnue.")
             return
 
         # DMX : activer le projecteur
         if self.dmx is not None:
             try:
-                self.dmx.set_intensity(cell.dmx_channel, 255)
+                self.dmx.send_rgb(*cell.dmx.color)
             except Exception as e:
                 print(f"[DMX] Erreur activation cellule {key} : {e}")
 
         # Audio : jouer / arrêter
-        if self.audio is not None:
-            if self.audio.is_playing(key):
-                self.audio.stop(key)
-            else:
-                self.audio.play(cell.wav_path, loop=True, cell_id=key)
+        test_id = f"test:{key}"
+        if test_id in self._testing_cells:
+            self.sound_engine.stop_cell(test_id)
+            self._testing_cells.discard(test_id)
+        elif cell.wav:
+            self.sound_engine.play_for_cell(test_id, cell.wav, volume=cell.volume, pan=0.5)
+            self._testing_cells.add(test_id)
 
         print(f"[Test] Cellule {key} testée.")
 
@@ -1194,6 +1411,17 @@ class CellEditorDialog(QDialog):
         self.channels_spin.setValue(entry.dmx.channels)
         form.addRow("Canaux DMX :", self.channels_spin)
 
+        # Profil de projecteur : fixe le nombre de canaux ("" = générique)
+        self.profile_combo = QComboBox(self)
+        self.profile_combo.addItem("(générique)", "")
+        for name in sorted(PROFILES):
+            self.profile_combo.addItem(name, name)
+        idx = self.profile_combo.findData(entry.dmx.profile)
+        self.profile_combo.setCurrentIndex(max(0, idx))
+        self.profile_combo.currentIndexChanged.connect(self._on_profile_changed)
+        form.addRow("Profil projecteur :", self.profile_combo)
+        self._on_profile_changed()
+
         self.color_r = QSpinBox(self)
         self.color_r.setRange(0, 255)
         self.color_r.setValue(entry.dmx.color[0])
@@ -1228,6 +1456,12 @@ class CellEditorDialog(QDialog):
         layout.addWidget(buttons)
         self.setLayout(layout)
 
+    def _on_profile_changed(self) -> None:
+        profile = PROFILES.get(self.profile_combo.currentData() or "")
+        if profile is not None:
+            self.channels_spin.setValue(len(profile.channels))
+        self.channels_spin.setEnabled(profile is None)
+
     def _browse_wav(self) -> None:
         path, _ = QFileDialog.getOpenFileName(
             self,
@@ -1250,7 +1484,8 @@ class CellEditorDialog(QDialog):
                 int(self.color_r.value()),
                 int(self.color_g.value()),
                 int(self.color_b.value())
-            )
+            ),
+            profile=self.profile_combo.currentData() or "",
         )
         super().accept()
 
@@ -1310,93 +1545,3 @@ class FloorMapDialog(QDialog):
         if dialog.exec():
             parent.cell_config.set_cell(dialog.entry)
             btn.setText(dialog.entry.name)
-
-
-
-class CellWidget(QWidget):
-    def __init__(self, row, col, parent_ui):
-        super().__init__(parent_ui)
-        self.row = row
-        self.col = col
-        self.parent_ui = parent_ui
-
-        # Layout principal vertical
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(0)
-
-        # 1) Zone TEST (3/5)
-        self.btn_test = QPushButton(f"{row},{col}\nTEST", self)
-        self.btn_test.setStyleSheet(
-            "background:#333; color:white; border:1px solid #555; font-size:18px;"
-        )
-        self.btn_test.clicked.connect(lambda: parent_ui.test_cell(row, col))
-        self.btn_test.setSizePolicy(QSizePolicy.Policy.Expanding,
-                                    QSizePolicy.Policy.Expanding)
-
-        # stretch = 3 pour occuper 3/5
-        layout.addWidget(self.btn_test, 3)
-
-        # 2) Zone boutons bas (2/5)
-        bottom = QHBoxLayout()
-        bottom.setContentsMargins(0, 0, 0, 0)
-        bottom.setSpacing(0)
-
-        # Styles uniformes
-        style_bottom = "background:#555; color:white; border:1px solid #333; font-size:14px;"
-
-        # Modifier
-        self.btn_edit = QPushButton("Modifier", self)
-        self.btn_edit.setStyleSheet(style_bottom)
-        self.btn_edit.clicked.connect(
-            lambda: parent_ui._edit_cell_from_grid_button_core(row, col, self.btn_test)
-        )
-        self.btn_edit.setSizePolicy(QSizePolicy.Policy.Expanding,
-                                    QSizePolicy.Policy.Expanding)
-        bottom.addWidget(self.btn_edit)
-
-        # Copier
-        self.btn_copy = QPushButton("Copier", self)
-        self.btn_copy.setStyleSheet(style_bottom)
-        self.btn_copy.clicked.connect(lambda: parent_ui._copy_cell(row, col))
-        self.btn_copy.setSizePolicy(QSizePolicy.Policy.Expanding,
-                                    QSizePolicy.Policy.Expanding)
-        bottom.addWidget(self.btn_copy)
-
-        # Coller
-        self.btn_paste = QPushButton("Coller", self)
-        self.btn_paste.setStyleSheet(style_bottom)
-        self.btn_paste.clicked.connect(
-            lambda: parent_ui._paste_cell(row, col, self.btn_test)
-        )
-        self.btn_paste.setSizePolicy(QSizePolicy.Policy.Expanding,
-                                     QSizePolicy.Policy.Expanding)
-        bottom.addWidget(self.btn_paste)
-
-        # stretch = 2 pour occuper 2/5
-        layout.addLayout(bottom, 2)
-
-    def refresh_display(self):
-        """
-        Met à jour le texte du bouton TEST :
-            ligne 1 : "row,col"
-            ligne 2 : adresse DMX (ex: 001)
-        Sans toucher à l’icône.
-        """
-        entry = self.parent_ui.cell_config.get_cell(self.row, self.col)
-
-        # Format row,col
-        coord = f"{self.row},{self.col}"
-
-        # Adresse DMX (3 chiffres)
-        if entry is not None and hasattr(entry, "dmx") and entry.dmx is not None:
-            try:
-                dmx_addr = int(entry.dmx.address)
-                dmx_str = f"{dmx_addr:03d}"
-            except Exception:
-                dmx_str = "---"
-        else:
-            dmx_str = "---"
-
-        self.btn_test.setText(f"{coord}\n{dmx_str}")
-
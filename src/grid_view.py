@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+grid_view.py
+Vue de la matrice Chambre Sonore dessinée dans un seul widget.
+
+Principe :
+    - l'état de chaque cellule est conservé dans un tableau numpy (rows × cols)
+    - set_states() compare le nouvel état à l'ancien et ne demande le
+      repaint QUE des cellules modifiées (update(rect) ciblé)
+    - un seul paintEvent dessine les cellules touchées
+    - les libellés (row,col + adresse DMX) ne sont recalculés qu'au
+      changement de configuration (refresh_labels), jamais à chaque frame
+
+Interaction :
+    - clic gauche  : test de la cellule (signal cellTestRequested)
+    - clic droit   : menu Modifier / Copier / Coller
+"""
+
+import numpy as np
+
+from PyQt6.QtCore import Qt, QRect, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPainter, QPen
+from PyQt6.QtWidgets import QMenu, QSizePolicy, QWidget
+
+
+# États possibles d'une cellule
+CELL_IDLE = 0
+CELL_ACTIVE = 1
+
+# Apparence par état : (fond, texte, bordure, épaisseur bordure)
+_STATE_STYLE = {
+    CELL_IDLE: (QColor("#222222"), QColor("white"), QColor("#444444"), 1),
+    CELL_ACTIVE: (QColor("#ff8800"), QColor("black"), QColor("white"), 3),
+}
+
+
+class GridView(QWidget):
+    """Matrice rows × cols peinte en un seul widget, pilotée par un tableau d'états."""
+
+    cellTestRequested = pyqtSignal(int, int)
+    cellEditRequested = pyqtSignal(int, int)
+    cellCopyRequested = pyqtSignal(int, int)
+    cellPasteRequested = pyqtSignal(int, int)
+
+    def __init__(self, rows: int, cols: int, cell_config=None, parent=None):
+        super().__init__(parent)
+        self.cell_config = cell_config
+        self.spacing = 3
+        self.cell_size = 60
+
+        self._font = QFont()
+        self._font.setPixelSize(16)
+
+        self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.set_grid(rows, cols)
+
+    # ------------------------------------------------------------------
+    # Géométrie
+    # ------------------------------------------------------------------
+
+    def set_grid(self, rows: int, cols: int) -> None:
+        """(Re)dimensionne la matrice ; toutes les cellules repassent au repos."""
+        self.rows = int(rows)
+        self.cols = int(cols)
+        self._states = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        self.refresh_labels()
+        self._update_fixed_size()
+
+    def set_cell_size(self, size: int) -> None:
+        if size == self.cell_size:
+            return
+        self.cell_size = int(size)
+        self._update_fixed_size()
+
+    def _update_fixed_size(self) -> None:
+        step = self.cell_size + self.spacing
+        self.setFixedSize(
+            max(1, self.cols * step - self.spacing),
+            max(1, self.rows * step - self.spacing),
+        )
+        self.update()
+
+    def _cell_rect(self, row: int, col: int) -> QRect:
+        step = self.cell_size + self.spacing
+        return QRect(col * step, row * step, self.cell_size, self.cell_size)
+
+    def _cell_at(self, x: int, y: int):
+        step = self.cell_size + self.spacing
+        col, col_off = divmod(int(x), step)
+        row, row_off = divmod(int(y), step)
+        if col_off >= self.cell_size or row_off >= self.cell_size:
+            return None  # clic dans l'espacement
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return (row, col)
+        return None
+
+    # ------------------------------------------------------------------
+    # États / libellés
+    # ------------------------------------------------------------------
+
+    def refresh_labels(self) -> None:
+        """Recalcule les libellés depuis cell_config (à appeler après édition)."""
+        self._labels = [
+            [self._label_for(r, c) for c in range(self.cols)]
+            for r in range(self.rows)
+        ]
+        self.update()
+
+    def _label_for(self, row: int, col: int) -> str:
+        coord = f"{row},{col}"
+        entry = None
+        if self.cell_config is not None:
+            entry = self.cell_config.get_cell(row, col)
+
+        # Adresse DMX (3 chiffres)
+        dmx_str = "---"
+        if entry is not None and getattr(entry, "dmx", None) is not None:
+            try:
+                dmx_str = f"{int(entry.dmx.address):03d}"
+            except Exception:
+                pass
+        return f"{coord}\n{dmx_str}"
+
+    def states(self) -> np.ndarray:
+        return self._states
+
+    def set_states(self, states: np.ndarray) -> None:
+        """Applique un nouveau tableau d'états ; seules les cellules modifiées sont repeintes."""
+        if states.shape != self._states.shape:
+            return
+        changed = np.argwhere(states != self._states)
+        if changed.size == 0:
+            return
+        np.copyto(self._states, states, casting="unsafe")
+        for r, c in changed:
+            self.update(self._cell_rect(int(r), int(c)))
+
+    def clear_states(self) -> None:
+        self.set_states(np.zeros_like(self._states))
+
+    # ------------------------------------------------------------------
+    # Dessin
+    # ------------------------------------------------------------------
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setFont(self._font)
+        dirty = event.rect()
+
+        for r in range(self.rows):
+            for c in range(self.cols):
+                rect = self._cell_rect(r, c)
+                if not rect.intersects(dirty):
+                    continue
+
+                state = int(self._states[r, c])
+                bg, fg, border, width = _STATE_STYLE.get(state, _STATE_STYLE[CELL_IDLE])
+
+                painter.fillRect(rect, bg)
+                painter.setPen(QPen(border, width))
+                half = width // 2
+                painter.drawRect(rect.adjusted(half, half, -half - 1, -half - 1))
+
+                text = self._labels[r][c]
+                if state == CELL_ACTIVE:
+                    text = f"{r},{c}\nACTIVE"
+                painter.setPen(fg)
+                painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+
+        painter.end()
+
+    # ------------------------------------------------------------------
+    # Souris
+    # ------------------------------------------------------------------
+
+    def mousePressEvent(self, event):
+        pos = event.position()
+        cell = self._cell_at(pos.x(), pos.y())
+        if cell is None:
+            super().mousePressEvent(event)
+            return
+
+        row, col = cell
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.cellTestRequested.emit(row, col)
+        elif event.button() == Qt.MouseButton.RightButton:
+            self._show_cell_menu(row, col, event.globalPosition().toPoint())
+
+    def _show_cell_menu(self, row: int, col: int, global_pos) -> None:
+        menu = QMenu(self)
+        act_edit = menu.addAction("Modifier")
+        act_copy = menu.addAction("Copier")
+        act_paste = menu.addAction("Coller")
+
+        chosen = menu.exec(global_pos)
+        if chosen is act_edit:
+            self.cellEditRequested.emit(row, col)
+        elif chosen is act_copy:
+            self.cellCopyRequested.emit(row, col)
+        elif chosen is act_paste:
+            self.cellPasteRequested.emit(row, col)
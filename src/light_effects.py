@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+light_effects.py
+Chambre Sonore – Effets lumineux par cellule (continu, strobe, fondus) à cadence fixe.
+
+Chaque cellule a un effet (modes de matrice.Eclairage) :
+    continu     -> niveau fixe tant que la cellule est tenue
+    strobe      -> créneau à strobe_hz (rapport cyclique 50 %)
+    fondu       -> montée sur `duree_s` à l'entrée, descente à la même pente à la sortie
+    fondu_up    -> montée sur `duree_s` puis maintien ; coupé à la sortie
+    fondu_down  -> plein niveau puis descente sur `duree_s` ; coupé à la sortie
+
+Durée "auto" : l'effet suit la présence (trigger → release).
+Durée "fixe" : l'effet se termine `duree_s` après le trigger, même si la
+cellule est encore tenue (comme l'ancien DMXInterface.strobe).
+
+render(now) évalue les enveloppes de TOUTES les cellules en quelques
+opérations numpy (aucune boucle par cellule) et retourne l'intensité
+(rows, cols) 0–1, à copier dans DMXCompositor.intensity. Le temps est
+toujours passé explicitement (ou lu sur `clock`, injectable) : à instant
+égal, rendu identique — testable sans attendre.
+
+start(sink) lance un thread à cadence fixe (44 Hz par défaut, proche du
+débit max d'un univers DMX complet) qui appelle sink(intensité) à chaque
+tick ; trigger() / release() ne bloquent jamais l'appelant.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+
+LIGHT_MODES = ("continu", "strobe", "fondu", "fondu_up", "fondu_down")
+_MODE_INDEX = {m: i for i, m in enumerate(LIGHT_MODES)}
+_CONTINU, _STROBE, _FONDU, _FONDU_UP, _FONDU_DOWN = range(len(LIGHT_MODES))
+
+DEFAULT_TICK_HZ = 44.0
+
+
+class LightEffects:
+    """Enveloppes lumineuses vectorisées sur la grille, rendues à cadence fixe."""
+
+    def __init__(
+        self,
+        rows: int,
+        cols: int,
+        tick_hz: float = DEFAULT_TICK_HZ,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.tick_hz = float(tick_hz)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.ticks = 0
+        self.late_ticks = 0
+        self._allocate(rows, cols)
+
+    def _allocate(self, rows: int, cols: int) -> None:
+        self.rows = int(rows)
+        self.cols = int(cols)
+        shape = (self.rows, self.cols)
+        # Paramètres d'effet
+        self.mode = np.full(shape, _CONTINU, dtype=np.int8)
+        self.level = np.ones(shape, dtype=np.float32)
+        self.duree_s = np.full(shape, 1.5, dtype=np.float64)
+        self.hold_s = np.full(shape, np.inf, dtype=np.float64)     # inf = durée "auto"
+        self.strobe_hz = np.full(shape, 8.0, dtype=np.float64)
+        # État : instants de trigger / release (-inf = jamais, inf = tenu)
+        self.t_on = np.full(shape, -np.inf, dtype=np.float64)
+        self.t_off = np.full(shape, -np.inf, dtype=np.float64)
+        self.intensity = np.zeros(shape, dtype=np.float32)
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+
+    def resize(self, rows: int, cols: int) -> None:
+        """Nouvelle taille de grille : effets et état remis à zéro."""
+        if (int(rows), int(cols)) != (self.rows, self.cols):
+            with self._lock:
+                self._allocate(rows, cols)
+
+    def set_effect(self, r: int, c: int, mode: str = "continu", intensite: float = 1.0,
+                   duree_s: float = 1.5, fixe: bool = False, strobe_hz: float = 8.0) -> None:
+        if mode not in _MODE_INDEX:
+            raise ValueError(f"Mode d'éclairage inconnu : {mode!r} (attendu : {LIGHT_MODES})")
+        with self._lock:
+            self.mode[r, c] = _MODE_INDEX[mode]
+            self.level[r, c] = min(1.0, max(0.0, float(intensite)))
+            self.duree_s[r, c] = max(0.05, float(duree_s))
+            self.hold_s[r, c] = self.duree_s[r, c] if fixe else np.inf
+            self.strobe_hz[r, c] = max(0.1, float(strobe_hz))
+
+    def set_all(self, mode: str = "continu", intensite: float = 1.0,
+                duree_s: float = 1.5, fixe: bool = False, strobe_hz: float = 8.0) -> None:
+        for r in range(self.rows):
+            for c in range(self.cols):
+                self.set_effect(r, c, mode, intensite, duree_s, fixe, strobe_hz)
+
+    def set_from_eclairage(self, r: int, c: int, eclairage, strobe_hz: float = 8.0) -> None:
+        """Effet d'une cellule depuis matrice.Eclairage (mode, intensité, durée)."""
+        self.set_effect(r, c, eclairage.mode, eclairage.intensite, eclairage.duree.valeur,
+                        eclairage.duree.type == "fixe", strobe_hz)
+
+    # ------------------------------------------------------------------
+    # Déclenchement (non bloquant)
+    # ------------------------------------------------------------------
+
+    def trigger(self, r: int, c: int, now: Optional[float] = None) -> None:
+        now = self._clock() if now is None else float(now)
+        with self._lock:
+            self.t_on[r, c] = now
+            self.t_off[r, c] = np.inf
+
+    def release(self, r: int, c: int, now: Optional[float] = None) -> None:
+        now = self._clock() if now is None else float(now)
+        with self._lock:
+            if self.t_off[r, c] == np.inf:
+                self.t_off[r, c] = now
+
+    def follow(self, active: np.ndarray, now: Optional[float] = None) -> None:
+        """Suit un masque (rows, cols) d'état filtré : fronts montants / descendants."""
+        now = self._clock() if now is None else float(now)
+        with self._lock:
+            held = self.t_off == np.inf
+            self.t_on[active & ~held] = now
+            self.t_off[active & ~held] = np.inf
+            self.t_off[~active & held] = now
+
+    def reset(self) -> None:
+        with self._lock:
+            self.t_on.fill(-np.inf)
+            self.t_off.fill(-np.inf)
+            self.intensity.fill(0.0)
+
+    # ------------------------------------------------------------------
+    # Rendu
+    # ------------------------------------------------------------------
+
+    def render(self, now: Optional[float] = None) -> np.ndarray:
+        """Intensité (rows, cols) 0–1 de toutes les cellules à l'instant `now`."""
+        now = self._clock() if now is None else float(now)
+        with self._lock:
+            mode, duree = self.mode, self.duree_s
+            started = np.isfinite(self.t_on)
+            t_on = np.where(started, self.t_on, now)
+            # Fin effective : release, ou fin de la durée "fixe"
+            end = np.minimum(self.t_off, t_on + self.hold_s)
+            t = now - t_on
+            ramp = np.clip(t / duree, 0.0, 1.0)
+
+            env = np.ones_like(t)
+            env = np.where(mode == _STROBE, np.floor(t * self.strobe_hz * 2.0) % 2.0 == 0.0, env)
+            env = np.where((mode == _FONDU) | (mode == _FONDU_UP), ramp, env)
+            env = np.where(mode == _FONDU_DOWN, 1.0 - ramp, env)
+
+            # Après la fin : seul "fondu" redescend, depuis le niveau atteint,
+            # à la même pente (1 / duree_s)
+            rel = now - end
+            ended = rel >= 0.0
+            with np.errstate(invalid="ignore"):
+                tail = np.clip(np.clip((end - t_on) / duree, 0.0, 1.0) - rel / duree, 0.0, 1.0)
+            env = np.where(ended, np.where(mode == _FONDU, tail, 0.0), env)
+            env = np.where(started, env, 0.0)
+
+            np.multiply(env, self.level, out=self.intensity, casting="unsafe")
+            return self.intensity
+
+    # ------------------------------------------------------------------
+    # Cadence fixe (thread dédié)
+    # ------------------------------------------------------------------
+
+    def start(self, sink: Callable[[np.ndarray], None]) -> None:
+        """Appelle sink(intensité) à tick_hz sur un thread démon."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(sink,),
+                                        name="light-effects", daemon=True)
+        self._thread.start()
+
+    def _run(self, sink: Callable[[np.ndarray], None]) -> None:
+        period = 1.0 / max(1e-3, self.tick_hz)
+        next_t = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                sink(self.render())
+            except Exception as e:
+                print(f"[Effets] Erreur de sortie : {e!r}")
+            self.ticks += 1
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                # En retard : on recale au lieu de rattraper
+                self.late_ticks += 1
+                next_t = time.monotonic()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
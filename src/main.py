@@ -3,17 +3,28 @@
 main.py — Pipeline hors Qt + Interface Qt
 """
 
+import json
 import sys
 from PyQt6.QtWidgets import QApplication
 from src.dmx_controller import DMXController
-from src.orbbec_depth_pipeline import PipelineOrbbec
+from src.orbbec_depth_pipeline import PipelineConfig, PipelineOrbbec
 from src.grid_ui import GridUI
 
 
+def load_mapping_state(path: str = "config/system_state.json") -> dict:
+    """Section "mapping" de system_state.json (filtres de profondeur)."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f).get("mapping", {})
+    except (OSError, ValueError) as e:
+        print(f"[Main] État système illisible ({e}), filtres par défaut.")
+        return {}
+
+
 def main():
 
-    # 1) Pipeline créé AVANT Qt
-    pipeline = PipelineOrbbec()
+    # 1) Pipeline créé AVANT Qt, avec les filtres enregistrés
+    pipeline = PipelineOrbbec(PipelineConfig.from_mapping(load_mapping_state()))
 
     # 2) Qt ensuite
     app = QApplication(sys.argv)
@@ -5,10 +5,15 @@ matrice.py — gestion de la matrice 6×6: lecture/sauvegarde JSON, structures e
 Chaque cellule contient:
 - objet sonore principal (optionnel) + 3 variations mappées à des plages de volume [0..1]
 - paramètres d'éclairage (intensité, couleur hex, mode, durée auto/fixe)
+
+Les plages de volume d'une cellule sont compilées (VariationTable) en
+bornes triées : la variation d'un volume se trouve par bisect, avec une
+hystérésis optionnelle autour de la variation en cours.
 """
 from __future__ import annotations
 from dataclasses import dataclass, field, asdict
-from typing import List, Dict, Any
+from bisect import bisect_left
+from typing import List, Dict, Any, Optional, Tuple
 import json, os, re
 
 GRID_W = 6
@@ -34,6 +39,58 @@ class Variation:
         if self.min_vol > self.max_vol:
             self.min_vol, self.max_vol = self.max_vol, self.min_vol
 
+def _scan_variation(variations: List[Variation], vol: float) -> int:
+    """Règle de référence (parcours linéaire) : index retenu pour `vol`, -1 si aucun fichier."""
+    chosen = -1
+    for i, v in enumerate(variations):
+        if v.min_vol <= vol <= v.max_vol and v.fichier:
+            return i
+        if v.fichier:
+            chosen = i
+    return chosen
+
+@dataclass
+class VariationTable:
+    """Plages de volume compilées en intervalles triés (recherche par bisect).
+
+    points   : bornes distinctes triées (min_vol / max_vol de toutes les plages)
+    at_point : variation retenue exactement sur chaque borne
+    in_gap   : variation retenue entre deux bornes (len(points) + 1 intervalles)
+    Même résultat que le parcours linéaire (plages inclusives, ordre de la
+    liste prioritaire, repli sur la dernière variation avec fichier).
+    """
+    points: List[float]
+    at_point: List[int]
+    in_gap: List[int]
+    files: List[str]
+    ranges: List[Tuple[float, float]]
+
+    @classmethod
+    def compile(cls, variations: List[Variation]) -> "VariationTable":
+        points = sorted({b for v in variations for b in (v.min_vol, v.max_vol)})
+        at_point = [_scan_variation(variations, p) for p in points]
+        # Un point quelconque de chaque intervalle ouvert suffit (résultat constant)
+        edges = [0.0] + points + [1.0]
+        in_gap = [_scan_variation(variations, 0.5 * (a + b)) for a, b in zip(edges, edges[1:])]
+        return cls(points, at_point, in_gap,
+                   [v.fichier for v in variations],
+                   [(v.min_vol, v.max_vol) for v in variations])
+
+    def index(self, vol: float) -> int:
+        vol = clamp01(vol)
+        i = bisect_left(self.points, vol)
+        if i < len(self.points) and self.points[i] == vol:
+            return self.at_point[i]
+        return self.in_gap[i]
+
+    def lookup(self, vol: float, current: int = -1, hysteresis: float = 0.0) -> int:
+        """Comme index(), mais garde `current` tant que vol reste à ±hysteresis de sa plage."""
+        if 0 <= current < len(self.ranges) and self.files[current]:
+            lo, hi = self.ranges[current]
+            if lo - hysteresis <= vol <= hi + hysteresis:
+                return current
+        return self.index(vol)
+
 @dataclass
 class DureeParam:
     type: str = "auto"   # "auto" ou "fixe"
@@ -70,22 +127,24 @@ class Cellule:
         Variation(0.67, 1.0, ""),
     ])
     eclairage: Eclairage = field(default_factory=Eclairage)
+    # table compilée des variations (recalculée après normalize())
+    _table: Optional[VariationTable] = field(default=None, init=False, repr=False, compare=False)
 
     def normalize(self) -> None:
         for v in self.variations:
             v.normalize()
         self.eclairage.normalize()
+        self._table = None
+
+    def variation_table(self) -> VariationTable:
+        if self._table is None:
+            self._table = VariationTable.compile(self.variations)
+        return self._table
 
     def select_variation_by_volume(self, vol: float) -> str:
-        vol = clamp01(vol)
-        # on parcourt dans l'ordre; si aucune plage stricte, on tombe sur la dernière non vide
-        chosen = ""
-        for v in self.variations:
-            if v.min_vol <= vol <= v.max_vol and v.fichier:
-                return v.fichier
-            if v.fichier:
-                chosen = v.fichier
-        return chosen
+        # plage contenant vol (ordre de la liste); sinon la dernière non vide
+        i = self.variation_table().index(vol)
+        return self.variations[i].fichier if i >= 0 else ""
 
 def cellule_to_dict(c: Cellule) -> Dict[str, Any]:
     return {
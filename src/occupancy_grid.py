@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+occupancy_grid.py
+Chambre Sonore – Occupation 3D grossière : cellules au sol × tranches de hauteur.
+
+Le mapping 2D ne garde que (x, y) : un visiteur qui lève les bras ou
+s'accroupit ne change rien, et un meuble bas ne se distingue pas d'une
+personne. Ici, chaque point du nuage (repère horizontal de
+ZoneMapper3D.compute_point_cloud) reçoit un indice de voxel
+
+    (rangée, colonne, tranche) → index linéaire
+
+et les effectifs de tous les voxels sont obtenus par UN SEUL np.bincount
+par frame (même ordre de coût que project_to_ground).
+
+Exposé :
+    counts           -> (rows, cols, n_bands) points par voxel
+    occupied         -> voxels avec au moins min_points points
+    max_height_m     -> (rows, cols) hauteur du haut de la tranche occupée
+                        la plus haute (0 si cellule vide)
+    profile(r, c)    -> effectifs par tranche d'une cellule
+    posture(r, c)    -> "vide", "bas", "accroupi" ou "debout" selon la
+                        hauteur maximale (seuils de OccupancyConfig)
+    posture_events() -> CellEvent "occupancy" des cellules dont la posture
+                        a changé à la dernière mise à jour
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from src.cell_state import CellEvent
+
+
+POSTURES = ("vide", "bas", "accroupi", "debout")
+
+
+@dataclass
+class OccupancyConfig:
+    band_m: float = 0.10          # épaisseur d'une tranche de hauteur
+    max_height_m: float = 2.20    # au-dessus : ignoré
+    min_points: int = 30          # points pour qu'un voxel soit occupé
+    low_max_m: float = 0.70       # hauteur max < low_max_m      → "bas" (meuble, assis au sol)
+    crouch_max_m: float = 1.30    # hauteur max < crouch_max_m   → "accroupi", sinon "debout"
+
+
+class OccupancyGrid:
+    """Grille d'occupation rows × cols × tranches, recalculée à chaque frame."""
+
+    def __init__(self, rows: int, cols: int, config: Optional[OccupancyConfig] = None) -> None:
+        self.config = config or OccupancyConfig()
+        self.n_bands = max(1, int(np.ceil(self.config.max_height_m / self.config.band_m)))
+        # Bords des tranches : [0, band, 2·band, ...]
+        self.band_edges_m = np.arange(self.n_bands + 1, dtype=np.float32) * self.config.band_m
+        self._allocate(rows, cols)
+
+    def _allocate(self, rows: int, cols: int) -> None:
+        self.rows = int(rows)
+        self.cols = int(cols)
+        self.counts = np.zeros((self.rows, self.cols, self.n_bands), dtype=np.int64)
+        self.occupied = np.zeros(self.counts.shape, dtype=bool)
+        self.max_height_m = np.zeros((self.rows, self.cols), dtype=np.float32)
+        self.posture_index = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        self._changed = np.zeros((self.rows, self.cols), dtype=bool)
+
+    # ------------------------------------------------------------------
+
+    def resize(self, rows: int, cols: int) -> None:
+        """Nouvelle taille de grille (matrice reconfigurée)."""
+        if (int(rows), int(cols)) != (self.rows, self.cols):
+            self._allocate(rows, cols)
+
+    def update(self, cloud: np.ndarray, mapper) -> None:
+        """
+        Recalcule l'occupation à partir du nuage (N, 3) du mapper.
+
+        Même convention que project_to_ground :
+            x_abs = cam_wall_dist_m + X, y_abs = Z, hauteur = cam_height_m - Y
+        """
+        cfg = self.config
+        n_cells = self.rows * self.cols * self.n_bands
+
+        if cloud is None or cloud.shape[0] == 0:
+            self.counts.fill(0)
+        else:
+            width = float(mapper.room_width_m)
+            depth = float(mapper.room_depth_m)
+
+            x_abs = cloud[:, 0] + mapper.cam_wall_dist_m
+            height = mapper.cam_height_m - cloud[:, 1]
+            y_abs = cloud[:, 2]
+
+            # Hors pièce / hors tranches : écartés (NaN inclus, comparaisons fausses)
+            keep = (
+                (x_abs >= 0.0) & (x_abs < width) &
+                (y_abs >= 0.0) & (y_abs < depth) &
+                (height >= 0.0) & (height < cfg.max_height_m)
+            )
+
+            col = (x_abs[keep] * (self.cols / width)).astype(np.intp)
+            row = (y_abs[keep] * (self.rows / depth)).astype(np.intp)
+            band = (height[keep] * (1.0 / cfg.band_m)).astype(np.intp)
+            np.minimum(col, self.cols - 1, out=col)
+            np.minimum(row, self.rows - 1, out=row)
+            np.minimum(band, self.n_bands - 1, out=band)
+
+            index = (row * self.cols + col) * self.n_bands + band
+            self.counts = np.bincount(index, minlength=n_cells).reshape(
+                self.rows, self.cols, self.n_bands)
+
+        # Voxels occupés (seuil ramené à la résolution décimée) et hauteur
+        # max par cellule (haut de la tranche la plus haute)
+        factor = getattr(getattr(mapper, "decimator", None), "factor", 1)
+        min_points = max(1, cfg.min_points // (factor * factor))
+        np.greater_equal(self.counts, min_points, out=self.occupied)
+        top = self.n_bands - 1 - np.argmax(self.occupied[:, :, ::-1], axis=2)
+        self.max_height_m = np.where(self.occupied.any(axis=2),
+                                     self.band_edges_m[top + 1], 0.0).astype(np.float32)
+
+        postures = self.postures()
+        np.not_equal(postures, self.posture_index, out=self._changed)
+        self.posture_index = postures
+
+    # ------------------------------------------------------------------
+
+    def profile(self, r: int, c: int) -> np.ndarray:
+        """Points par tranche de hauteur pour la cellule (r, c)."""
+        return self.counts[r, c]
+
+    def posture(self, r: int, c: int) -> str:
+        h = float(self.max_height_m[r, c])
+        if h <= 0.0:
+            return "vide"
+        if h < self.config.low_max_m:
+            return "bas"
+        if h < self.config.crouch_max_m:
+            return "accroupi"
+        return "debout"
+
+    def posture_events(self, now: float) -> List[CellEvent]:
+        """Événements "occupancy" (level = hauteur max) des postures modifiées."""
+        if not self._changed.any():
+            return []
+        return [CellEvent("occupancy", int(r), int(c), now, level=float(self.max_height_m[r, c]))
+                for r, c in np.argwhere(self._changed)]
+
+    def postures(self) -> np.ndarray:
+        """(rows, cols) indices dans POSTURES pour toutes les cellules."""
+        h = self.max_height_m
+        out = np.zeros(h.shape, dtype=np.uint8)
+        out[h > 0.0] = 1
+        out[h >= self.config.low_max_m] = 2
+        out[h >= self.config.crouch_max_m] = 3
+        return out
@@ -22,6 +22,19 @@ import argparse, json, math, os, signal, sys, threading, time
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
+from src.audio_mixer import AudioMixer
+from src.cell_state import CellStateEngine
+from src.control_engine import ControlConfig, ControlEngine
+from src.dmx_compositor import DMXCompositor
+from src.dmx_policy import DMXSendPolicy
+from src.enttec_usb_pro import EnttecUsbPro
+from src.fixture_profiles import load_profiles
+from src.event_bus import EventBus
+from src.light_effects import LightEffects
+from src.matrice import dict_to_cellule, load_config as load_matrix
+
 # ---------------------------------------------------------------------
 # Dépendances optionnelles
 # ---------------------------------------------------------------------
@@ -252,12 +265,24 @@ class SensorProviderGemini2:
 # ---------------------------------------------------------------------
 
 class DMXOutput:
-    def __init__(self, universe: int = 1, verbose: bool = False):
+    def __init__(self, universe: int = 1, verbose: bool = False,
+                 max_hz: float = 44.0, keepalive_hz: float = 1.0,
+                 enttec_port: Optional[str] = None):
         self.universe, self._verbose = universe, verbose
-        self.buffer = bytearray([0] * DMX_SLOTS)
+        self.buffer = np.zeros(DMX_SLOTS, dtype=np.uint8)
+        # Envoi seulement si l’univers a changé (≤ max_hz) + maintien à keepalive_hz
+        self.policy = DMXSendPolicy(max_hz, keepalive_hz)
         self._lock = threading.Lock()
         self._simulated = not HAS_OLA
         self._send_errors = 0
+        # Enttec USB Pro en direct (sans olad) : son propre thread d’écriture
+        self._enttec = None
+        if enttec_port:
+            self._enttec = EnttecUsbPro(enttec_port, refresh_hz=max_hz, keepalive_hz=keepalive_hz)
+            self.policy = self._enttec.policy
+            self._simulated = False
+            print(f"[DMX] Mode : Enttec USB Pro ({enttec_port})")
+            return
         if HAS_OLA:
             try:
                 self._wrapper = ClientWrapper()
@@ -268,21 +293,32 @@ class DMXOutput:
         print(f"[DMX] Mode : {'OLA' if not self._simulated else 'SIMULATION'}, univers={self.universe}")
 
     def set_channels_for_cell(self, address: int, values: List[int]) -> None:
+        start = max(0, address - 1)
+        vals = np.clip(np.asarray(values, dtype=np.int32), 0, 255)[:max(0, DMX_SLOTS - start)]
         with self._lock:
-            start = max(0, address - 1)
-            for i, v in enumerate(values):
-                idx = start + i
-                if 0 <= idx < DMX_SLOTS:
-                    self.buffer[idx] = max(0, min(255, int(v)))
+            self.buffer[start:start + vals.size] = vals
 
-    def flush(self) -> None:
+    def set_universe(self, universe: np.ndarray) -> None:
+        """Remplace tout l'univers (512 octets composés par DMXCompositor)."""
+        with self._lock:
+            np.copyto(self.buffer, universe)
+
+    def flush(self, force: bool = False) -> None:
+        if self._enttec is not None:
+            with self._lock:
+                self._enttec.set_universe(self.buffer)
+            return
+        with self._lock:
+            if not self.policy.should_send(self.buffer, force=force):
+                return
+            frame = self.buffer.tobytes()
         if self._simulated:
             if self._verbose:
-                nz = [i + 1 for i, v in enumerate(self.buffer) if v]
+                nz = (np.flatnonzero(self.buffer) + 1).tolist()
                 print(f"[DMX][SIM] push : {len(nz)} ch actifs : {nz[:12]}")
             return
         import array
-        data = array.array('B', self.buffer)
+        data = array.array('B', frame)
         try:
             self._client.SendDmx(self.universe, data, lambda state: None)
             # IMPORTANT: ne JAMAIS appeler Run() (bloquant).
@@ -298,9 +334,11 @@ class DMXOutput:
 
     def blackout(self) -> None:
         with self._lock:
-            for i in range(DMX_SLOTS):
-                self.buffer[i] = 0
-        self.flush()
+            self.buffer.fill(0)
+        if self._enttec is not None:
+            self._enttec.close()        # blackout puis fermeture du port
+            return
+        self.flush(force=True)
 
 
 # ---------------------------------------------------------------------
@@ -382,6 +420,7 @@ class DMXMapping:
     base_address: int
     channels_per_cell: int
     cell_layout: str = "row-major"
+    profile: str = ""          # profil de projecteur commun (src/fixture_profiles.py)
 
     def address_of(self, r: int, c: int) -> int:
         idx = r * MATRIX_COLS + c if self.cell_layout == "row-major" else c * MATRIX_ROWS + r
@@ -399,14 +438,34 @@ class BridgeConfig:
     audio_attack_ms: int
     audio_release_ms: int
     audio_files: Dict[str, Optional[str]] = field(default_factory=dict)
+    audio_backend: str = "pygame"           # "pygame" | "mixer" (src/audio_mixer.py)
+    audio_variations: Optional[str] = None  # JSON matrice (src/matrice.py), backend "mixer"
+    control: Dict[str, float] = field(default_factory=dict)   # ControlConfig (gain continu)
+    light_mode: str = "continu"
+    light_duration_s: float = 1.5
+    light_fixed: bool = False
+    light_strobe_hz: float = 8.0
+    light_tick_hz: float = 44.0
+    light_audio_reactive: bool = False      # luminosité × enveloppe du son (backend "mixer")
+    light_audio_ref: float = 0.25           # niveau RMS donnant la pleine luminosité
+    dmx_max_hz: float = 44.0
+    dmx_keepalive_hz: float = 1.0
+    dmx_enttec_port: Optional[str] = None
 
     @staticmethod
     def load_or_create(path: str) -> "BridgeConfig":
         DEFAULT = {
-            "dmx": {"universe": 1, "base_address": 1, "channels_per_cell": 3, "cell_layout": "row-major"},
+            "dmx": {"universe": 1, "base_address": 1, "channels_per_cell": 3, "cell_layout": "row-major",
+                    "max_hz": 44.0, "keepalive_hz": 1.0, "enttec_port": None},
             "depth": {"threshold_mm": 2200},
             "audio": {"enabled": True, "voice_stealing": True, "max_voices": 12,
-                      "gain_db": -6.0, "attack_ms": 5, "release_ms": 120, "files": {}}
+                      "gain_db": -6.0, "attack_ms": 5, "release_ms": 120, "files": {},
+                      "backend": "pygame", "variations": None},
+            "lights": {"mode": "continu", "duration_s": 1.5, "fixed": False,
+                       "strobe_hz": 8.0, "tick_hz": 44.0,
+                       "audio_reactive": False, "audio_ref": 0.25},
+            # Pas de hauteur occupée dans le pont : gain selon la présence seule
+            "control": {"w_occupancy": 0.0}
         }
         if not os.path.isfile(path):
             ensure_parent_dir(path)
@@ -416,11 +475,13 @@ class BridgeConfig:
             data = json.load(f)
         dmx = data.get("dmx", {})
         depth, audio = data.get("depth", {}), data.get("audio", {})
+        lights = data.get("lights", {})
         mapping = DMXMapping(
             universe=int(dmx.get("universe", 1)),
             base_address=int(dmx.get("base_address", 1)),
             channels_per_cell=int(dmx.get("channels_per_cell", 3)),
             cell_layout=str(dmx.get("cell_layout", "row-major")),
+            profile=str(dmx.get("profile", "")),
         )
         return BridgeConfig(
             dmx=mapping,
@@ -432,6 +493,19 @@ class BridgeConfig:
             audio_attack_ms=int(audio.get("attack_ms", 5)),
             audio_release_ms=int(audio.get("release_ms", 120)),
             audio_files=audio.get("files", {}),
+            audio_backend=str(audio.get("backend", "pygame")),
+            audio_variations=audio.get("variations") or None,
+            control=dict(data.get("control", {"w_occupancy": 0.0})),
+            light_mode=str(lights.get("mode", "continu")),
+            light_duration_s=float(lights.get("duration_s", 1.5)),
+            light_fixed=bool(lights.get("fixed", False)),
+            light_strobe_hz=float(lights.get("strobe_hz", 8.0)),
+            light_tick_hz=float(lights.get("tick_hz", 44.0)),
+            light_audio_reactive=bool(lights.get("audio_reactive", False)),
+            light_audio_ref=float(lights.get("audio_ref", 0.25)),
+            dmx_max_hz=float(dmx.get("max_hz", 44.0)),
+            dmx_keepalive_hz=float(dmx.get("keepalive_hz", 1.0)),
+            dmx_enttec_port=dmx.get("enttec_port") or None,
         )
 
 
@@ -450,58 +524,104 @@ class DMXAudioBridge:
             sys.exit(2)
         self.sensor = SensorProviderGemini2(name, mod_or_err)
         print(f"[SENSOR] Orbbec Gemini 2 via '{name}'")
-        self.dmx = DMXOutput(cfg.dmx.universe, verbose_dmx)
-        self.audio = AudioEngine(cfg.audio_enabled, cfg.audio_max_voices,
-                                 cfg.audio_gain_db, cfg.audio_attack_ms, cfg.audio_release_ms)
-        self.state = [[False]*MATRIX_COLS for _ in range(MATRIX_ROWS)]
-        # Compteurs anti-rebond : nombre de frames consécutives actives/inactives
-        self._on_count  = [[0]*MATRIX_COLS for _ in range(MATRIX_ROWS)]
-        self._off_count = [[0]*MATRIX_COLS for _ in range(MATRIX_ROWS)]
-        # Seuils : ajustables
-        self._ACTIVATE_N   = 3   # frames actives d’affilée pour déclencher
-        self._DEACTIVATE_N = 6   # frames inactives d’affilée pour relâcher
-
+        self.dmx = DMXOutput(cfg.dmx.universe, verbose_dmx, cfg.dmx_max_hz,
+                             cfg.dmx_keepalive_hz, cfg.dmx_enttec_port)
+        # État lumineux par cellule (numpy) → univers composé à chaque frame
+        load_profiles()
+        self.lights = DMXCompositor.from_mapping(cfg.dmx, MATRIX_ROWS, MATRIX_COLS)
+        self.lights.rgb[:] = (255, 50, 0)
+        # Effets (continu / strobe / fondus) rendus à cadence fixe, hors boucle capteur
+        self.effects = LightEffects(MATRIX_ROWS, MATRIX_COLS, tick_hz=cfg.light_tick_hz)
+        self.effects.set_all(cfg.light_mode, 1.0, cfg.light_duration_s,
+                             cfg.light_fixed, cfg.light_strobe_hz)
+        if cfg.audio_backend == "mixer":
+            # Mixage numpy : fournit aussi l’enveloppe de chaque voix à l’éclairage
+            self.audio = AudioMixer(MATRIX_ROWS * MATRIX_COLS, gain=db_to_linear(cfg.audio_gain_db),
+                                    attack_ms=cfg.audio_attack_ms, release_ms=cfg.audio_release_ms,
+                                    loop=False, output=cfg.audio_enabled)
+        else:
+            self.audio = AudioEngine(cfg.audio_enabled, cfg.audio_max_voices,
+                                     cfg.audio_gain_db, cfg.audio_attack_ms, cfg.audio_release_ms)
+        self._audio_reactive = cfg.light_audio_reactive and isinstance(self.audio, AudioMixer)
+        if cfg.light_audio_reactive and not self._audio_reactive:
+            print("[BRIDGE] lights.audio_reactive ignoré : nécessite audio.backend = \"mixer\"")
+        # Anti-rebond (partagé avec GridUI) : 3 frames actives d’affilée pour
+        # déclencher, 6 frames inactives d’affilée pour relâcher
+        self.cells = CellStateEngine(MATRIX_ROWS, MATRIX_COLS, activate_n=3, deactivate_n=6)
+        # Sorties découplées de la boucle capteur : audio et DMX consomment
+        # les entrées / sorties de cellule sur leurs propres threads
+        self.bus = EventBus()
+        self.bus.subscribe("audio", self._on_cell_event_audio, kinds=("enter", "exit"), maxlen=None)
+        self.bus.subscribe("dmx", self._on_cell_event_dmx, kinds=("enter", "exit"))
+
+        # Ordre ligne par ligne : slot d’enveloppe du mixeur = r * MATRIX_COLS + c
         for r in range(MATRIX_ROWS):
             for c in range(MATRIX_COLS):
                 self.audio.load_cell_sound(rc_key(r, c), cfg.audio_files.get(rc_key(r, c)))
 
+        # Backend "mixer" : variations par volume (préchargées) et gain
+        # continu à cadence de contrôle, poussé au mixeur (set_volume)
+        self.control = None
+        if isinstance(self.audio, AudioMixer):
+            if cfg.audio_variations:
+                self._load_variations(cfg.audio_variations)
+            self.control = ControlEngine(MATRIX_ROWS, MATRIX_COLS, ControlConfig.from_dict(cfg.control),
+                                         on_gain=lambda r, c, g: self.audio.set_volume(rc_key(r, c), g))
+        elif cfg.audio_variations:
+            print("[BRIDGE] audio.variations ignoré : nécessite audio.backend = \"mixer\"")
+
         self._stop = threading.Event()
+
+    def _load_variations(self, path: str) -> None:
+        """Cellules de la matrice (x = colonne, y = rangée) avec au moins une variation."""
+        loaded = 0
+        for d in load_matrix(path)["cells"]:
+            cell = dict_to_cellule(d)
+            if not (0 <= cell.y < MATRIX_ROWS and 0 <= cell.x < MATRIX_COLS):
+                continue
+            if any(v.fichier for v in cell.variations):
+                self.audio.load_cell_variations(rc_key(cell.y, cell.x), cell.variation_table(),
+                                                slot=cell.y * MATRIX_COLS + cell.x)
+                loaded += 1
+        print(f"[AUDIO] Variations : {loaded} cellules depuis {path}")
+
     def _apply_cell_to_dmx(self, r, c, active):
-        addr = self.cfg.dmx.address_of(r, c)
-        vals = [255, 50, 0] if active else [0, 0, 0]
-        self.dmx.set_channels_for_cell(addr, vals)
+        (self.effects.trigger if active else self.effects.release)(r, c)
+
+    def _push_lights(self, intensity: np.ndarray) -> None:
+        """Tick des effets : intensités (× enveloppe audio) → univers composé → envoi DMX."""
+        np.copyto(self.lights.intensity, intensity)
+        if self._audio_reactive:
+            levels = self.audio.levels(self.cfg.light_audio_ref)
+            self.lights.intensity *= levels.reshape(MATRIX_ROWS, MATRIX_COLS)
+        self.dmx.set_universe(self.lights.compose())
+        self.dmx.flush()
 
     def _apply_cell_to_audio(self, r, c, active):
         key = rc_key(r, c)
-        (self.audio.note_on if active else self.audio.note_off)(key)
+        if not active:
+            self.audio.note_off(key)
+        elif self.control is not None:
+            # Démarre au gain courant (au moins min_gain) ; la variation suit le volume
+            self.audio.note_on(key, max(self.control.config.min_gain, self.control.gain_of(r, c)))
+        else:
+            self.audio.note_on(key)
 
     def _update_from_active_cells(self, active_cells: List[Tuple[int, int]]) -> None:
         """Applique un anti-rebond : N frames actives pour ON, M frames inactives pour OFF."""
-        active_set = set(active_cells)
-        for r in range(MATRIX_ROWS):
-            for c in range(MATRIX_COLS):
-                was = self.state[r][c]
-                is_active_now = (r, c) in active_set
-
-                if is_active_now:
-                    # cellule "vue" active à cette frame
-                    self._on_count[r][c]  = min(self._on_count[r][c] + 1, 255)
-                    self._off_count[r][c] = 0
-                    # déclenche si on était OFF et qu’on a empilé assez de frames actives
-                    if not was and self._on_count[r][c] >= self._ACTIVATE_N:
-                        self.state[r][c] = True
-                        self._apply_cell_to_audio(r, c, True)   # NOTE ON (one-shot si loops=0)
-                else:
-                    # cellule "vue" inactive à cette frame
-                    self._off_count[r][c] = min(self._off_count[r][c] + 1, 255)
-                    self._on_count[r][c]  = 0
-                    # relâche si on était ON et qu’on a cumulé assez d’inactives
-                    if was and self._off_count[r][c] >= self._DEACTIVATE_N:
-                        self.state[r][c] = False
-                        self._apply_cell_to_audio(r, c, False)  # NOTE OFF (fadeout)
+        events = self.cells.update(active_cells)
+        if self.control is not None:
+            self.control.set_state(self.cells.active, self.cells.dwell_s())
+        self.bus.publish_many(events)
 
-                # DMX suit l’état filtré (pas la mesure brute)
-                self._apply_cell_to_dmx(r, c, self.state[r][c])
+    def _on_cell_event_audio(self, ev) -> None:
+        # NOTE ON (one-shot si loops=0) / NOTE OFF (fadeout)
+        self._apply_cell_to_audio(ev.row, ev.col, ev.kind == "enter")
+
+    def _on_cell_event_dmx(self, ev) -> None:
+        # DMX suit l’état filtré (pas la mesure brute) ; l’univers est
+        # recomposé à chaque tick des effets (_push_lights)
+        self._apply_cell_to_dmx(ev.row, ev.col, ev.kind == "enter")
 
     import sys
 
@@ -520,6 +640,9 @@ class DMXAudioBridge:
     def run(self) -> None:
         """Boucle principale du pont : lecture capteur → MAJ DMX/Audio → affichage grille."""
         print(f"[BRIDGE] Démarrage à {self.fps} fps, seuil={self.cfg.depth_threshold_mm} mm.")
+        self.effects.start(self._push_lights)
+        if self.control is not None:
+            self.control.start()
         next_t = time.monotonic()
         loop_count = 0
         try:
@@ -536,18 +659,16 @@ class DMXAudioBridge:
                 # 2) Application état → DMX + Audio
                 self._update_from_active_cells(cells)
 
-                # 3) Envoi DMX (non bloquant); OLA RunOnce seulement si dispo
-                self.dmx.flush()
-
-                # 4) Affichage de la grille en console (si demandé)
+                # 3) Affichage de la grille en console (si demandé) ;
+                #    l’envoi DMX est cadencé par le thread des effets
                 self._print_grid(cells)
 
-                # 5) Heartbeat périodique pour confirmer que la boucle vit
+                # 4) Heartbeat périodique pour confirmer que la boucle vit
                 if (loop_count % self.fps) == 0:
                     print(f"[BRIDGE] tick {loop_count}")
                 sys.stdout.flush()
 
-                # 6) Cadence : on essaie de respecter self.fps sans bloquer indéfiniment
+                # 5) Cadence : on essaie de respecter self.fps sans bloquer indéfiniment
                 next_t += self.period
                 delay = next_t - time.monotonic()
                 if delay > 0:
@@ -560,10 +681,15 @@ class DMXAudioBridge:
 
     def shutdown(self):
         print("[BRIDGE] Arrêt…")
+        self.bus.close()
+        self.effects.stop()
+        if self.control is not None:
+            self.control.stop()
         for r in range(MATRIX_ROWS):
             for c in range(MATRIX_COLS):
                 self._apply_cell_to_audio(r, c, False)
         self.dmx.blackout()
+        print(f"[DMX] {self.dmx.policy.summary()}")
         self.sensor.shutdown()
         self.audio.shutdown()
         print("[BRIDGE] Terminé.")
@@ -592,10 +718,14 @@ def main(argv: Optional[List[str]] = None) -> int:
     p.add_argument("--depth-threshold", type=int, default=None)
     p.add_argument("--show-grid", action="store_true")
     p.add_argument("--dmx-verbose", action="store_true")
+    p.add_argument("--enttec", default=None, metavar="PORT",
+                   help="Enttec DMX USB Pro en direct (ex. /dev/ttyUSB0), sans OLA")
     a = p.parse_args(argv)
     cfg = BridgeConfig.load_or_create(a.config)
     if a.depth_threshold:
         cfg.depth_threshold_mm = a.depth_threshold
+    if a.enttec:
+        cfg.dmx_enttec_port = a.enttec
     bridge = DMXAudioBridge(cfg, a.fps, a.sensor, a.show_grid, a.dmx_verbose)
     _install_signal_handlers(bridge)
     bridge.run()
@@ -7,9 +7,12 @@ Compatible Gemini 336, Gemini 2, Gemini 435Le.
 
 Fonctions fournies :
     poll() -> bool
-    get_depth_frame() -> ndarray uint16
+    get_depth_frame() -> ndarray uint16 (image entière, pour l'affichage)
     get_color_frame() -> ndarray uint8 (H, W, 3)
-    get_depth_data() -> alias profondeur
+    get_depth_data() -> profondeur (recadrée si set_roi) pour le mapping
+    intrinsics        -> CameraIntrinsics du profil profondeur actif (ou None)
+    set_roi(rect)     -> recadrage de la profondeur dès l'acquisition
+    roi, frame_shape  -> recadrage appliqué à la dernière frame, taille capteur
 
 Aucune simulation.
 Pipeline double : profondeur + couleur.
@@ -31,6 +34,8 @@ from pyorbbecsdk import (
 )
 
 from src.y16_depth_converter import Y16DepthConverter
+from src.depth_filters import SpatialDepthFilter, SpatialFilterConfig, TemporalDepthFilter
+from src.camera_intrinsics import CameraIntrinsics, IntrinsicsCache, read_intrinsics
 
 
 
@@ -50,6 +55,26 @@ class PipelineConfig:
 
     enable_color: bool = True
 
+    # Filtrage temporel de la profondeur : "off", "median" ou "ema"
+    temporal_filter: str = "off"
+    temporal_window: int = 5
+    temporal_alpha: float = 0.4
+
+    # Nettoyage spatial (speckles, petits trous, lissage médian) ; None = off
+    spatial_filter: Optional[SpatialFilterConfig] = None
+
+    @classmethod
+    def from_mapping(cls, mapping: dict) -> "PipelineConfig":
+        """Filtres de profondeur depuis la section "mapping" de system_state.json."""
+        base = cls()
+        spatial = mapping.get("spatial_filter")
+        return cls(
+            temporal_filter=str(mapping.get("temporal_filter", base.temporal_filter)),
+            temporal_window=int(mapping.get("temporal_window", base.temporal_window)),
+            temporal_alpha=float(mapping.get("temporal_alpha", base.temporal_alpha)),
+            spatial_filter=SpatialFilterConfig(**spatial) if spatial else None,
+        )
+
 
 # ----------------------------------------------------------------------
 # Pipeline Orbbec pour Chambre Sonore (SDK v2)
@@ -65,6 +90,36 @@ class PipelineOrbbec:
         self._last_depth_raw: Optional[np.ndarray] = None
         self._last_color_rgb: Optional[np.ndarray] = None
 
+        # Tampon profondeur uint16 (mm) réutilisé d'une frame à l'autre
+        self._depth_buf: Optional[np.ndarray] = None
+
+        # Image entière pour l'affichage quand la profondeur est recadrée
+        self._view_buf: Optional[np.ndarray] = None
+        self._last_depth_view: Optional[np.ndarray] = None
+
+        # Recadrage (y0, y1, x0, x1) demandé / appliqué à la dernière frame,
+        # et taille pleine du capteur
+        self._roi_request = None
+        self.roi = None
+        self.frame_shape = None
+
+        # Intrinsèques du profil profondeur actif, lues à la première frame
+        # (et à chaque changement de résolution), cache par (série, profil)
+        self.intrinsics: Optional[CameraIntrinsics] = None
+        self._intrinsics_shape = None
+        self._intrinsics_cache = IntrinsicsCache()
+        self._serial = self._read_serial()
+
+        # Filtres temporel puis spatial (entre acquisition et mapping)
+        self.temporal_filter: Optional[TemporalDepthFilter] = None
+        self.set_temporal_filter(
+            self.cfg.temporal_filter,
+            self.cfg.temporal_window,
+            self.cfg.temporal_alpha,
+        )
+        self.spatial_filter: Optional[SpatialDepthFilter] = None
+        self.set_spatial_filter(self.cfg.spatial_filter)
+
         # Profondeur
         self._setup_depth_stream()
 
@@ -102,6 +157,71 @@ class PipelineOrbbec:
 
     # ------------------------------------------------------------------
 
+    def set_temporal_filter(self, mode: str, window: int = 5, alpha: float = 0.4) -> None:
+        """Active ("median" / "ema") ou désactive ("off") le filtre temporel."""
+        self.cfg.temporal_filter = mode
+        self.cfg.temporal_window = int(window)
+        self.cfg.temporal_alpha = float(alpha)
+
+        if mode == "off":
+            self.temporal_filter = None
+        else:
+            self.temporal_filter = TemporalDepthFilter(window=window, mode=mode, alpha=alpha)
+
+    def set_spatial_filter(self, config: Optional[SpatialFilterConfig]) -> None:
+        """Active le nettoyage spatial avec `config`, ou le désactive (None)."""
+        self.cfg.spatial_filter = config
+        self.spatial_filter = SpatialDepthFilter(config) if config is not None else None
+
+    # ------------------------------------------------------------------
+
+    def set_roi(self, rect) -> None:
+        """Recadre la profondeur sur rect = (y0, y1, x0, x1), ou None (image entière).
+
+        Appliqué à partir de la prochaine frame, juste après np.frombuffer :
+        filtres et mapping travaillent sur un tableau plus petit et contigu.
+        """
+        self._roi_request = tuple(int(v) for v in rect) if rect is not None else None
+
+    # ------------------------------------------------------------------
+
+    def _read_serial(self) -> str:
+        try:
+            info = self.pipeline.get_device().get_device_info()
+            return str(info.get_serial_number())
+        except Exception:
+            return "inconnu"
+
+    def _update_intrinsics(self, depth_frame, w: int, h: int) -> None:
+        """Intrinsèques pour le profil courant : SDK d'abord, cache sinon."""
+        profile = f"depth_{w}x{h}"
+        try:
+            fps = depth_frame.get_stream_profile().as_video_stream_profile().get_fps()
+            profile += f"@{int(fps)}"
+        except Exception:
+            pass
+
+        intr = read_intrinsics(depth_frame, self.pipeline, w, h)
+        if intr is not None:
+            self._intrinsics_cache.put(self._serial, profile, intr)
+            source = "SDK"
+        else:
+            intr = self._intrinsics_cache.get(self._serial, profile)
+            source = "cache"
+
+        if intr is None:
+            print(f"[Pipeline] Intrinsèques indisponibles pour {profile} (valeurs par défaut du mapper).")
+        else:
+            intr = intr.scaled(w, h)
+            print(f"[Pipeline] Intrinsèques {profile} ({source}) : fx={intr.fx:.1f} fy={intr.fy:.1f} "
+                  f"cx={intr.cx:.1f} cy={intr.cy:.1f}")
+
+        # Pas de nouvelle lecture avant le prochain changement de résolution
+        self.intrinsics = intr
+        self._intrinsics_shape = (h, w)
+
+    # ------------------------------------------------------------------
+
     def _setup_depth_stream(self):
         print("=== _setup_depth_stream() : activation simple du flux DEPTH ===")
 
@@ -175,9 +295,54 @@ class PipelineOrbbec:
 
         # Construire tableau numpy avec la taille exacte
         y16 = np.frombuffer(buffer, dtype=np.uint16, count=size // 2).reshape(h, w)
-        depth_mm = (y16.astype(np.float32) * scale).astype(np.float32)
+
+        # Nouveau profil / résolution → intrinsèques correspondantes
+        if self._intrinsics_shape != (h, w):
+            self._update_intrinsics(depth, w, h)
+        self.frame_shape = (h, w)
+
+        # Recadrage sur la zone utile (vue, sans copie) ; ignoré s'il ne
+        # correspond plus à la résolution
+        full = y16
+        roi = self._roi_request
+        if roi is not None and 0 <= roi[0] < roi[1] <= h and 0 <= roi[2] < roi[3] <= w:
+            y16 = y16[roi[0]:roi[1], roi[2]:roi[3]]
+        else:
+            roi = None
+        self.roi = roi
+
+        # Profondeur en mm (uint16) dans un tampon réutilisé : le buffer SDK
+        # est rendu au pilote après la frame, il faut donc le copier.
+        if self._depth_buf is None or self._depth_buf.shape != y16.shape:
+            self._depth_buf = np.zeros(y16.shape, dtype=np.uint16)
+        if scale == 1.0:
+            np.copyto(self._depth_buf, y16)
+        else:
+            np.multiply(y16, scale, out=self._depth_buf, casting="unsafe")
+        depth_mm = self._depth_buf
+
+        # Filtrage temporel (médiane / EMA par pixel)
+        if self.temporal_filter is not None:
+            depth_mm = self.temporal_filter.process(depth_mm)
+
+        # Nettoyage spatial (speckles, trous, lissage)
+        if self.spatial_filter is not None:
+            depth_mm = self.spatial_filter.process(depth_mm)
+
         self._last_depth_raw = depth_mm
 
+        # Affichage : image entière (hors ROI non filtrée, zone utile filtrée)
+        if roi is None:
+            self._last_depth_view = depth_mm
+        else:
+            if self._view_buf is None or self._view_buf.shape != (h, w):
+                self._view_buf = np.zeros((h, w), dtype=np.uint16)
+            if scale == 1.0:
+                np.copyto(self._view_buf, full)
+            else:
+                np.multiply(full, scale, out=self._view_buf, casting="unsafe")
+            self._view_buf[roi[0]:roi[1], roi[2]:roi[3]] = depth_mm
+            self._last_depth_view = self._view_buf
 
         # Frame couleur
         color = frameset.get_color_frame()
@@ -224,8 +389,8 @@ class PipelineOrbbec:
     # Accès aux données
     # ------------------------------------------------------------------
 
-    def get_depth_frame(self):        
-        return self._last_depth_raw
+    def get_depth_frame(self):
+        return self._last_depth_view
 
     def get_color_frame(self) -> Optional[np.ndarray]:
         return self._last_color_rgb
@@ -1,31 +1,225 @@
 # -*- coding: utf-8 -*-
 """
 orbbec_input.py
-Gabarit minimal cohérent avec Orbbec SDK 2.0.15 (Linux x86_64).
+Flux de positions Orbbec (SDK 2.0.15, Linux x86_64) pour Tracker.
 
-ATTENTION:
-- Adapte ici aux bindings que tu utilises déjà (OpenNI, OrbbecSDK Python, etc.).
-- L'interface attendue par Tracker est simple: get_positions() retourne
-  une liste d'objets/tuples avec id et (x,y,z) en coordonnées monde (plan au sol).
-- Si tu as déjà ce module, NE CHANGE RIEN d'autre que d'assurer la signature.
+Fonctionnement (producteur / consommateurs) :
+- Un thread de travail lit la profondeur via PipelineOrbbec, reconstruit le
+  nuage 3D (ZoneMapper3D), le projette au sol et détecte la position.
+- Chaque résultat est horodaté et poussé dans une file bornée (les plus
+  anciens sont éjectés automatiquement).
+- get_positions() est NON bloquant : il retourne le dernier résultat
+  disponible, quel que soit le rythme du consommateur.
+- Le temps de traitement de chaque frame est mesuré et comparé au budget
+  (1 / fps) pour repérer les dépassements.
+
+L'interface attendue par Tracker reste simple : get_positions() retourne
+une liste de dicts avec id et (x, y, z) en coordonnées monde (plan au sol).
+
+ATTENTION : le pipeline ne doit être lu que par un seul thread. Si
+OrbbecStream possède le pipeline, ne pas appeler pipeline.poll() ailleurs.
 """
 
-from typing import List, Dict, Tuple
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+
+@dataclass
+class PositionSample:
+    """Résultat horodaté d'une frame traitée."""
+
+    seq: int
+    timestamp: float             # time.monotonic() à la fin du traitement
+    positions: List[Dict] = field(default_factory=list)
+    process_ms: float = 0.0
+
 
 class OrbbecStream:
-    def __init__(self):
-        # TODO: initialiser le pipeline capteur (SDK Orbbec 2.0.15)
-        pass
+    """Producteur de positions sur un thread dédié."""
+
+    def __init__(
+        self,
+        pipeline=None,
+        mapper=None,
+        fps: float = 30.0,
+        queue_size: int = 8,
+        max_age_s: float = 0.5,
+        autostart: bool = True,
+    ) -> None:
+        """
+        pipeline : PipelineOrbbec déjà créé (sinon créé ici).
+        mapper   : ZoneMapper3D déjà configuré (sinon valeurs par défaut).
+        fps      : cadence cible ; fixe aussi le budget par frame (ms).
+        queue_size : nombre de résultats conservés dans la file bornée.
+        max_age_s  : au-delà, le dernier résultat est considéré périmé
+                     et get_positions() retourne [].
+        """
+        if pipeline is None:
+            from src.orbbec_depth_pipeline import PipelineOrbbec
+            pipeline = PipelineOrbbec()
+        if mapper is None:
+            from src.zone_mapper_3d import ZoneMapper3D
+            mapper = ZoneMapper3D()
+
+        self.pipeline = pipeline
+        self.mapper = mapper
+
+        self.fps = max(1.0, float(fps))
+        self.budget_ms = 1000.0 / self.fps
+        self.max_age_s = float(max_age_s)
+
+        self._queue: Deque[PositionSample] = deque(maxlen=max(1, int(queue_size)))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._seq = 0
+
+        # Statistiques de budget
+        self._avg_ms = 0.0
+        self._last_ms = 0.0
+        self._frames = 0
+        self._overruns = 0
+        self._errors = 0
+
+        if autostart:
+            self.start()
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="OrbbecStream", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ------------------------------------------------------------------
+    # Thread de travail
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        period = 1.0 / self.fps
+        next_t = time.monotonic()
+
+        while not self._stop.is_set():
+            t0 = time.monotonic()
+            try:
+                positions = self._process_one()
+            except Exception as e:
+                self._errors += 1
+                if self._errors % 30 == 1:
+                    print(f"[OrbbecStream] erreur traitement : {e}")
+                positions = None
+
+            if positions is not None:
+                self._push(positions, (time.monotonic() - t0) * 1000.0)
+
+            # Cadence : même logique que le pont DMX (pas de rattrapage)
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_t = time.monotonic()
+
+    def _process_one(self) -> Optional[List[Dict]]:
+        """Lit une frame et retourne les positions détectées (None si pas de frame)."""
+        if not self.pipeline.poll():
+            return None
+
+        depth = self.pipeline.get_depth_data()
+        if depth is None:
+            return None
+
+        self.mapper.set_intrinsics(getattr(self.pipeline, "intrinsics", None))
+        cloud = self.mapper.compute_point_cloud(depth, roi=getattr(self.pipeline, "roi", None))
+        frame_shape = getattr(self.pipeline, "frame_shape", None)
+        if frame_shape is not None:
+            self.pipeline.set_roi(self.mapper.roi_rect(frame_shape))
+        ground_xy = self.mapper.project_to_ground(cloud)
+        pos = self.mapper.detect_person_position(ground_xy)
+        if pos is None:
+            return []
+
+        x, y = pos
+        return [{"id": 1, "x": float(x), "y": float(y), "z": 0.0}]
+
+    def _push(self, positions: List[Dict], process_ms: float) -> None:
+        with self._lock:
+            self._seq += 1
+            self._frames += 1
+            self._last_ms = process_ms
+            if self._frames == 1:
+                self._avg_ms = process_ms
+            else:
+                self._avg_ms = 0.9 * self._avg_ms + 0.1 * process_ms
+            if process_ms > self.budget_ms:
+                self._overruns += 1
+            self._queue.append(PositionSample(
+                seq=self._seq,
+                timestamp=time.monotonic(),
+                positions=positions,
+                process_ms=process_ms,
+            ))
+
+    # ------------------------------------------------------------------
+    # Accès consommateurs (non bloquants)
+    # ------------------------------------------------------------------
 
     def get_positions(self) -> List[Dict]:
         """
-        Retourne des positions ex:
+        Retourne les dernières positions, ex :
         [
-          {"id": 1, "x": 0.85, "y": 1.20, "z": 0.0},
-          {"id": 2, "x": 2.10, "y": 0.40, "z": 0.0}
+          {"id": 1, "x": 0.85, "y": 1.20, "z": 0.0}
         ]
-        Les unités doivent être cohérentes (mètres ou similaire).
+        Unités : mètres. Liste vide si aucun résultat récent.
+        """
+        sample = self.get_latest()
+        if sample is None:
+            return []
+        if time.monotonic() - sample.timestamp > self.max_age_s:
+            return []
+        return [dict(p) for p in sample.positions]
+
+    def get_latest(self) -> Optional[PositionSample]:
+        """Dernier résultat horodaté (ou None)."""
+        with self._lock:
+            if not self._queue:
+                return None
+            return self._queue[-1]
+
+    def get_since(self, seq: int) -> List[PositionSample]:
+        """
+        Résultats plus récents que `seq` encore présents dans la file.
+        Permet à chaque consommateur de lire à son propre rythme en
+        mémorisant le dernier seq reçu.
         """
-        # TODO: remplacer par l'extraction réelle via le SDK
-        return []
+        with self._lock:
+            return [s for s in self._queue if s.seq > seq]
 
+    def get_stats(self) -> Dict[str, float]:
+        """Mesures du budget par frame (ms) et compteurs."""
+        with self._lock:
+            return {
+                "budget_ms": self.budget_ms,
+                "last_ms": self._last_ms,
+                "avg_ms": self._avg_ms,
+                "frames": self._frames,
+                "overruns": self._overruns,
+                "errors": self._errors,
+            }
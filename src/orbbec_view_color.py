@@ -2,12 +2,16 @@
 # -*- coding: utf-8 -*-
 
 
+import time
+
 import numpy as np
 import cv2
-from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtGui import QImage, QPainter, QPixmap
 from PyQt6.QtWidgets import QLabel
 from PyQt6.QtCore import Qt
 
+from src.orbbec_view_depth import fit_image_rect
+
 
 class OrbbecColorView(QLabel):
     """
@@ -20,24 +24,45 @@ class OrbbecColorView(QLabel):
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setStyleSheet("background:black; border:1px solid #444;")
 
+        # Cadence d'affichage maximale (indépendante du timer de traitement)
+        self.max_fps = 15.0
+        self._last_render = 0.0
+
+        # Tampon réutilisé ; la QImage pointe dessus
+        self._rgb = None
+        self._qimage = None
+
     def update_image(self, img):
         """
         img : numpy array (H, W, 3) uint8
+
+        Ignorée si la vue est cachée ou si le dernier rendu est trop récent.
+        Les pixels sont copiés dans un tampon fixe (QImage mise à jour en place).
         """
         if img is None:
             return
         if img.ndim != 3 or img.shape[2] != 3:
             return
+        if not self.isVisible():
+            return
 
-        h, w, _ = img.shape
+        now = time.monotonic()
+        if now - self._last_render < 1.0 / self.max_fps:
+            return
+        self._last_render = now
 
-        qimg = QImage(
-            img.data,
-            w,
-            h,
-            w * 3,
-            QImage.Format.Format_RGB888
-        )
+        h, w, _ = img.shape
+        if self._rgb is None or self._rgb.shape != img.shape:
+            self._rgb = np.zeros((h, w, 3), dtype=np.uint8)
+            self._qimage = QImage(self._rgb.data, w, h, w * 3, QImage.Format.Format_RGB888)
 
-        self.setPixmap(QPixmap.fromImage(qimg))
+        np.copyto(self._rgb, img)
+        self.update()
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._qimage is None:
+            return
+        painter = QPainter(self)
+        painter.drawImage(fit_image_rect(self._qimage, self.contentsRect()), self._qimage)
+        painter.end()
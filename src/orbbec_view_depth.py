@@ -1,17 +1,43 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import time
+from functools import lru_cache
+
 import cv2
 import numpy as np
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtGui import QImage, QPainter, QPixmap
 from PyQt6.QtWidgets import QLabel
 
+
+# Plage visible de la colorisation « style Orbbec » (mm)
+DEPTH_MIN_MM = 600
+DEPTH_MAX_MM = 3500
+
+
+@lru_cache(maxsize=4)
+def build_depth_lut(min_mm: int = DEPTH_MIN_MM, max_mm: int = DEPTH_MAX_MM) -> np.ndarray:
+    """
+    Table (65536, 3) uint8 : profondeur uint16 (mm) → RGB (colormap TURBO).
+    Même rendu que PipelineOrbbec.depth_to_orbbec_colormap, calculé une
+    seule fois. La valeur 0 (pixel invalide) est affichée en noir.
+    """
+    values = np.arange(65536, dtype=np.float32)
+    clipped = np.clip(values, min_mm, max_mm)
+    norm8 = ((clipped - min_mm) / (max_mm - min_mm) * 255.0).astype(np.uint8)
+
+    bgr = cv2.applyColorMap(norm8.reshape(-1, 1), cv2.COLORMAP_TURBO).reshape(-1, 3)
+    lut = np.ascontiguousarray(bgr[:, ::-1])
+    lut[0] = 0
+    return lut
+
+
 class OrbbecDepthView(QLabel):
     """
     Widget Qt simple qui affiche une image de profondeur convertie en RGB.
     Le pipeline fournit une matrice (H, W) uint16 avec profondeur en mm.
-    ICI on convertit en niveaux de gris 8-bit puis RGB pour Qt.
+    ICI on colorise via une table précalculée puis on peint la QImage.
     """
 
     def __init__(self, parent=None):
@@ -20,6 +46,17 @@ class OrbbecDepthView(QLabel):
         self.setStyleSheet("background:black; border:1px solid #444;")
         self.depth_converter = None   # assigné par GridUI au démarrage
 
+        # Cadence d'affichage maximale (indépendante du timer de traitement)
+        self.max_fps = 15.0
+        self._last_render = 0.0
+
+        # Tampons réutilisés d'une frame à l'autre
+        self._lut = build_depth_lut()
+        self._rgb = None
+        self._idx = None
+        self._idx_f = None
+        self._qimage = None
+
     # ---------------------------------------------------------
 
     def update_image_ancienne(self, depth_mm):
@@ -50,25 +87,65 @@ class OrbbecDepthView(QLabel):
 
     def update_image(self, depth_mm: np.ndarray):
         """
-        Reçoit une image profondeur (en mm) produite par PipelineOrbbec
-        et demande au pipeline de produire une colorisation Orbbec.
-        """
+        Reçoit une image profondeur (en mm) produite par PipelineOrbbec.
 
-        # Récupération du parent (GridUI) qui possède le pipeline
-        if not hasattr(self.parent(), "pipeline"):
+        - Ignorée si la vue est cachée (QStackedLayout) ou si le dernier
+          rendu date de moins de 1 / max_fps.
+        - Colorisation par table 65536 entrées (uint16 → RGB) dans un
+          tampon réutilisé ; la QImage pointe sur ce tampon et est donc
+          mise à jour en place, sans nouvelle allocation.
+        """
+        if depth_mm is None or depth_mm.ndim != 2:
+            return
+        if not self.isVisible():
             return
 
-        pipeline = self.parent().pipeline
-
-        # Utiliser la colorisation du pipeline
-        colored = pipeline.depth_to_orbbec_colormap(depth_mm)
-        if colored is None:
+        now = time.monotonic()
+        if now - self._last_render < 1.0 / self.max_fps:
             return
+        self._last_render = now
+
+        self._ensure_buffers(depth_mm.shape)
 
-        # Conversion BGR→RGB pour Qt
-        rgb = cv2.cvtColor(colored, cv2.COLOR_BGR2RGB)
+        if depth_mm.dtype == np.uint16:
+            idx = depth_mm
+        else:
+            # Profondeur float (mm) → index uint16, sans allocation
+            np.clip(depth_mm, 0, 65535, out=self._idx_f)
+            np.copyto(self._idx, self._idx_f, casting="unsafe")
+            idx = self._idx
 
-        h, w, _ = rgb.shape
-        qimg = QImage(rgb.data, w, h, 3 * w, QImage.Format.Format_RGB888)
-        self.setPixmap(QPixmap.fromImage(qimg))
+        np.take(self._lut, idx, axis=0, out=self._rgb, mode="clip")
+        self.update()
 
+    def _ensure_buffers(self, shape) -> None:
+        """(Ré)alloue les tampons uniquement si la résolution change."""
+        if self._rgb is not None and self._rgb.shape[:2] == shape:
+            return
+        h, w = shape
+        self._rgb = np.zeros((h, w, 3), dtype=np.uint8)
+        self._idx = np.zeros((h, w), dtype=np.uint16)
+        self._idx_f = np.zeros((h, w), dtype=np.float32)
+        self._qimage = QImage(self._rgb.data, w, h, 3 * w, QImage.Format.Format_RGB888)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._qimage is None:
+            return
+        painter = QPainter(self)
+        painter.drawImage(fit_image_rect(self._qimage, self.contentsRect()), self._qimage)
+        painter.end()
+
+
+# ---------------------------------------------------------
+
+def fit_image_rect(image: QImage, area: QRect) -> QRect:
+    """Rectangle centré dans `area` conservant le ratio de l'image."""
+    w, h = image.width(), image.height()
+    if w == 0 or h == 0:
+        return area
+    scale = min(area.width() / w, area.height() / h)
+    tw, th = int(w * scale), int(h * scale)
+    x = area.x() + (area.width() - tw) // 2
+    y = area.y() + (area.height() - th) // 2
+    return QRect(x, y, tw, th)
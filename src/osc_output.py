@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+osc_output.py
+Chambre Sonore – Sortie OSC (UDP) vers un moteur sonore externe (Max/MSP, SuperCollider).
+
+Messages envoyés (préfixe configurable, "/chambre" par défaut) :
+    /chambre/cell/enter      ,ii    rangée, colonne
+    /chambre/cell/exit       ,iif   rangée, colonne, durée de présence (s)
+    /chambre/cell/dwell      ,iif   rangée, colonne, durée de présence (s)
+    /chambre/cell/occupancy  ,iif   rangée, colonne, hauteur max (m)
+    /chambre/target          ,ifff  id, x, y, z (m, repère pièce)
+    /chambre/occupancy/row   ,if…f  rangée, hauteur max de chaque colonne (m)
+
+Débit maîtrisé :
+    - un thread d'envoi cadencé à `rate_hz` regroupe tout ce qui est en
+      attente dans un bundle OSC par tick (découpé en plusieurs datagrammes
+      si on dépasse max_datagram octets) ;
+    - les événements de cellule sont tous transmis (dans l'ordre) ;
+    - positions et occupation sont COALESCÉES : seule la dernière valeur
+      de chaque cible / rangée est envoyée, et seulement si elle a changé ;
+    - adresses et balises de type sont encodées une seule fois
+      (OscAddress), chaque message ne fait plus qu'un struct.pack.
+
+Encodage OSC 1.0 minimal (int32, float32, chaînes), sans dépendance.
+Réception de test : python -m src.diagnostics.osc_monitor
+"""
+
+from __future__ import annotations
+
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# ----------------------------------------------------------------------
+# Encodage OSC
+# ----------------------------------------------------------------------
+
+def osc_string(s: str) -> bytes:
+    """Chaîne OSC : ASCII terminé par NUL, complété à un multiple de 4 octets."""
+    b = s.encode("ascii") + b"\0"
+    return b + b"\0" * (-len(b) % 4)
+
+
+_BUNDLE_HEADER = osc_string("#bundle") + struct.pack(">Q", 1)   # timetag 1 = immédiat
+
+
+class OscAddress:
+    """Adresse + balises de type précompilées : encode(*args) → message OSC."""
+
+    _FORMATS = {"i": "i", "f": "f"}
+
+    def __init__(self, address: str, typetags: str) -> None:
+        self.address = address
+        self.typetags = typetags
+        self._prefix = osc_string(address) + osc_string("," + typetags)
+        self._struct = struct.Struct(">" + "".join(self._FORMATS[t] for t in typetags))
+
+    def encode(self, *args) -> bytes:
+        return self._prefix + self._struct.pack(*args)
+
+
+def osc_bundles(messages: Sequence[bytes], max_datagram: int) -> List[bytes]:
+    """Regroupe les messages en bundles OSC d'au plus max_datagram octets."""
+    bundles, parts, size = [], [], len(_BUNDLE_HEADER)
+    for msg in messages:
+        n = 4 + len(msg)
+        if parts and size + n > max_datagram:
+            bundles.append(b"".join([_BUNDLE_HEADER] + parts))
+            parts, size = [], len(_BUNDLE_HEADER)
+        parts.append(struct.pack(">i", len(msg)) + msg)
+        size += n
+    if parts:
+        bundles.append(b"".join([_BUNDLE_HEADER] + parts))
+    return bundles
+
+
+# ----------------------------------------------------------------------
+# Sortie OSC
+# ----------------------------------------------------------------------
+
+@dataclass
+class OscConfig:
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 57120              # port par défaut de SuperCollider (sclang)
+    prefix: str = "/chambre"
+    rate_hz: float = 30.0          # bundles par seconde au maximum
+    max_datagram: int = 1400       # sous la MTU Ethernet
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "OscConfig":
+        return cls(
+            enabled=bool(d.get("enabled", False)),
+            host=str(d.get("host", "127.0.0.1")),
+            port=int(d.get("port", 57120)),
+            prefix=str(d.get("prefix", "/chambre")),
+            rate_hz=float(d.get("rate_hz", 30.0)),
+            max_datagram=int(d.get("max_datagram", 1400)),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "host": self.host,
+            "port": self.port,
+            "prefix": self.prefix,
+            "rate_hz": self.rate_hz,
+            "max_datagram": self.max_datagram,
+        }
+
+
+class OscOutput:
+    """Abonné du bus (on_event) + positions / occupation coalescées, envoi cadencé."""
+
+    def __init__(self, config: Optional[OscConfig] = None) -> None:
+        self.config = config or OscConfig()
+        p = self.config.prefix.rstrip("/")
+        self._addr = {
+            "enter": OscAddress(p + "/cell/enter", "ii"),
+            "exit": OscAddress(p + "/cell/exit", "iif"),
+            "dwell": OscAddress(p + "/cell/dwell", "iif"),
+            "occupancy": OscAddress(p + "/cell/occupancy", "iif"),
+            "target": OscAddress(p + "/target", "ifff"),
+        }
+        self._row_addr_path = p + "/occupancy/row"
+        self._row_addr: Optional[OscAddress] = None
+
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+        self._dest = (self.config.host, int(self.config.port))
+
+        self._lock = threading.Lock()
+        self._events: List[bytes] = []
+        self._targets: Dict[int, Tuple[float, float, float]] = {}
+        self._sent_targets: Dict[int, Tuple[float, float, float]] = {}
+        self._occupancy: Optional[np.ndarray] = None
+        self._sent_occupancy: Optional[np.ndarray] = None
+
+        self.datagrams = 0
+        self.bytes_sent = 0
+        self.send_errors = 0
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="osc-output", daemon=True)
+        self._thread.start()
+        print(f"[OSC] Sortie vers {self._dest[0]}:{self._dest[1]} "
+              f"({self.config.rate_hz:.0f} Hz max, préfixe {p})")
+
+    # ------------------------------------------------------------------
+    # Entrées (thread producteur / bus)
+    # ------------------------------------------------------------------
+
+    def on_event(self, ev) -> None:
+        """Abonné EventBus : CellEvent → message mis en attente (jamais coalescé)."""
+        addr = self._addr.get(ev.kind)
+        if addr is None:
+            return
+        if ev.kind == "enter":
+            msg = addr.encode(ev.row, ev.col)
+        elif ev.kind == "occupancy":
+            msg = addr.encode(ev.row, ev.col, ev.level)
+        else:
+            msg = addr.encode(ev.row, ev.col, ev.dwell_s)
+        with self._lock:
+            self._events.append(msg)
+
+    def set_positions(self, positions: Sequence[dict]) -> None:
+        """Dernières positions [{"id", "x", "y", "z"}] ; les cibles absentes sont oubliées."""
+        targets = {int(p["id"]): (float(p["x"]), float(p["y"]), float(p.get("z", 0.0)))
+                   for p in positions}
+        with self._lock:
+            self._targets = targets
+
+    def set_occupancy(self, max_height_m: np.ndarray) -> None:
+        """Dernière carte (rows, cols) des hauteurs max ; copiée, envoyée si modifiée."""
+        with self._lock:
+            self._occupancy = np.array(max_height_m, dtype=np.float32)
+
+    # ------------------------------------------------------------------
+    # Envoi (thread dédié)
+    # ------------------------------------------------------------------
+
+    def _collect(self) -> List[bytes]:
+        with self._lock:
+            messages, self._events = self._events, []
+            targets = self._targets
+            occupancy = self._occupancy
+
+        # Cibles : uniquement celles qui ont bougé depuis le dernier envoi
+        target_addr = self._addr["target"]
+        for tid, xyz in targets.items():
+            if self._sent_targets.get(tid) != xyz:
+                messages.append(target_addr.encode(tid, *xyz))
+        self._sent_targets = dict(targets)
+
+        # Occupation : uniquement les rangées modifiées
+        if occupancy is not None:
+            rows, cols = occupancy.shape
+            if self._row_addr is None or len(self._row_addr.typetags) != cols + 1:
+                self._row_addr = OscAddress(self._row_addr_path, "i" + "f" * cols)
+            prev = self._sent_occupancy
+            if prev is None or prev.shape != occupancy.shape:
+                changed = range(rows)
+            else:
+                changed = np.flatnonzero((prev != occupancy).any(axis=1))
+            for r in changed:
+                messages.append(self._row_addr.encode(int(r), *occupancy[r].tolist()))
+            self._sent_occupancy = occupancy
+        return messages
+
+    def flush(self) -> int:
+        """Envoie ce qui est en attente ; retourne le nombre de datagrammes."""
+        messages = self._collect()
+        if not messages:
+            return 0
+        sent = 0
+        for packet in osc_bundles(messages, self.config.max_datagram):
+            try:
+                self._sock.sendto(packet, self._dest)
+                self.bytes_sent += len(packet)
+                sent += 1
+            except OSError as e:
+                # Tampon plein / destinataire absent : on jette, sans bloquer
+                self.send_errors += 1
+                if self.send_errors in (1, 100, 1000):
+                    print(f"[OSC] Erreur d'envoi ({self.send_errors}) : {e}")
+        self.datagrams += sent
+        return sent
+
+    def _run(self) -> None:
+        period = 1.0 / max(1e-3, self.config.rate_hz)
+        next_t = time.monotonic()
+        while not self._stop.is_set():
+            self.flush()
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_t = time.monotonic()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(1.0)
+        self.flush()
+        self._sock.close()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+robust_centroid.py
+Chambre Sonore – Barycentre robuste des points au sol (position de la personne).
+
+Deux estimateurs, chacun en version exacte ou par histogramme :
+    - "median"  : médiane par axe
+    - "trimmed" : moyenne tronquée par axe (on écarte `trim` des points de
+                  chaque côté)
+
+Version exacte : np.median / np.partition, O(N) mais avec copie et
+partition de tableaux de ~300 000 flottants à chaque frame.
+
+Version histogramme : les coordonnées au sol sont déjà bornées à la pièce
+([0, largeur) × [0, profondeur)), on les compte dans des cases fixes de
+`bin_m` (np.bincount) puis médiane et moyenne tronquée sont lues sur les
+effectifs cumulés (quelques centaines de cases).
+
+Précision de la version histogramme (par axe) :
+    - médiane : interpolée linéairement dans la case qui contient le rang
+      N/2, écart à la médiane exacte ≤ bin_m (en pratique < bin_m / 4 sur
+      un nuage dense) ;
+    - moyenne tronquée : chaque point est ramené au centre de sa case et
+      les cases coupées aux rangs de troncature sont pondérées au
+      prorata ; écart ≤ bin_m / 2.
+Avec bin_m = 1 cm, l'écart reste très inférieur à la taille d'une cellule.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+CENTROID_ESTIMATORS = ("median", "trimmed")
+CENTROID_METHODS = ("exact", "histogram")
+
+
+# ----------------------------------------------------------------------
+# Versions exactes
+# ----------------------------------------------------------------------
+
+def exact_median(values: np.ndarray) -> float:
+    return float(np.median(values))
+
+
+def exact_trimmed_mean(values: np.ndarray, trim: float) -> float:
+    """Moyenne des valeurs de rang [trim·N, (1 - trim)·N)."""
+    n = values.shape[0]
+    lo = int(trim * n)
+    hi = max(lo + 1, n - lo)
+    part = np.partition(values, (lo, hi - 1))
+    return float(part[lo:hi].mean(dtype=np.float64))
+
+
+# ----------------------------------------------------------------------
+# Versions histogramme
+# ----------------------------------------------------------------------
+
+def axis_histogram(values: np.ndarray, extent_m: float, bin_m: float) -> np.ndarray:
+    """Effectifs par case de bin_m sur [0, extent_m) ; hors bornes → cases extrêmes."""
+    n_bins = max(1, int(np.ceil(extent_m / bin_m)))
+    idx = (values * (1.0 / bin_m)).astype(np.intp)
+    np.clip(idx, 0, n_bins - 1, out=idx)
+    return np.bincount(idx, minlength=n_bins)
+
+
+def histogram_median(counts: np.ndarray, bin_m: float) -> float:
+    """Médiane interpolée dans la case qui contient le rang N/2."""
+    cum = np.cumsum(counts)
+    target = 0.5 * cum[-1]
+    k = int(np.searchsorted(cum, target))
+    before = cum[k] - counts[k]
+    frac = (target - before) / counts[k]
+    return float((k + frac) * bin_m)
+
+
+def histogram_trimmed_mean(counts: np.ndarray, bin_m: float, trim: float) -> float:
+    """Moyenne des centres de case, pondérée par les effectifs entre les rangs de troncature."""
+    cum = np.cumsum(counts)
+    n = cum[-1]
+    lo, hi = trim * n, (1.0 - trim) * n
+    if hi <= lo:
+        return histogram_median(counts, bin_m)
+    weights = np.clip(cum, lo, hi) - np.clip(cum - counts, lo, hi)
+    centers = (np.arange(counts.shape[0]) + 0.5) * bin_m
+    return float(np.dot(weights, centers) / weights.sum())
+
+
+# ----------------------------------------------------------------------
+# Sélection
+# ----------------------------------------------------------------------
+
+@dataclass
+class RobustCentroid:
+    estimator: str = "median"      # voir CENTROID_ESTIMATORS
+    method: str = "histogram"      # voir CENTROID_METHODS
+    bin_m: float = 0.01            # taille des cases (version histogramme)
+    trim: float = 0.2              # fraction écartée de chaque côté ("trimmed")
+
+    def __post_init__(self) -> None:
+        if self.estimator not in CENTROID_ESTIMATORS:
+            raise ValueError(f"Estimateur inconnu : {self.estimator!r}")
+        if self.method not in CENTROID_METHODS:
+            raise ValueError(f"Méthode inconnue : {self.method!r}")
+        if self.bin_m <= 0.0:
+            raise ValueError("bin_m doit être > 0")
+        if not 0.0 <= self.trim < 0.5:
+            raise ValueError("trim doit être dans [0, 0.5)")
+
+    def _axis(self, values: np.ndarray, extent_m: float) -> float:
+        if self.method == "exact":
+            if self.estimator == "median":
+                return exact_median(values)
+            return exact_trimmed_mean(values, self.trim)
+
+        counts = axis_histogram(values, extent_m, self.bin_m)
+        if self.estimator == "median":
+            return histogram_median(counts, self.bin_m)
+        return histogram_trimmed_mean(counts, self.bin_m, self.trim)
+
+    def locate(self, ground_xy: np.ndarray, width_m: float,
+               depth_m: float) -> Optional[Tuple[float, float]]:
+        """(x, y) en mètres pour des points (N, 2) dans [0, width_m) × [0, depth_m)."""
+        if ground_xy is None or ground_xy.shape[0] == 0:
+            return None
+        x = self._axis(ground_xy[:, 0], width_m)
+        y = self._axis(ground_xy[:, 1], depth_m)
+        if not (np.isfinite(x) and np.isfinite(y)):
+            return None
+        return (x, y)
@@ -16,10 +16,14 @@ Implémentation actuelle :
     - Utilise pygame.mixer pour la lecture audio.
     - Chaque cellule logique possède un "canal" audio dédié.
     - Si un son est déjà en cours pour une cellule, on ajuste seulement volume et pan.
+    - Appelé depuis plusieurs threads (bus d'événements : play / stop ;
+      moteur de contrôle : set_volume à 100 Hz) : un verrou sérialise tous
+      les accès à _cells et à pygame.mixer.
 """
 
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
 from typing import Dict, Hashable, Optional, Tuple
 
@@ -39,6 +43,7 @@ class CellSoundState:
     wav_path: str
     sound: "mixer.Sound | None"
     channel: "mixer.Channel | None"
+    pan: float = 0.5
 
 
 class SoundEngine:
@@ -49,6 +54,7 @@ class SoundEngine:
         self._initialized: bool = False
         self._cells: Dict[Hashable, CellSoundState] = {}
         self._sounds_cache: Dict[str, "mixer.Sound"] = {}
+        self._lock = threading.RLock()
 
         # Initialisation paresseuse : on essaiera d'initialiser au premier play().
         if pygame is None or mixer is None:
@@ -118,88 +124,129 @@ class SoundEngine:
         if not wav_path:
             return
 
-        self._ensure_init()
-        if not self.enabled:
-            return
+        with self._lock:
+            self._ensure_init()
+            if not self.enabled:
+                return
 
-        snd = self._get_or_load_sound(wav_path)
-        if snd is None:
-            return
+            snd = self._get_or_load_sound(wav_path)
+            if snd is None:
+                return
 
-        # Clamp volume et pan
-        vol = max(0.0, min(1.0, volume))
-        pan = max(0.0, min(1.0, pan))
-
-        # Conversion pan → gains gauche/droite
-        left = 1.0 - pan
-        right = pan
-
-        # Récupérer ou créer l'état pour cette cellule
-        state = self._cells.get(cell_id)
-        if state is None or state.sound is None:
-            state = CellSoundState(
-                cell_id=cell_id,
-                wav_path=wav_path,
-                sound=snd,
-                channel=None,
-            )
-            self._cells[cell_id] = state
-        else:
-            # Mettre à jour le son si le chemin a changé
-            if state.wav_path != wav_path:
-                state.sound = snd
-                state.wav_path = wav_path
+            # Clamp volume et pan
+            vol = max(0.0, min(1.0, volume))
+            pan = max(0.0, min(1.0, pan))
+
+            # Conversion pan → gains gauche/droite
+            left = 1.0 - pan
+            right = pan
+
+            # Récupérer ou créer l'état pour cette cellule
+            state = self._cells.get(cell_id)
+            if state is None or state.sound is None:
+                state = CellSoundState(
+                    cell_id=cell_id,
+                    wav_path=wav_path,
+                    sound=snd,
+                    channel=None,
+                )
+                self._cells[cell_id] = state
+            else:
+                # Mettre à jour le son si le chemin a changé
+                if state.wav_path != wav_path:
+                    state.sound = snd
+                    state.wav_path = wav_path
+
+            # Récupérer (ou créer) un channel pour cette cellule
+            ch = state.channel
+            if not self._owns_channel(state):
+                ch = mixer.find_channel(True)
+                state.channel = ch
+                if ch is None:
+                    print("[SoundEngine] Aucun canal libre disponible.")
+                    return
+                ch.play(state.sound, loops=-1)  # lecture en boucle (pour installation)
+            else:
+                # Channel occupé : on ne relance pas le son, on ajuste juste volume/pan
+                pass
+
+            ch.set_volume(left * vol, right * vol)
+            state.pan = pan
+
+    # ------------------------------------------------------------------
 
-        # Récupérer (ou créer) un channel pour cette cellule
+    @staticmethod
+    def _owns_channel(state: CellSoundState) -> bool:
+        """Le canal de la cellule joue encore SON son.
+
+        find_channel(True) peut réattribuer un canal occupé à une autre
+        cellule : sans cette vérification, set_volume / stop_cell agiraient
+        sur le son d'une autre cellule.
+        """
         ch = state.channel
-        if ch is None or not ch.get_busy():
-            ch = mixer.find_channel(True)
-            state.channel = ch
-            if ch is None:
-                print("[SoundEngine] Aucun canal libre disponible.")
-                return
-            ch.play(state.sound, loops=-1)  # lecture en boucle (pour installation)
-        else:
-            # Channel occupé : on ne relance pas le son, on ajuste juste volume/pan
-            pass
+        return ch is not None and ch.get_busy() and ch.get_sound() is state.sound
 
-        ch.set_volume(left * vol, right * vol)
+    # ------------------------------------------------------------------
+
+    def set_volume(self, cell_id: Hashable, volume: float) -> None:
+        """Ajuste le volume d'une cellule EN COURS de lecture (sans la relancer).
+
+        Appelé à cadence de contrôle (src/control_engine.py) : ne fait rien
+        si la cellule ne joue pas.
+        """
+        with self._lock:
+            state = self._cells.get(cell_id)
+            if state is None or not self.enabled:
+                return
+            try:
+                if not self._owns_channel(state):
+                    return
+                vol = max(0.0, min(1.0, volume))
+                state.channel.set_volume((1.0 - state.pan) * vol, state.pan * vol)
+            except Exception:
+                pass
 
     # ------------------------------------------------------------------
 
     def stop_cell(self, cell_id: Hashable) -> None:
         """Arrête le son pour une cellule donnée."""
-        state = self._cells.get(cell_id)
-        if state and state.channel:
+        with self._lock:
+            state = self._cells.get(cell_id)
+            if state is None or not self.enabled:
+                return
             try:
-                state.channel.stop()
+                if self._owns_channel(state):
+                    state.channel.stop()
             except Exception:
                 pass
+            state.channel = None
 
     # ------------------------------------------------------------------
 
     def stop_all(self) -> None:
         """Arrête tous les sons."""
-        if not self._initialized or not self.enabled:
-            return
-        try:
-            mixer.stop()
-        except Exception:
-            pass
+        with self._lock:
+            if not self._initialized or not self.enabled:
+                return
+            try:
+                mixer.stop()
+            except Exception:
+                pass
 
     # ------------------------------------------------------------------
 
     def shutdown(self) -> None:
         """Arrête le moteur audio et libère les ressources."""
-        self.stop_all()
-        if self._initialized and self.enabled:
-            try:
-                mixer.quit()
-            except Exception:
-                pass
-        self.enabled = False
-        self._initialized = True
-        self._cells.clear()
-        self._sounds_cache.clear()
+        with self._lock:
+            self.stop_all()
+            if self._initialized and self.enabled:
+                try:
+                    mixer.quit()
+                except Exception:
+                    pass
+            self.enabled = False
+            self._initialized = True
+            self._cells.clear()
+            self._sounds_cache.clear()
         print("[SoundEngine] Arrêt complet.")
 
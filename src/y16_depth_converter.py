@@ -47,7 +47,9 @@ class Y16DepthConverter:
         # Correction du shift interne
         depth_mm = (y16_image >> self.shift_bits).astype(np.uint16)
 
-        # Pour l’instant, on ne filtre plus (éviter segfault OpenCV)
+        # Pour l’instant, on ne filtre plus (éviter segfault OpenCV).
+        # Le débruitage est fait par depth_filters.TemporalDepthFilter,
+        # appliqué dans PipelineOrbbec.poll().
         return depth_mm
 
     # ------------------------------------------------------------------
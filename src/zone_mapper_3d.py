@@ -13,17 +13,41 @@ de la carte de profondeur, en supposant :
   - la personne est l'objet principal dans le champ
 
 On travaille de façon pragmatique :
-  1) reconstruction d'un nuage de points approximatif
-  2) filtrage des points plausibles pour le corps
-  3) utilisation de X (gauche-droite) et Z (avant-arrière) comme plan au sol
-  4) barycentre robuste pour la position
+  0) décimation optionnelle de la profondeur (uint16, avant tout calcul
+     flottant) : pas, min ou médiane par bloc
+  1) segmentation « au-dessus du sol » : la profondeur attendue du sol est
+     connue analytiquement pour chaque pixel (hauteur + pitch caméra) ;
+     une seule comparaison vectorisée garde les pixels plus proches
+  2) reconstruction du nuage de points de ces pixels, tourné dans un
+     repère horizontal (X droite, Y vers le bas, Z avant)
+  3) utilisation de X (gauche-droite) et Z (avant-arrière) comme plan au sol,
+     limité aux dimensions de la pièce
+  4) barycentre robuste pour la position (médiane ou moyenne tronquée,
+     exacte ou par histogramme : voir robust_centroid.py)
   5) mappage dans la grille physique (rows x cols)
 """
 
 from __future__ import annotations
 
+from typing import Optional
+
 import numpy as np
 
+from src.camera_intrinsics import CameraIntrinsics, undistorted_rays
+from src.depth_filters import DepthDecimator
+from src.robust_centroid import RobustCentroid
+
+
+# Niveaux de décimation proposés, du plus précis au moins coûteux :
+# (libellé, mode, facteur)
+DECIMATION_LEVELS = [
+    ("Pleine résolution", "off", 1),
+    ("1/2 – médiane", "median", 2),
+    ("1/2 – min", "min", 2),
+    ("1/4 – min", "min", 4),
+    ("1/4 – pas", "stride", 4),
+]
+
 
 class ZoneMapper3D:
     """Convertit la profondeur en position (x, y) dans la pièce + cellule (r, c)."""
@@ -38,6 +62,11 @@ class ZoneMapper3D:
         fy: float = 366.1,
         cx: float = 318.2,
         cy: float = 241.1,
+        room_width_m: float = 4.33,
+        room_depth_m: float = 3.23,
+        min_height_m: float = 0.10,
+        cam_roll_deg: float = 0.0,
+        max_height_m: float = 2.2,
     ) -> None:
         """Initialise le mapper 3D.
 
@@ -49,13 +78,23 @@ class ZoneMapper3D:
                 dans la pièce.
             cam_offset_m: offset supplémentaire éventuel (non utilisé pour l'instant,
                 gardé pour compatibilité).
-            fx, fy, cx, cy: paramètres intrinsèques approximatifs de la caméra.
+            fx, fy, cx, cy: paramètres intrinsèques approximatifs (640×480),
+                remplacés par ceux du SDK via set_intrinsics().
+            room_width_m, room_depth_m: dimensions de la pièce ; les points
+                projetés hors de la pièce sont ignorés.
+            min_height_m: hauteur minimale au-dessus du sol pour qu'un pixel
+                soit considéré comme « présence » (m).
+            cam_roll_deg: roulis autour de l'axe optique (degrés) ; 0 si la
+                caméra est de niveau.
+            max_height_m: hauteur maximale utile au-dessus du sol (m) ; borne
+                haute du volume de la pièce pour la ROI (plafond ignoré).
         """
         self.offset_x = 0.0
         self.offset_y = 0.0
 
         self.cam_height_m = cam_height_m
         self.cam_angle_deg = cam_angle_deg
+        self.cam_roll_deg = cam_roll_deg
         self.cam_wall_dist_m = cam_wall_dist_m
         self.cam_offset_m = cam_offset_m
 
@@ -63,48 +102,370 @@ class ZoneMapper3D:
         self.fy = fy
         self.cx = cx
         self.cy = cy
+        self.intrinsics = CameraIntrinsics(width=640, height=480, fx=fx, fy=fy, cx=cx, cy=cy)
+
+        self.room_width_m = room_width_m
+        self.room_depth_m = room_depth_m
+        self.min_height_m = min_height_m
+        self.max_height_m = max_height_m
+
+        # Tables par pixel (rayons non distordus, profondeur attendue du sol),
+        # recalculées uniquement quand la résolution, les intrinsèques ou la
+        # pose changent — toutes au même endroit (_ensure_tables).
+        self._tables_key = None
+        self._proc_key = None
+        self.ray_x = None            # (H, W) (u - cx) / fx
+        self.ray_y = None            # (H, W) (v - cy) / fy
+        self.floor_depth_mm = None   # (H, W) profondeur du sol attendue (mm, inf = jamais)
+        self.above_floor_mm = None   # (H, W) uint16 : seuil « au-dessus du sol »
+
+        # ROI : pixels dont le rayon peut traverser le volume de la pièce
+        # (rectangle englobant + masque), recalculée au changement de géométrie
+        self.use_roi = True
+        self._roi_key = None
+        self.roi_mask = None         # (H, W) bool, pleine résolution
+        self.roi_exit_mm = None      # (H, W) uint16 : profondeur de sortie de la pièce
+        self.roi = None              # (y0, y1, x0, x1) ou None
+
+        # Mêmes tables à la résolution de traitement (ROI puis décimation) ;
+        # identiques aux précédentes sans ROI ni décimation
+        self._proc_ray_x = None
+        self._proc_ray_y = None
+        self._proc_above_mm = None
+
+        # Décimation de la profondeur avant reconstruction (désactivée)
+        self.decimator = DepthDecimator("off", 1)
+
+        # Barycentre robuste de la position (médiane par histogramme)
+        self.centroid = RobustCentroid()
 
         self._update_rotation_matrix()
 
     # ------------------------------------------------------------------
 
     def _update_rotation_matrix(self) -> None:
-        """Construit la matrice de rotation à partir du pitch (rotation autour de X)."""
+        """Construit la matrice de rotation à partir du pitch (et du roulis).
+
+        Repère caméra : X droite, Y bas (image), Z axe optique.
+        Repère horizontal : X droite, Y vertical vers le bas, Z avant à plat.
+        Caméra inclinée de θ vers le sol (roulis nul) :
+            Y_h =  cosθ·Yc + sinθ·Zc
+            Z_h = -sinθ·Yc + cosθ·Zc
+        Le roulis φ est d'abord compensé par une rotation autour de l'axe
+        optique. La 2e ligne de R est la verticale (vers le bas) exprimée
+        dans le repère caméra.
+        """
         pitch_rad = np.radians(self.cam_angle_deg)
+        c, s = np.cos(pitch_rad), np.sin(pitch_rad)
+        roll_rad = np.radians(self.cam_roll_deg)
+        cr, sr = np.cos(roll_rad), np.sin(roll_rad)
 
         # Rotation autour de l'axe X (caméra qui regarde vers le bas)
-        self.R = np.eye(3, dtype=np.float32)
+        R_pitch = np.array([
+            [1.0, 0.0, 0.0],
+            [0.0,   c,   s],
+            [0.0,  -s,   c],
+        ])
+        # Rotation autour de l'axe optique (roulis)
+        R_roll = np.array([
+            [ cr, -sr, 0.0],
+            [ sr,  cr, 0.0],
+            [0.0, 0.0, 1.0],
+        ])
+        self.R = (R_pitch @ R_roll).astype(np.float32)
+
+        # La pose a changé : tables par pixel à recalculer
+        self._tables_key = None
+
+    # ------------------------------------------------------------------
+
+    def set_pose(self, cam_height_m: float, cam_angle_deg: float,
+                 cam_roll_deg: float = 0.0) -> None:
+        """Applique une nouvelle pose caméra (ex. auto-calibration du sol).
+
+        Les tables dérivées (rotation, profondeur du sol, seuils) sont
+        reconstruites une seule fois, ici, plutôt qu'à la frame suivante.
+        """
+        self.cam_height_m = float(cam_height_m)
+        self.cam_angle_deg = float(cam_angle_deg)
+        self.cam_roll_deg = float(cam_roll_deg)
+        self._update_rotation_matrix()
+        if self.ray_x is not None:
+            self._ensure_tables(self.ray_x.shape)
+
+    def set_intrinsics(self, intrinsics: Optional[CameraIntrinsics]) -> None:
+        """Remplace les intrinsèques (SDK) ; sans effet si identiques.
+
+        Peut être appelé à chaque frame : la comparaison est peu coûteuse
+        et les tables ne sont reconstruites qu'en cas de changement.
+        """
+        if intrinsics is None or intrinsics == self.intrinsics:
+            return
+        self.intrinsics = intrinsics
+        self.fx, self.fy = intrinsics.fx, intrinsics.fy
+        self.cx, self.cy = intrinsics.cx, intrinsics.cy
+        self._tables_key = None
+        print(
+            f"[ZoneMapper3D] Intrinsèques {intrinsics.width}×{intrinsics.height} : "
+            f"fx={intrinsics.fx:.1f} fy={intrinsics.fy:.1f} "
+            f"cx={intrinsics.cx:.1f} cy={intrinsics.cy:.1f}"
+            f"{' + distorsion' if intrinsics.has_distortion() else ''}"
+        )
+
+    def set_decimation(self, mode: str = "off", factor: int = 1) -> None:
+        """Choisit la décimation ("off", "stride", "min", "median") ; modifiable à chaud.
+
+        Les tables de traitement sont dérivées des tables pleine
+        résolution au prochain appel (_ensure_tables).
+        """
+        if (mode, int(factor)) == (self.decimator.mode, self.decimator.factor):
+            return
+        self.decimator = DepthDecimator(mode, factor)
+
+    def set_centroid(self, estimator: str = "median", method: str = "histogram") -> None:
+        """Choisit l'estimateur de position ("median" / "trimmed", "exact" / "histogram")."""
+        if (estimator, method) == (self.centroid.estimator, self.centroid.method):
+            return
+        self.centroid = RobustCentroid(estimator, method, self.centroid.bin_m, self.centroid.trim)
+
+    def set_room(self, room_width_m: float, room_depth_m: float) -> None:
+        """Dimensions de la pièce ; la ROI sera recalculée au prochain roi_rect()."""
+        self.room_width_m = float(room_width_m)
+        self.room_depth_m = float(room_depth_m)
+
+    # ------------------------------------------------------------------
+
+    def _ensure_tables(self, shape) -> None:
+        """(Re)calcule les tables par pixel si la résolution ou la géométrie a changé.
+
+        Point unique de réinitialisation : une profondeur d'une autre
+        résolution que les intrinsèques les met à l'échelle, puis rayons,
+        profondeur du sol et seuils sont recalculés ensemble. Les tables de
+        traitement (ROI, décimation) en dérivent (_ensure_processing_tables).
+        """
+        H, W = shape
+        intr = self.intrinsics.scaled(W, H)
+        key = (
+            (H, W), intr,
+            self.cam_height_m, self.cam_angle_deg, self.cam_roll_deg,
+            self.min_height_m,
+        )
+        if key != self._tables_key:
+            self.ray_x, self.ray_y = undistorted_rays(intr)
+            self._build_floor_tables()
+            self._tables_key = key
+
+    def _ensure_processing_tables(self, roi=None) -> None:
+        """Tables de traitement pour la ROI (ou l'image entière) et la décimation courantes."""
+        dec = self.decimator
+        proc_key = (self._tables_key, self._roi_key if roi is not None else None,
+                    roi, dec.mode, dec.factor)
+        if proc_key != self._proc_key:
+            self._build_processing_tables(roi)
+            self._proc_key = proc_key
+
+    def _build_floor_tables(self) -> None:
+        """Profondeur attendue du sol pour chaque pixel et seuil « au-dessus du sol ».
+
+        Un point du rayon (ray_x, ray_y, 1) à la profondeur Z est à la
+        hauteur Y_h = Z · g·(ray_x, ray_y, 1) sous la caméra, g étant la
+        verticale dans le repère caméra (2e ligne de R ; sans roulis
+        g·r = ray_y·cosθ + sinθ). Il touche le sol quand Y_h = h, donc :
+            Z_sol = h / g·r                       (rayon descendant seulement)
+        Un point du même rayon est à plus de m au-dessus du sol si :
+            Z < Z_sol · (1 - m / h)
+        """
+        h = float(self.cam_height_m)
+        gx, gy, gz = (np.float32(v) for v in self.R[1])
+
+        down = self.ray_y * gy + gz
+        if gx != 0.0:
+            down += self.ray_x * gx
+        hits_floor = down > 1e-6
+
+        floor_m = np.full(down.shape, np.inf, dtype=np.float32)
+        np.divide(h, down, out=floor_m, where=hits_floor)
+        self.floor_depth_mm = floor_m * 1000.0
+
+        ratio = max(0.0, 1.0 - self.min_height_m / h) if h > 0 else 0.0
+        thresh = np.minimum(self.floor_depth_mm * ratio, 65535.0)
+        self.above_floor_mm = thresh.astype(np.uint16)
+
+    def _build_processing_tables(self, roi=None) -> None:
+        """Tables à la résolution de traitement, dérivées des tables pleine résolution.
+
+        ROI : rayons et seuils recadrés ; seuil ramené à la profondeur où
+        le rayon sort de la pièce (murs, fond : rejetés par la même
+        comparaison) ; hors du masque, seuil 0 (jamais retenu).
+        Décimation :
+        - "stride" : mêmes pixels que la décimation (exact)
+        - "min" / "median" : rayon moyen du bloc ; seuil = minimum du bloc
+          (un bloc de sol reste sous son seuil le plus proche, une personne
+          dans le bloc est toujours plus proche que ce seuil)
+        """
+        ray_x, ray_y, above = self.ray_x, self.ray_y, self.above_floor_mm
+        if roi is not None:
+            y0, y1, x0, x1 = roi
+            ray_x, ray_y = ray_x[y0:y1, x0:x1], ray_y[y0:y1, x0:x1]
+            above = np.minimum(above[y0:y1, x0:x1], self.roi_exit_mm[y0:y1, x0:x1])
+            above[~self.roi_mask[y0:y1, x0:x1]] = 0
+
+        dec = self.decimator
+        if not dec.active:
+            self._proc_ray_x = np.ascontiguousarray(ray_x)
+            self._proc_ray_y = np.ascontiguousarray(ray_y)
+            self._proc_above_mm = np.ascontiguousarray(above)
+            return
+
+        f = dec.factor
+        h, w = dec.output_shape(ray_x.shape)
+        if dec.mode == "stride":
+            o = f // 2
+            self._proc_ray_x = np.ascontiguousarray(ray_x[o:h * f:f, o:w * f:f])
+            self._proc_ray_y = np.ascontiguousarray(ray_y[o:h * f:f, o:w * f:f])
+            self._proc_above_mm = np.ascontiguousarray(above[o:h * f:f, o:w * f:f])
+            return
+
+        def blocks(a):
+            return a[:h * f, :w * f].reshape(h, f, w, f)
+
+        self._proc_ray_x = blocks(ray_x).mean(axis=(1, 3)).astype(np.float32)
+        self._proc_ray_y = blocks(ray_y).mean(axis=(1, 3)).astype(np.float32)
+        self._proc_above_mm = blocks(above).min(axis=(1, 3))
 
     # ------------------------------------------------------------------
 
-    def compute_point_cloud(self, depth_data: np.ndarray) -> np.ndarray:
-        """Convertit la carte de profondeur (mm) en nuage de points 3D (m) dans le repère caméra.
+    def roi_rect(self, frame_shape, align: int = 4):
+        """Rectangle (y0, y1, x0, x1) des pixels dont le rayon peut traverser la pièce.
+
+        Le volume utile est la boîte [0, largeur] × [0, profondeur] ×
+        [min_height_m, max_height_m] au-dessus du sol. Le long d'un rayon,
+        chaque borne est linéaire en Z (profondeur capteur) ; le pixel est
+        utile si l'intersection des intervalles de Z, limitée au segment
+        caméra → sol, est non vide. Recalculé uniquement quand la géométrie
+        change. Les dimensions sont arrondies à un multiple de `align`
+        (décimation sans pixels perdus). None si use_roi est désactivé.
+        """
+        if not self.use_roi:
+            return None
+        self._ensure_tables(frame_shape)
+        key = (self._tables_key, self.room_width_m, self.room_depth_m,
+               self.cam_wall_dist_m, self.max_height_m, int(align))
+        if key != self._roi_key:
+            self._build_roi(align)
+            self._roi_key = key
+        return self.roi
+
+    def _build_roi(self, align: int) -> None:
+        h = float(self.cam_height_m)
+        r = self.R
+        side = self.ray_x * np.float32(r[0, 0]) + self.ray_y * np.float32(r[0, 1]) + np.float32(r[0, 2])
+        down = self.ray_x * np.float32(r[1, 0]) + self.ray_y * np.float32(r[1, 1]) + np.float32(r[1, 2])
+        fwd = self.ray_x * np.float32(r[2, 0]) + self.ray_y * np.float32(r[2, 1]) + np.float32(r[2, 2])
+
+        # Segment utile du rayon : de 0.2 m jusqu'au sol (ou 8 m)
+        z_lo = np.full(side.shape, 0.2, dtype=np.float32)
+        z_hi = np.minimum(self.floor_depth_mm / 1000.0, 8.0).astype(np.float32)
+
+        def clip(coef, lo, hi):
+            # lo ≤ coef · Z ≤ hi  →  resserre [z_lo, z_hi]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                a = np.where(coef > 0, lo / coef, hi / coef)
+                b = np.where(coef > 0, hi / coef, lo / coef)
+            flat = coef == 0
+            ok_flat = (lo <= 0.0) & (hi >= 0.0)
+            a = np.where(flat, -np.inf if ok_flat else np.inf, a)
+            b = np.where(flat, np.inf if ok_flat else -np.inf, b)
+            np.maximum(z_lo, a, out=z_lo)
+            np.minimum(z_hi, b, out=z_hi)
+
+        clip(side, -self.cam_wall_dist_m, self.room_width_m - self.cam_wall_dist_m)
+        clip(fwd, 0.0, self.room_depth_m)
+        clip(down, h - self.max_height_m, h - self.min_height_m)
+
+        mask = z_lo <= z_hi
+        self.roi_mask = mask
+        exit_mm = np.where(mask, np.minimum(z_hi * 1000.0, 65535.0), 0.0)
+        self.roi_exit_mm = exit_mm.astype(np.uint16)
+        if not mask.any():
+            self.roi = None
+            return
+
+        H, W = mask.shape
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        self.roi = (
+            *self._aligned_span(int(rows[0]), int(rows[-1]) + 1, H, align),
+            *self._aligned_span(int(cols[0]), int(cols[-1]) + 1, W, align),
+        )
+
+    @staticmethod
+    def _aligned_span(lo: int, hi: int, size: int, align: int):
+        """Élargit [lo, hi) à une longueur multiple de align, sans sortir de [0, size)."""
+        align = max(1, int(align))
+        length = -(-(hi - lo) // align) * align
+        length = min(length, size - size % align)
+        lo = max(0, min(lo, size - length))
+        return lo, lo + length
+
+    # ------------------------------------------------------------------
+
+    def expected_floor_depth_map(self, shape) -> np.ndarray:
+        """Carte (H, W) de la profondeur (mm) à laquelle chaque rayon touche le sol."""
+        self._ensure_tables(shape)
+        return self.floor_depth_mm
+
+    def above_floor_mask(self, depth_data: np.ndarray) -> np.ndarray:
+        """Pixels valides situés à plus de min_height_m au-dessus du sol.
+
+        Une seule comparaison contre la carte précalculée (plus le rejet
+        des pixels invalides / trop proches). Le masque est à la résolution
+        de traitement (après décimation).
+        """
+        self._ensure_tables(depth_data.shape)
+        self._ensure_processing_tables()
+        depth = self.decimator.process(depth_data)
+        return (depth > 200) & (depth < self._proc_above_mm)
+
+    # ------------------------------------------------------------------
+
+    def compute_point_cloud(self, depth_data: np.ndarray, foreground_only: bool = True,
+                            roi=None) -> np.ndarray:
+        """Convertit la carte de profondeur (mm) en nuage de points 3D (m), repère horizontal.
 
         depth_data: tableau (H, W) en millimètres.
+        foreground_only: True → seulement les pixels au-dessus du sol
+            (above_floor_mask) ; False → tous les pixels valides (> 0.2 m).
+        roi: (y0, y1, x0, x1) si depth_data est déjà recadrée sur roi_rect()
+            (PipelineOrbbec.roi) ; les pixels hors du masque sont ignorés.
 
         Retourne:
-            cloud: tableau (N, 3) de points [Xc, Yc, Zc] en mètres, dans le repère caméra,
-                   après rotation pour tenir compte du pitch, mais avant translation.
+            cloud: tableau (N, 3) de points [X, Y, Z] en mètres, après rotation
+                   du pitch (X droite, Y vertical vers le bas, Z avant), origine
+                   à la caméra.
         """
         if depth_data is None:
             return np.zeros((0, 3), dtype=np.float32)
 
-        H, W = depth_data.shape
+        if roi is None:
+            self._ensure_tables(depth_data.shape)
+        elif self._tables_key is None or self._roi_key is None or roi != self.roi:
+            # ROI d'une géométrie précédente (frame en vol) : on l'ignore
+            return np.zeros((0, 3), dtype=np.float32)
+        self._ensure_processing_tables(roi)
 
-        # Coordonnées de pixel
-        xs = np.tile(np.arange(W, dtype=np.float32), H)
-        ys = np.repeat(np.arange(H, dtype=np.float32), W)
+        # Décimation en uint16 (no-op si désactivée)
+        depth = self.decimator.process(depth_data)
 
-        d = depth_data.reshape(-1).astype(np.float32) / 1000.0  # m
-        valid = d > 0.2  # ignorer les valeurs trop proches ou nulles
+        valid = depth > 200  # ignorer les valeurs trop proches ou nulles
+        if foreground_only:
+            valid &= depth < self._proc_above_mm
 
-        xs = xs[valid]
-        ys = ys[valid]
-        d = d[valid]
+        d = depth[valid].astype(np.float32) / 1000.0  # m
 
-        # Projection pinhole inverse
-        Xc = (xs - self.cx) * d / self.fx
-        Yc = (ys - self.cy) * d / self.fy
+        # Projection pinhole inverse (rayons précalculés)
+        Xc = self._proc_ray_x[valid] * d
+        Yc = self._proc_ray_y[valid] * d
         Zc = d
 
         pts = np.stack([Xc, Yc, Zc], axis=1)  # (N,3)
@@ -112,98 +473,39 @@ class ZoneMapper3D:
         # Appliquer la rotation de pitch
         rotated = pts @ self.R.T  # (N,3)
 
-        return rotated  # repère caméra incliné
+        return rotated  # repère horizontal
 
     # ------------------------------------------------------------------
 
-      # ------------------------------------------------------------------
-
     def project_to_ground(self, cloud: np.ndarray) -> np.ndarray:
-        """Projette les points 3D sur un plan au sol approximatif (X = largeur, Y = profondeur).
-
-        Hypothèses:
-            - la caméra est à hauteur cam_height_m au-dessus du sol
-            - Yc (après rotation) est l'axe vertical (positif vers le haut)
-            - Zc est l'axe avant (en direction du regard)
-            - Xc est l'axe gauche-droite
-
-        Dans la pratique, avec les valeurs mesurées sur le système actuel :
-            - Yc est très proche de 0 (≈ -0.03 à 0.00 m)
-            - Zc est très petit (≈ 0.00 à 0.06 m)
-        On utilise donc un facteur d'échelle sur Zc pour ramener la profondeur
-        dans un ordre de grandeur cohérent avec la pièce (≈ 1–3 m).
+        """Projette les points 3D sur le plan au sol de la pièce (X = largeur, Y = profondeur).
+
+        Hypothèses (cas B1):
+            - la caméra est sur le mur du fond (y = 0) et regarde vers +y
+            - elle est à cam_wall_dist_m du mur latéral gauche (x = 0)
+            - le nuage est dans le repère horizontal de compute_point_cloud
+
+        Donc :
+            x_abs = cam_wall_dist_m + X
+            y_abs = Z   (distance horizontale devant la caméra)
+        Les points hors de la pièce [0, room_width_m) × [0, room_depth_m)
+        sont ignorés.
         """
 
         # Aucun point → rien à projeter
         if cloud.size == 0:
             return np.zeros((0, 2), dtype=np.float32)
 
-        # Décomposition des coordonnées caméra
-        Xc = cloud[:, 0]
-        Yc = cloud[:, 1]
-        Zc = cloud[:, 2]
+        X = cloud[:, 0]
+        Z = cloud[:, 2]
 
-        # Filtrer les points non finis (NaN / inf)
-        finite_mask = (
-            np.isfinite(Xc) &
-            np.isfinite(Yc) &
-            np.isfinite(Zc)
-        )
-        if not np.any(finite_mask):
-            return np.zeros((0, 2), dtype=np.float32)
+        x_abs = self.cam_wall_dist_m + X
+        y_abs = Z
 
-        Xc = Xc[finite_mask]
-        Yc = Yc[finite_mask]
-        Zc = Zc[finite_mask]
-
-        # DEBUG (si besoin) : plages typiques mesurées
-        # print("DEBUG Yc min/max:", float(Yc.min()), float(Yc.max()))
-        # print("DEBUG Zc min/max:", float(Zc.min()), float(Zc.max()))
-        # print("DEBUG Xc min/max:", float(Xc.min()), float(Xc.max()))
-
-        # ------------------------------------------------------------------
-        # ÉCHELLE DE PROFONDEUR
-        # ------------------------------------------------------------------
-        # Les mesures observées donnent Zc max ≈ 0.06 m.
-        # On applique un facteur d'échelle pour obtenir des profondeurs
-        # exploitables pour la grille (~1–3 m) :
-        #
-        #   Zc_scaled = Zc * 40.0  →  0.06 * 40 ≈ 2.4 m
-        #
-        # print("DEBUG Zc min/max:", float(Zc.min()), float(Zc.max()))
-
-        depth_scale = 1.0
-        Zc_scaled = Zc * depth_scale
-        
-        # Filtre réaliste pour une pièce : 0.3 à 6 m
-        depth_mask = (Zc_scaled > 0.5) & (Zc_scaled < 4.5)
-        
-        # NOTE IMPORTANTE :
-        # On NE filtre PLUS sur une plage de profondeur stricte ici.
-        # Le filtrage précédent :
-        #     depth_mask = (Zc_scaled > 0.2) & (Zc_scaled < 6.0)
-        #     ...
-        # avait pour effet de vider complètement le nuage au sol (ground=(0,2))
-        # lorsque toutes les valeurs étaient légèrement en dehors du seuil.
-        #
-        # On garde donc tous les points finis et non nuls, l'échelle étant
-        # suffisante pour obtenir des valeurs utiles pour le barycentre.
-
-        # ------------------------------------------------------------------
-        # Position absolue dans la pièce (cas B1) :
-        # - la caméra est à cam_wall_dist_m du mur latéral gauche
-        # - Xc est la coordonnée locale caméra gauche-droite
-        #
-        # Donc :
-        #   x_abs = cam_wall_dist_m + Xc
-        #   y_abs = Zc_scaled   (distance devant la caméra en mètres)
-        # ------------------------------------------------------------------
-        x_abs = self.cam_wall_dist_m + Xc
-        y_abs = Zc_scaled
-        x_abs = x_abs + 6.15
+        # Filtre les NaN / inf implicitement (comparaisons fausses)
         mask_phys = (
-            (x_abs > 0.0) & (x_abs < 3.6) &   # largeur réelle de la pièce
-            (y_abs > 0.7) & (y_abs < 4.5)     # profondeur réelle utilisable
+            (x_abs >= 0.0) & (x_abs < self.room_width_m) &
+            (y_abs >= 0.0) & (y_abs < self.room_depth_m)
         )
 
         x_abs = x_abs[mask_phys]
@@ -220,7 +522,7 @@ class ZoneMapper3D:
     def detect_person_position(self, ground_xy: np.ndarray):
         """
         Détecte la position (x, y) de la personne dans la pièce en utilisant un
-        barycentre robuste basé sur les médianes.
+        barycentre robuste (self.centroid : médianes par défaut).
 
         ground_xy : tableau (N, 2) avec colonnes :
             - x = position gauche-droite absolue dans la pièce (m)
@@ -233,19 +535,9 @@ class ZoneMapper3D:
         if ground_xy is None or ground_xy.size < 20:
             return None
 
-        xs = ground_xy[:, 0]
-        ys = ground_xy[:, 1]
-
-        # Barycentre robuste (médianes, beaucoup plus stable que moyenne)
-        x_med = float(np.median(xs))
-        y_med = float(np.median(ys))
-
-        # Sanity check (évite renvoyer des trucs aberrants)
-        if not (np.isfinite(x_med) and np.isfinite(y_med)):
-            return None
-
-        # Retour position en mètres
-        return (x_med, y_med)
+        # Barycentre robuste (médianes, beaucoup plus stable que moyenne) ;
+        # None si non fini (évite renvoyer des trucs aberrants)
+        return self.centroid.locate(ground_xy, self.room_width_m, self.room_depth_m)
 
     # ------------------------------------------------------------------
 